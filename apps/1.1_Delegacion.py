@@ -1,9 +1,13 @@
 import streamlit as st
-import google.generativeai as genai
-from fpdf import FPDF
-from docx import Document
-import io
-import re
+from nucleo.ia import obtener_cliente
+from nucleo.secciones import mostrar_avisos, pintar_campos_parciales
+from nucleo.descargas import archivo_en_almacen, descarga_diferida, olvidar_descargas
+from nucleo.memoria import recordar, recuperar
+from nucleo.exportar import exportar, formato_de
+from nucleo.arranque import fragmento
+from nucleo.historial import guardar_resultado, mostrar_historial, pedir_generacion
+from nucleo.trabajos import en_curso, lanzar, recoger
+from herramientas import delegacion
 
 # --- 1. CONFIGURACIÓN DE PÁGINA ---
 # st.set_page_config(
@@ -12,9 +16,8 @@ import re
 #   layout="centered"
 #)
 
-# --- 2. MODELO FIJO ---
-# Definimos el modelo aquí para que sea fácil de cambiar en el futuro si es necesario
-MODELO_FIJO = "models/gemma-3-27b-it"
+# --- 2. MODELO ---
+# Gemma con respaldo en Flash: la política está en nucleo/modelos.py (RUTAS), no en la página
 
 # Estilos CSS
 st.markdown("""
@@ -29,113 +32,61 @@ st.markdown("""
 
 # --- 3. CONFIGURACIÓN API ---
 try:
-    api_key = st.secrets["GOOGLE_API_KEY"]
-    genai.configure(api_key=api_key)
+    ia = obtener_cliente()
 except Exception as e:
     st.error("⚠️ Error: No se encontró la API KEY en secrets.toml")
     st.stop()
 
 # --- 4. FUNCIONES DE ARCHIVOS (WORD Y PDF) ---
-def crear_word(data, tarea, colaborador):
-    doc = Document()
-    doc.add_heading('Plan de Delegación Situacional', 0)
-    doc.add_paragraph(f"Colaborador: {colaborador}")
-    doc.add_paragraph(f"Tarea: {tarea}")
-    
-    doc.add_heading('1. Diagnóstico', level=1)
-    doc.add_paragraph(data.get('diagnostico', ''))
-    
-    doc.add_heading('2. Pasos Clave', level=1)
-    doc.add_paragraph(data.get('pasos', ''))
-    
-    doc.add_heading('3. Guion de Conversación', level=1)
-    doc.add_paragraph(data.get('guion', ''))
-    
-    bio = io.BytesIO()
-    doc.save(bio)
-    return bio.getvalue(), "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"
-
-def crear_pdf(data, tarea, colaborador):
-    class PDF(FPDF):
-        def header(self):
-            self.set_font('Arial', 'B', 16)
-            self.cell(0, 10, 'Plan de Delegación Situacional', 0, 1, 'C')
-            self.ln(10)
-
-    pdf = PDF()
-    pdf.add_page()
-    
-    # Función para limpiar caracteres latinos y evitar errores de codificación
-    def L(t): 
-        if not t: return ""
-        return t.encode('latin-1', 'replace').decode('latin-1')
-    
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 8, L(f"Colaborador: {colaborador}"), 0, 1)
-    pdf.set_font("Arial", size=11)
-    pdf.multi_cell(0, 6, L(f"Tarea: {tarea}"))
-    pdf.ln(5)
-    
-    secciones = [
-        ("1. Diagnóstico", "diagnostico"), 
-        ("2. Pasos Clave", "pasos"), 
-        ("3. Guion de Conversación", "guion")
-    ]
-    
-    for titulo, key in secciones:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.set_text_color(0, 50, 100)
-        pdf.cell(0, 10, L(titulo), 0, 1)
-        pdf.set_text_color(0, 0, 0)
-        pdf.set_font("Arial", size=11)
-        pdf.multi_cell(0, 6, L(data.get(key, '')))
-        pdf.ln(5)
+# Memoizado por (contenido, formato) en el almacén en disco: renombrar o cambiar el formato no lo regenera
+@archivo_en_almacen
+def crear_archivo(data, tarea, colaborador, formato):
+    documento = delegacion.documento(data, {"tarea": tarea, "colaborador": colaborador})
+    return exportar(documento, formato_de(formato), herramienta="delegacion")
+
+# Fragmento: cambiar el nombre o el formato vuelve a correr solo esta zona, no la página entera
+@fragmento("Delegación · descarga")
+def zona_descarga(res, tarea, nombre_colab):
+    st.subheader("📥 Descargar Plan")
+    c_name, c_type = st.columns([2, 1])
+    with c_name:
+        f_name = st.text_input("Nombre del archivo:", value=f"Delegacion_{nombre_colab.split()[0]}")
+    with c_type:
+        f_fmt = st.radio("Formato:", ["Word (.docx)", "PDF (.pdf)"], horizontal=True)
         
-    return pdf.output(dest='S').encode('latin-1'), "application/pdf", "pdf"
+    # El archivo seleccionado solo se genera cuando se pide
+    descarga_diferida(
+        "del", f_fmt, lambda: crear_archivo(res, tarea, nombre_colab, f_fmt),
+        nombre_archivo=f_name, etiqueta=f"💾 Bajar {f_fmt}"
+    )
 
 # --- 5. LÓGICA IA ---
-def analizar_delegacion(tarea, exp, disp):
-    try:
-        # Usamos el modelo fijo definido arriba
-        model = genai.GenerativeModel(MODELO_FIJO)
-        
-        prompt = f"""
-        Actúa como Coach experto en Liderazgo Situacional.
-        Tarea: {tarea} | Nivel: {exp} | Disposición: {disp}
-        
-        USA EXACTAMENTE ESTOS TÍTULOS PARA SEPARAR LAS SECCIONES:
-        
-        SECCION_DIAGNOSTICO:
-        [Identifica si es E1, E2, E3 o E4 y explica por qué]
-        
-        SECCION_PASOS:
-        [Lista 3 pasos clave para la reunión]
-        
-        SECCION_GUION:
-        [Escribe el diálogo exacto entre comillas]
-        """
-        
-        response = model.generate_content(prompt)
-        texto = response.text
-        
-        # Regex (Expresiones Regulares) para cortar el texto de forma segura
-        diag = re.search(r"SECCION_DIAGNOSTICO:(.*?)(?=SECCION_PASOS:|$)", texto, re.DOTALL | re.IGNORECASE)
-        pasos = re.search(r"SECCION_PASOS:(.*?)(?=SECCION_GUION:|$)", texto, re.DOTALL | re.IGNORECASE)
-        guion = re.search(r"SECCION_GUION:(.*?)(?=$)", texto, re.DOTALL | re.IGNORECASE)
-        
-        return {
-            "diagnostico": diag.group(1).strip().replace("*", "") if diag else "Error generando diagnóstico.",
-            "pasos": pasos.group(1).strip().replace("*", "") if pasos else "Error generando pasos.",
-            "guion": guion.group(1).strip().replace("*", "").replace('"', '') if guion else "Error generando guion."
-        }
+TITULOS = {"diagnostico": "**Diagnóstico:**", "pasos": "**Pasos Clave:**", "guion": "**🗣️ Guion Sugerido:**"}
 
+def analizar_delegacion_stream(trabajo, tarea, exp, disp):
+    """Corre en segundo plano: deja en el trabajo el texto a medida que llega y devuelve el resultado final."""
+    try:
+        entrada = {"tarea": tarea, "competencia": exp, "motivacion": disp}
+        return delegacion.generar(ia, entrada, escribir=trabajo.agregar)
     except Exception as e:
         return {"error": str(e)}
 
+def abrir_del(entrada, res):
+    """Repone un plan del historial (sin llamar a la IA)"""
+    recordar("resultado_del", res)
+    olvidar_descargas("del")
+
+def terminar_del(trabajo):
+    """Recoge el plan generado en segundo plano"""
+    res = trabajo.resultado
+    recordar("resultado_del", res)
+    guardar_resultado(delegacion.NOMBRE, trabajo.datos["entrada"], res)
+    olvidar_descargas("del")
+
 # --- 6. INTERFAZ DE USUARIO ---
 st.header("Delegación Situacional")
+mostrar_historial(delegacion.NOMBRE, abrir_del)
 st.write("Delega de acuerdo al grado de Competencia y Compromiso que tenga la persona a la cual delegarás la tarea")
-#st.caption(f"Motor IA: {MODELO_FIJO}") # Confirmación visual del modelo usado
 
 st.divider()
 
@@ -163,23 +114,22 @@ with col2:
 
 tarea = st.text_area("Tarea a delegar", height=100, placeholder="Ej: Realizar el informe mensual...")
 
-# Inicialización de estado
-if 'resultado_del' not in st.session_state:
-    st.session_state.resultado_del = None
-
-# Botón de acción
-if st.button("🚀 Generar Estrategia", type="primary", use_container_width=True):
+# Botón de acción (si ya hay un plan casi igual guardado, se ofrece antes de generar)
+entrada = {"tarea": tarea, "competencia": nivel_experiencia, "motivacion": disposicion, "colaborador": nombre_colab}
+if pedir_generacion(delegacion.NOMBRE, st.button("🚀 Generar Estrategia", type="primary", use_container_width=True, disabled=en_curso("del")), entrada, abrir_del):
     if not tarea:
         st.warning("⚠️ Escribe una tarea primero.")
     else:
-        with st.spinner("Analizando situación..."):
-            st.session_state.resultado_del = analizar_delegacion(
-                tarea, nivel_experiencia, disposicion
-            )
+        # En segundo plano: otro clic o cambiar de página no corta la generación
+        lanzar("del", analizar_delegacion_stream, tarea, nivel_experiencia, disposicion, datos={"entrada": entrada})
+
+# Sin spinner: las secciones se van llenando mientras el modelo escribe
+generando = recoger("del", terminar_del, lambda trabajo: pintar_campos_parciales(trabajo.texto(), TITULOS))
 
 # --- 7. MOSTRAR RESULTADOS ---
-if st.session_state.resultado_del:
-    res = st.session_state.resultado_del
+# El resultado vive en la sesión en forma compacta (ver nucleo/memoria.py)
+res = None if generando else recuperar("resultado_del")
+if res:
     
     if "error" in res:
         st.error(f"Error técnico: {res['error']}")
@@ -189,6 +139,8 @@ if st.session_state.resultado_del:
         txt_pasos = res.get('pasos', 'Sin datos')
         txt_guion = res.get('guion', 'Sin datos')
 
+        mostrar_avisos(res.get("avisos"))
+
         st.success(f"**Diagnóstico:**\n\n{txt_diagnostico}")
         st.info(f"**Pasos Clave:**\n\n{txt_pasos}")
         
@@ -199,23 +151,4 @@ if st.session_state.resultado_del:
         st.divider()
         
         # --- ZONA DE DESCARGA ---
-        st.subheader("📥 Descargar Plan")
-        c_name, c_type = st.columns([2, 1])
-        with c_name:
-            f_name = st.text_input("Nombre del archivo:", value=f"Delegacion_{nombre_colab.split()[0]}")
-        with c_type:
-            f_fmt = st.radio("Formato:", ["Word (.docx)", "PDF (.pdf)"], horizontal=True)
-            
-        # Generación del archivo seleccionado
-        if f_fmt == "Word (.docx)":
-            b_data, b_mime, b_ext = crear_word(res, tarea, nombre_colab)
-        else:
-            b_data, b_mime, b_ext = crear_pdf(res, tarea, nombre_colab)
-            
-        st.download_button(
-            label=f"💾 Bajar {f_fmt}",
-            data=b_data,
-            file_name=f"{f_name}.{b_ext}",
-            mime=b_mime,
-            use_container_width=True
-        )
\ No newline at end of file
+        zona_descarga(res, tarea, nombre_colab)
\ No newline at end of file
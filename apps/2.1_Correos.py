@@ -1,8 +1,13 @@
 import streamlit as st
-import google.generativeai as genai
-from fpdf import FPDF
-from docx import Document
-import io
+from nucleo.ia import obtener_cliente
+from nucleo.descargas import archivo_en_almacen, descarga_diferida, olvidar_descargas
+from nucleo.memoria import recordar, recuperar
+from nucleo.exportar import exportar, formato_de
+from nucleo.arranque import fragmento
+from nucleo.historial import guardar_resultado, mostrar_historial, pedir_generacion
+from nucleo.secciones import mostrar_avisos
+from nucleo.trabajos import en_curso, lanzar, recoger
+from herramientas import correos
 
 # --- 1. CONFIGURACIÓN ---
 # st.set_page_config(page_title="Traductor Diplomático", layout="centered") # Layout centered para lectura vertical
@@ -22,104 +27,56 @@ import io
 
 # Configurar API Key
 try:
-    api_key = st.secrets["GOOGLE_API_KEY"]
-    genai.configure(api_key=api_key)
+    ia = obtener_cliente()
 except Exception:
     st.error("⚠️ Falta configurar la API Key en .streamlit/secrets.toml")
     st.stop()
 
-# --- 2. LÓGICA IA (Robusta con Separadores) ---
-# --- 2. LÓGICA IA (Robusta con Separadores) ---
-def generar_opciones(texto, destinatario):
+# --- 2. LÓGICA IA (Salida JSON con esquema) ---
+def generar_opciones(trabajo, texto, destinatario):
+    """En segundo plano (ver nucleo/trabajos.py)"""
     try:
-        # Nota: Si "gemma-3-1b-it" te da error, cambia a "gemini-1.5-flash"
-        model = genai.GenerativeModel("models/gemini-2.5-flash") 
-        separador = "|||"
-        
-        # CORRECCIÓN: Ahora incluimos la variable {texto} explícitamente
-        prompt = f"""
-        Actúa como experto en comunicación asertiva.
-        
-        MENSAJE ORIGINAL A REESCRIBIR: "{texto}"
-        
-        OBJETIVO: Reescribe el mensaje anterior para un destinatario: "{destinatario}".
-        
-        Genera 3 versiones. Sigue este formato ESTRICTAMENTE usando el separador "{separador}":
-        
-        Versión Profesional:
-        [Texto aquí]
-        {separador}
-        Versión Directa:
-        [Texto aquí]
-        {separador}
-        Versión Coloquial:
-        [Texto aquí]
-        """
-        
-        response = model.generate_content(prompt)
-        # Limpieza y corte
-        partes = response.text.replace("*", "").split(separador)
-        
-        return {
-            "profesional": partes[0].replace("Versión Profesional:", "").strip() if len(partes) > 0 else "Error",
-            "directo": partes[1].replace("Versión Directa:", "").strip() if len(partes) > 1 else "Error",
-            "coloquial": partes[2].replace("Versión Coloquial:", "").strip() if len(partes) > 2 else "Error"
-        }
+        return correos.generar(ia, {"texto": texto, "destinatario": destinatario})
     except Exception as e:
         return {"error": str(e)}
 
 # --- 3. GENERADORES DE ARCHIVOS ---
+# Memoizado por (contenido, formato) en el almacén en disco: renombrar o cambiar el formato no lo regenera
+@archivo_en_almacen
 def generar_archivo(resultados, original, formato):
-    if formato == "Word (.docx)":
-        doc = Document()
-        doc.add_heading('Propuestas de Comunicación', 0)
-        doc.add_heading('Original:', level=2)
-        doc.add_paragraph(original)
-        
-        doc.add_heading('1. Profesional', level=1)
-        doc.add_paragraph(resultados.get('profesional', ''))
-        
-        doc.add_heading('2. Directo', level=1)
-        doc.add_paragraph(resultados.get('directo', ''))
-        
-        doc.add_heading('3. Coloquial', level=1)
-        doc.add_paragraph(resultados.get('coloquial', ''))
-        
-        bio = io.BytesIO()
-        doc.save(bio)
-        return bio.getvalue(), "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"
-        
-    else: # PDF
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Función limpieza caracteres latinos
-        def L(t): return t.encode('latin-1', 'replace').decode('latin-1') if t else ""
-        
-        pdf.set_font("Arial", 'B', 16)
-        pdf.cell(0, 10, L('Propuestas de Comunicación'), 0, 1, 'C')
-        pdf.ln(5)
-        
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 10, "Original:", 0, 1)
-        pdf.set_font("Arial", size=11)
-        pdf.multi_cell(0, 6, L(original))
-        pdf.ln(5)
-        
-        orden = [("1. Profesional", "profesional"), ("2. Directo", "directo"), ("3. Coloquial", "coloquial")]
-        for tit, key in orden:
-            pdf.set_font("Arial", 'B', 12)
-            pdf.set_text_color(0, 50, 100)
-            pdf.cell(0, 10, L(tit), 0, 1)
-            pdf.set_text_color(0, 0, 0)
-            pdf.set_font("Arial", size=11)
-            pdf.multi_cell(0, 6, L(resultados.get(key, '')))
-            pdf.ln(3)
-            
-        return pdf.output(dest='S').encode('latin-1'), "application/pdf", "pdf"
+    documento = correos.documento(resultados, {"texto": original})
+    return exportar(documento, formato_de(formato), herramienta="correos")
+
+# Fragmento: cambiar el nombre o el formato vuelve a correr solo esta zona, no la página entera
+@fragmento("Correos · descarga")
+def zona_descarga(res, original):
+    st.subheader("📥 Descargar Archivo")
+    
+    col_name, col_type = st.columns([2, 1])
+    with col_name:
+        nombre_archivo = st.text_input("Nombre del archivo:", value="Mis_Propuestas", help="Sin extensión")
+    with col_type:
+        tipo_archivo = st.radio("Formato:", ["Word (.docx)", "PDF (.pdf)"], horizontal=True)
+        
+    # Preparar el archivo (solo al pedirlo)
+    descarga_diferida(
+        "v3", tipo_archivo, lambda: generar_archivo(res, original, tipo_archivo),
+        nombre_archivo=nombre_archivo, etiqueta=f"💾 Bajar en {tipo_archivo}"
+    )
+
+def abrir_propuestas(entrada, res):
+    recordar("resultado_v3", res)
+    olvidar_descargas("v3")
+
+def terminar_propuestas(trabajo):
+    res = trabajo.resultado
+    recordar("resultado_v3", res)
+    guardar_resultado(correos.NOMBRE, trabajo.datos["entrada"], res)
+    olvidar_descargas("v3")
 
 # --- 4. INTERFAZ VISUAL (ORDEN NUEVO) ---
 st.header("Correos Diplomáticos")
+mostrar_historial(correos.NOMBRE, abrir_propuestas)
 st.write("No demores en responder los correos, contesta cómo quieras (palabras, estado de ánimo, garabatos, etc.), y te recomedamos 3 estilos de respuestas asertivas.")
 st.divider()
 
@@ -130,25 +87,26 @@ destinatario = st.selectbox("1. ¿A quién le escribes?",
 texto_input = st.text_area("2. Borrador del texto (sin filtro):", height=120, 
     placeholder="Ej: Necesito que me entregues eso ahora mismo o tendremos problemas...")
 
-# Estado de sesión
-if 'resultado_v3' not in st.session_state:
-    st.session_state.resultado_v3 = None
-
-# Botón de Acción
-if st.button("✨ Generar Propuestas", type="primary", use_container_width=True):
+# Botón de Acción (un borrador casi igual ya respondido se ofrece antes de generar)
+entrada = {"texto": texto_input, "destinatario": destinatario}
+if pedir_generacion(correos.NOMBRE, st.button("✨ Generar Propuestas", type="primary", use_container_width=True, disabled=en_curso("v3")), entrada, abrir_propuestas):
     if not texto_input:
         st.warning("Escribe un borrador primero.")
     else:
-        with st.spinner("Analizando tono y reescribiendo..."):
-            st.session_state.resultado_v3 = generar_opciones(texto_input, destinatario)
+        lanzar("v3", generar_opciones, texto_input, destinatario,
+               mensaje="Analizando tono y reescribiendo...", datos={"entrada": entrada})
+
+generando = recoger("v3", terminar_propuestas)
 
 # 2. RESULTADOS (Vertical: Prof -> Directo -> Coloquial)
-if st.session_state.resultado_v3:
-    res = st.session_state.resultado_v3
+# El resultado vive en la sesión en forma compacta (ver nucleo/memoria.py)
+res = None if generando else recuperar("resultado_v3")
+if res:
     
     if "error" in res:
         st.error(f"Error técnico: {res['error']}")
     else:
+        mostrar_avisos(res.get("avisos"))
         st.markdown("### 📢 Opciones Asertivas")
         
         st.info(f"**👔 Profesional (Formal):**\n\n{res.get('profesional')}")
@@ -158,21 +116,4 @@ if st.session_state.resultado_v3:
         st.divider()
         
         # 3. ZONA DE DESCARGA (Unificada)
-        st.subheader("📥 Descargar Archivo")
-        
-        col_name, col_type = st.columns([2, 1])
-        with col_name:
-            nombre_archivo = st.text_input("Nombre del archivo:", value="Mis_Propuestas", help="Sin extensión")
-        with col_type:
-            tipo_archivo = st.radio("Formato:", ["Word (.docx)", "PDF (.pdf)"], horizontal=True)
-            
-        # Preparar el archivo
-        bytes_data, mime, ext = generar_archivo(res, texto_input, tipo_archivo)
-        
-        st.download_button(
-            label=f"💾 Bajar en {tipo_archivo}",
-            data=bytes_data,
-            file_name=f"{nombre_archivo}.{ext}",
-            mime=mime,
-            use_container_width=True
-        )
\ No newline at end of file
+        zona_descarga(res, texto_input)
\ No newline at end of file
@@ -1,9 +1,12 @@
 import streamlit as st
-import os
-import io
-import google.generativeai as genai
-from docx import Document
-from dotenv import load_dotenv
+from nucleo.ia import obtener_cliente
+from nucleo.secciones import mostrar_avisos, pintar_campos_parciales
+from nucleo.descargas import archivo_en_almacen, descarga_diferida, olvidar_descargas
+from nucleo.memoria import olvidar, recordar, recuperar
+from nucleo.exportar import exportar
+from nucleo.historial import guardar_resultado, mostrar_historial, pedir_generacion
+from nucleo.trabajos import en_curso, lanzar, recoger
+from herramientas import pedidos
 
 # --- 1. CONFIGURACIÓN DE PÁGINA ---
 #st.set_page_config(page_title="Pedidos Impecables", page_icon="🗣️", layout="centered")
@@ -22,71 +25,53 @@ from dotenv import load_dotenv
 
 # --- 3. CONEXIÓN IA (SEGURA) ---
 try:
-    # Intenta leer de los secretos (local o nube)
-    api_key = st.secrets["GOOGLE_API_KEY"]
-    genai.configure(api_key=api_key)
+    # Cliente compartido: lee los secretos (local o nube) una sola vez por proceso
+    ia = obtener_cliente()
 except Exception:
     st.error("⚠️ No se encontró la clave en .streamlit/secrets.toml")
     st.stop()
 
 # --- 4. FUNCIONES LÓGICAS ---
 
-def generar_pedido_ia(oyente, accion, condiciones, tiempo, contexto):
-    """Genera el texto usando Google Gemini"""
+TITULOS = {"guion": "**Guion Sugerido:**", "analisis": "**🧠 Análisis:**"}
+
+def generar_pedido_stream(trabajo, oyente, accion, condiciones, tiempo, contexto):
+    """Genera el guion y el análisis en segundo plano, dejando en el trabajo el texto mientras se escribe.
+    Devuelve (guion, analisis, avisos); si falla, (mensaje de error, "", [])"""
     try:
-        # Usamos gemini-1.5-flash para asegurar compatibilidad
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        
-        prompt = f"""
-        Actúa como un Coach Ontológico experto en Fernando Flores.
-        Redacta un "PEDIDO IMPECABLE" basado en:
-        
-        1. OYENTE: {oyente}
-        2. ACCIÓN: {accion}
-        3. CONDICIONES DE SATISFACCIÓN: {condiciones}
-        4. TIEMPO: {tiempo}
-        5. TRASFONDO: {contexto}
-
-        Genera dos partes separadas claramente por la etiqueta "SECCION_ANALISIS":
-        
-        Parte 1: El GUION (listo para copiar/pegar, tono profesional y asertivo).
-        Parte 2: SECCION_ANALISIS: Una explicación breve de por qué este pedido reduce incertidumbre.
-        """
-        
-        response = model.generate_content(prompt)
-        text = response.text
-        
-        if "SECCION_ANALISIS" in text:
-            parts = text.split("SECCION_ANALISIS")
-            guion = parts[0].replace("SECCION_ANALISIS", "").replace("Parte 1:", "").strip()
-            analisis = parts[1].replace("Parte 2:", "").strip()
-        else:
-            guion = text
-            analisis = "No se generó el análisis detallado."
-            
-        return guion, analisis
+        entrada = {"oyente": oyente, "accion": accion, "condiciones": condiciones, "tiempo": tiempo, "contexto": contexto}
+        res = pedidos.generar(ia, entrada, escribir=trabajo.agregar)
+        return res["guion"], res["analisis"], res["avisos"]
     except Exception as e:
-        return f"Error al generar: {e}", ""
+        return f"Error al generar: {e}", "", []
 
+@archivo_en_almacen
 def crear_docx(guion, analisis):
-    """Crea el archivo Word descargable"""
-    doc = Document()
-    doc.add_heading('PEDIDO IMPECABLE', 0)
-    
-    doc.add_heading('Guion Sugerido:', level=1)
-    doc.add_paragraph(guion)
-    
-    doc.add_heading('Análisis Ontológico:', level=1)
-    doc.add_paragraph(analisis)
-    
-    bio = io.BytesIO()
-    doc.save(bio)
-    bio.seek(0)
-    return bio
+    """Crea el archivo Word descargable (memoizado por contenido)"""
+    documento = pedidos.documento({"guion": guion, "analisis": analisis}, {})
+    return exportar(documento, "docx", herramienta="pedidos")
+
+def abrir_pedido(entrada, res):
+    """Repone un pedido del historial (sin llamar a la IA)"""
+    recordar("pedido", {"guion": res["guion"], "analisis": res["analisis"], "oyente": entrada["oyente"], "avisos": []})
+    olvidar_descargas("pedido")
+
+def terminar_pedido(trabajo):
+    """Recoge el pedido generado en segundo plano"""
+    guion_gen, analisis_gen, avisos = trabajo.resultado
+    # Verificación de error en la respuesta
+    if "Error al generar" in guion_gen:
+        st.error(guion_gen)
+        return
+    entrada = trabajo.datos["entrada"]
+    recordar("pedido", {"guion": guion_gen, "analisis": analisis_gen, "oyente": entrada["oyente"], "avisos": avisos})
+    guardar_resultado(pedidos.NOMBRE, entrada, {"guion": guion_gen, "analisis": analisis_gen})
+    olvidar_descargas("pedido")
 
 # --- 5. INTERFAZ DE USUARIO ---
 
 st.header("Pedidos Impecables")
+mostrar_historial(pedidos.NOMBRE, abrir_pedido)
 # st.caption("Basado en la Ontología del Lenguaje")
 st.write("Ahorra tiempo, recursos, reprocesos, etc., haciendo Pedidos Efectivos a la primera")
 
@@ -101,27 +86,26 @@ with st.container(border=True):
     condiciones = st.text_area("4. ¿Qué condiciones se deben cumplir para que quedes satisfecho con el resultado?", placeholder="Ej: Formato PDF, incluyendo gráficos de Q1", height=100)
     contexto = st.text_area("5. ¿Para qué necesitas lo que pides? (Le indica al otro la importancia para qué lo necesitas)", placeholder="Ej: Para la reunión de directorio del lunes", height=100)
 
-    # Botón de acción
-    if st.button("🚀 GENERAR PEDIDO", type="primary", use_container_width=True):
+    # Botón de acción (un pedido casi igual ya generado se ofrece antes de generar)
+    entrada = {"oyente": oyente, "accion": accion, "tiempo": tiempo, "condiciones": condiciones, "contexto": contexto}
+    if pedir_generacion(pedidos.NOMBRE, st.button("🚀 GENERAR PEDIDO", type="primary", use_container_width=True, disabled=en_curso("pedido")), entrada, abrir_pedido):
         if not oyente or not accion or not tiempo:
             st.warning("⚠️ Faltan datos clave: Oyente, Acción y Tiempo son obligatorios.")
         else:
-            with st.spinner("Construyendo acto del habla con IA..."):
-                guion_gen, analisis_gen = generar_pedido_ia(oyente, accion, condiciones, tiempo, contexto)
-                
-                # Verificación de error en la respuesta
-                if "Error al generar" in guion_gen:
-                    st.error(guion_gen)
-                else:
-                    st.session_state.pedido = {"guion": guion_gen, "analisis": analisis_gen, "oyente": oyente}
-                    st.rerun()
+            # En segundo plano: otro clic o cambiar de página no corta la generación
+            lanzar("pedido", generar_pedido_stream, oyente, accion, condiciones, tiempo, contexto, datos={"entrada": entrada})
+
+    # El acto del habla se construye a la vista, sección por sección
+    generando = recoger("pedido", terminar_pedido, lambda trabajo: pintar_campos_parciales(trabajo.texto(), TITULOS))
 
 # --- 6. RESULTADOS ---
-if 'pedido' in st.session_state:
-    res = st.session_state.pedido
+# El pedido vive en la sesión en forma compacta (ver nucleo/memoria.py)
+res = None if generando else recuperar("pedido")
+if res:
     
     st.divider()
     st.subheader("📄 TU PEDIDO LISTO:")
+    mostrar_avisos(res.get("avisos"))
     
     # Visualización
     st.markdown(f"""
@@ -148,16 +132,12 @@ if 'pedido' in st.session_state:
     
     # Descargar DOCX (Completo)
     with col_d2:
-        docx_file = crear_docx(res['guion'], res['analisis'])
-        st.download_button(
-            label="📝 Descargar Word (.docx)",
-            data=docx_file,
-            file_name=f"pedido_{res['oyente']}.docx",
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            use_container_width=True
+        descarga_diferida(
+            "pedido", "Word (.docx)", lambda: crear_docx(res['guion'], res['analisis']),
+            nombre_archivo=f"pedido_{res['oyente']}", etiqueta="📝 Descargar Word (.docx)"
         )
     
     # Botón reiniciar
     if st.button("🔄 Hacer Nuevo Pedido", use_container_width=True):
-        del st.session_state.pedido
+        olvidar("pedido")
         st.rerun()
\ No newline at end of file
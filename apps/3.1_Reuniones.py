@@ -1,11 +1,14 @@
 import streamlit as st
-import google.generativeai as genai
-from fpdf import FPDF
-from docx import Document
-import pandas as pd
-import io
-import json
-import re
+from nucleo.ia import leer_config, obtener_cliente
+from nucleo.calendario import de_la_semana, leer_ics, semanas
+from nucleo.exportar import MIMES, Documento, Seccion, exportar, exportar_libro, formato_de
+from nucleo.arranque import fragmento
+from nucleo.descargas import archivo_en_almacen
+from nucleo.historial import guardar_resultado, mostrar_historial, pedir_generacion
+from nucleo.memoria import recordar, recuperar
+from nucleo.secciones import mostrar_avisos
+from nucleo.trabajos import en_curso, lanzar, recoger
+from herramientas import reuniones
 
 # --- 1. CONFIGURACIÓN DE PÁGINA ---
 # (Opcional, si da error puedes comentarla)
@@ -13,141 +16,75 @@ import re
 
 # --- 2. CONEXIÓN CON LA IA ---
 try:
-    api_key = st.secrets["GOOGLE_API_KEY"]
-    genai.configure(api_key=api_key)
+    ia = obtener_cliente()
 except Exception:
     st.error("⚠️ Error: No se encontró la API KEY. Revisa el archivo .streamlit/secrets.toml")
     st.stop()
 
 # --- 3. FUNCIONES LÓGICAS ---
-def generar_planificacion(tema, objetivo, duracion):
+def generar_planificacion(trabajo, tema, objetivo, duracion):
+    """En segundo plano. Devuelve (agenda, consejos, avisos); si falla, (None, mensaje de error, [])"""
     try:
-        # CORRECCIÓN: Usamos el modelo correcto "gemini-1.5-flash"
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
-        
-        prompt = f"""
-        Actúa como un Facilitador Experto. Diseña una agenda para una reunión de {duracion} minutos.
-        TEMA: {tema} | OBJETIVO: {objetivo}
-        
-        Responde EXCLUSIVAMENTE con un JSON válido.
-        Estructura:
-        {{
-            "agenda": [
-                {{"minutos": "00-05", "actividad": "Actividad breve", "responsable": "Rol o Nombre"}},
-                {{"minutos": "...", "actividad": "...", "responsable": "..."}}
-            ],
-            "consejos": "Consejo práctico 1... Consejo práctico 2..."
-        }}
-        """
-        response = model.generate_content(prompt)
-        return response.text
+        res = reuniones.generar(ia, {"tema": tema, "objetivo": objetivo, "duracion": duracion})
+        return res["agenda"], res["consejos"], res["avisos"]
     except Exception as e:
-        return str(e)
-
-def procesar_respuesta(texto_completo):
-    try:
-        # Limpieza robusta: Busca el primer "{" y el último "}" para aislar el JSON
-        texto_limpio = texto_completo.replace("```json", "").replace("```", "").strip()
-        
-        # Si la IA puso texto antes o después, lo recortamos
-        inicio = texto_limpio.find("{")
-        fin = texto_limpio.rfind("}") + 1
-        if inicio != -1 and fin != 0:
-            texto_limpio = texto_limpio[inicio:fin]
-
-        datos = json.loads(texto_limpio)
-        return datos.get("agenda", []), datos.get("consejos", "Sin consejos")
-    except Exception as e:
-        return None, f"Error interpretando la respuesta de la IA. Intenta de nuevo. ({e})"
+        return None, f"Error interpretando la respuesta de la IA. Intenta de nuevo. ({e})", []
 
 # --- 4. FUNCIONES DE EXPORTACIÓN ---
-
-def crear_word(tema, objetivo, agenda_lista, consejos):
-    doc = Document()
-    doc.add_heading(f'Plan de Reunión: {tema}', 0)
-    doc.add_paragraph(f"Objetivo: {objetivo}")
-    
-    doc.add_heading('Agenda', level=1)
-    table = doc.add_table(rows=1, cols=3)
-    table.style = 'Table Grid'
-    hdr = table.rows[0].cells
-    hdr[0].text = 'Minutos'
-    hdr[1].text = 'Actividad'
-    hdr[2].text = 'Responsable'
-    
-    for item in agenda_lista:
-        row = table.add_row().cells
-        row[0].text = str(item.get("minutos", ""))
-        row[1].text = str(item.get("actividad", ""))
-        row[2].text = str(item.get("responsable", ""))
-    
-    doc.add_heading('Consejos', level=1)
-    doc.add_paragraph(consejos)
-    
-    bio = io.BytesIO()
-    doc.save(bio)
-    return bio.getvalue(), "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-
-def crear_pdf(tema, objetivo, agenda_lista, consejos):
-    class PDF(FPDF):
-        def header(self):
-            self.set_font('Arial', 'B', 14)
-            self.cell(0, 10, 'Planificador de Reuniones', 0, 1, 'C')
-            self.ln(5)
-
-    pdf = PDF()
-    pdf.add_page()
-    # Función auxiliar para caracteres latinos
-    def L(t): return t.encode('latin-1', 'replace').decode('latin-1') if t else ""
-
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 10, L(f"Tema: {tema}"), 0, 1)
-    pdf.set_font("Arial", '', 11)
-    pdf.multi_cell(0, 6, L(f"Objetivo: {objetivo}"))
-    pdf.ln(5)
+@archivo_en_almacen
+def crear_archivo(tema, objetivo, agenda_lista, consejos, formato):
+    documento = reuniones.documento({"agenda": agenda_lista, "consejos": consejos}, {"tema": tema, "objetivo": objetivo})
+    return exportar(documento, formato_de(formato), herramienta="reuniones")
+
+# Fragmento: el nombre, el formato y "Descargar ahora" vuelven a correr solo esta zona
+@fragmento("Reuniones · descarga")
+def zona_descarga(tema, objetivo, agenda, consejos):
+    st.subheader("📥 Descargar Archivo")
     
-    # Tabla
-    pdf.set_fill_color(240, 240, 240)
-    pdf.set_font("Arial", 'B', 10)
-    pdf.cell(30, 10, "Minutos", 1, 0, 'C', 1)
-    pdf.cell(110, 10, "Actividad", 1, 0, 'C', 1)
-    pdf.cell(50, 10, "Responsable", 1, 1, 'C', 1)
+    # Configuración de descarga
+    c_nombre, c_tipo = st.columns([2, 1])
     
-    pdf.set_font("Arial", '', 10)
-    for item in agenda_lista:
-        pdf.cell(30, 10, L(str(item.get("minutos", ""))), 1)
-        pdf.cell(110, 10, L(str(item.get("actividad", ""))), 1)
-        pdf.cell(50, 10, L(str(item.get("responsable", ""))), 1, 1)
-        
-    pdf.ln(5)
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 10, "Consejos:", 0, 1)
-    pdf.set_font("Arial", '', 11)
-    pdf.multi_cell(0, 6, L(consejos))
+    with c_nombre:
+        nombre_archivo = st.text_input("Nombre del archivo:", value="Agenda_Reunion")
     
-    return pdf.output(dest='S').encode('latin-1'), "application/pdf"
-
-def crear_excel(tema, objetivo, agenda_lista, consejos):
-    # Creamos un DataFrame con los datos de la agenda
-    df = pd.DataFrame(agenda_lista)
+    with c_tipo:
+        tipo_archivo = st.radio("Formato:", ["Word", "PDF", "Excel", "Texto"], horizontal=True)
     
-    output = io.BytesIO()
-    # Usamos ExcelWriter para guardar
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Agenda')
-        
-        # Guardamos los consejos y objetivos en otra hoja
-        info_extra = pd.DataFrame([
-            {"Dato": "Tema", "Valor": tema},
-            {"Dato": "Objetivo", "Valor": objetivo},
-            {"Dato": "Consejos", "Valor": consejos}
-        ])
-        info_extra.to_excel(writer, index=False, sheet_name='Detalles')
-        
-    return output.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    # Botón de descarga
+    if st.button("💾 Descargar ahora"):
+        try:
+            archivo_data, mime_type, ext = crear_archivo(tema, objetivo, agenda, consejos, tipo_archivo)
+                
+            st.download_button(
+                label=f"Confirmar descarga {ext}",
+                data=archivo_data,
+                file_name=f"{nombre_archivo}.{ext}",
+                mime=mime_type,
+                use_container_width=True
+            )
+        except Exception as e:
+            st.error(f"Error generando el archivo: {e}")
+
+def abrir_agenda(entrada, res):
+    """Repone una agenda del historial (sin llamar a la IA)"""
+    recordar("resultado_agenda", res["agenda"])
+    st.session_state.consejos_agenda = res["consejos"]
+    st.session_state.avisos_agenda = []
+
+def terminar_agenda(trabajo):
+    """Recoge la agenda generada en segundo plano"""
+    agenda_data, consejos_data, avisos = trabajo.resultado
+    if agenda_data:
+        recordar("resultado_agenda", agenda_data)
+        st.session_state.consejos_agenda = consejos_data
+        st.session_state.avisos_agenda = avisos
+        guardar_resultado(reuniones.NOMBRE, trabajo.datos["entrada"], {"agenda": agenda_data, "consejos": consejos_data})
+    else:
+        st.error(consejos_data)
 
 # --- 5. INTERFAZ ---
 st.header("Planificador de Reuniones")
+mostrar_historial(reuniones.NOMBRE, abrir_agenda)
 st.write("Planifica tus reuniones en segundos, asignando tiempo intervención, temas a tratar y responsables.")
 st.divider()
 
@@ -158,66 +95,99 @@ with col1:
 with col2:
     duracion_input = st.selectbox("Minutos:", [15, 30, 45, 60], index=1)
 
-if 'resultado_agenda' not in st.session_state:
-    st.session_state.resultado_agenda = None
-    st.session_state.consejos_agenda = None
-
-if st.button("⚡ Generar Planificación", type="primary", use_container_width=True):
+# Una reunión casi igual ya planificada se ofrece antes de generar
+entrada = {"tema": tema_input, "objetivo": obj_input, "duracion": duracion_input}
+if pedir_generacion(reuniones.NOMBRE, st.button("⚡ Generar Planificación", type="primary", use_container_width=True, disabled=en_curso("agenda")), entrada, abrir_agenda):
     if not tema_input or not obj_input:
         st.warning("⚠️ Completa los campos.")
     else:
-        with st.spinner("Creando estrategia..."):
-            texto_raw = generar_planificacion(tema_input, obj_input, duracion_input)
-            agenda_data, consejos_data = procesar_respuesta(texto_raw)
-            
-            if agenda_data:
-                st.session_state.resultado_agenda = agenda_data
-                st.session_state.consejos_agenda = consejos_data
-            else:
-                st.error(consejos_data)
+        lanzar("agenda", generar_planificacion, tema_input, obj_input, duracion_input,
+               mensaje="Creando estrategia...", datos={"entrada": entrada})
+
+generando = recoger("agenda", terminar_agenda)
 
 # RESULTADOS Y DESCARGA
-if st.session_state.resultado_agenda:
+# La agenda vive en la sesión en forma compacta (ver nucleo/memoria.py)
+agenda = None if generando else recuperar("resultado_agenda")
+if agenda:
     st.subheader("📋 Tu Agenda")
-    # Convertimos a DataFrame para mostrarlo bonito en pantalla
-    st.table(pd.DataFrame(st.session_state.resultado_agenda))
+    mostrar_avisos(st.session_state.get("avisos_agenda"))
+    # st.table acepta la lista de filas tal cual: sin importar pandas en la página
+    st.table(agenda)
     st.info(f"**💡 Tips:** {st.session_state.consejos_agenda}")
     
     st.divider()
-    st.subheader("📥 Descargar Archivo")
-    
-    # Configuración de descarga
-    c_nombre, c_tipo = st.columns([2, 1])
-    
-    with c_nombre:
-        nombre_archivo = st.text_input("Nombre del archivo:", value="Agenda_Reunion")
-    
-    with c_tipo:
-        tipo_archivo = st.radio("Formato:", ["Word", "PDF", "Excel"], horizontal=True)
-    
-    # Botón de descarga
-    if st.button("💾 Descargar ahora"):
-        archivo_data = None
-        mime_type = ""
-        ext = ""
-        
-        try:
-            if tipo_archivo == "Word":
-                archivo_data, mime_type = crear_word(tema_input, obj_input, st.session_state.resultado_agenda, st.session_state.consejos_agenda)
-                ext = "docx"
-            elif tipo_archivo == "PDF":
-                archivo_data, mime_type = crear_pdf(tema_input, obj_input, st.session_state.resultado_agenda, st.session_state.consejos_agenda)
-                ext = "pdf"
-            elif tipo_archivo == "Excel":
-                archivo_data, mime_type = crear_excel(tema_input, obj_input, st.session_state.resultado_agenda, st.session_state.consejos_agenda)
-                ext = "xlsx"
-                
-            st.download_button(
-                label=f"Confirmar descarga {ext}",
-                data=archivo_data,
-                file_name=f"{nombre_archivo}.{ext}",
-                mime=mime_type,
-                use_container_width=True
+    zona_descarga(tema_input, obj_input, agenda, st.session_state.consejos_agenda)
+# --- 6. SEMANA DESDE EL CALENDARIO ---
+def crear_libro_semana(eventos, resultados):
+    """Un Excel con una hoja por reunión; las que fallaron llevan el error en su hoja."""
+    hojas = []
+    for evento, res in zip(eventos, resultados):
+        if isinstance(res, dict):
+            documento = reuniones.documento(res, evento.entrada())
+        else:
+            documento = Documento(
+                titulo=f"Plan de Reunión: {evento.tema}",
+                secciones=[Seccion("No se pudo generar la agenda", str(res))],
             )
-        except Exception as e:
-            st.error(f"Error generando el archivo: {e}")
\ No newline at end of file
+        documento.datos.insert(0, ("Fecha", evento.cuando()))
+        hojas.append((f"{evento.cuando()} {evento.tema}", documento))
+    return exportar_libro(hojas, herramienta="reuniones")
+
+def planificar_semana(trabajo, eventos_semana):
+    """En segundo plano: todas las agendas de la semana y su Excel, informando el avance"""
+    resultados = [None] * len(eventos_semana)
+    entradas = [e.entrada() for e in eventos_semana]
+    for hechas, (i, res, error) in enumerate(reuniones.generar_varias(ia, entradas), 1):
+        resultados[i] = res if error is None else f"Error de la IA: {error}"
+        trabajo.informar(hechas / len(entradas), f"{hechas} de {len(entradas)} agendas listas")
+    return {
+        "libro": crear_libro_semana(eventos_semana, resultados)[0],
+        "correctas": [(e, r) for e, r in zip(entradas, resultados) if isinstance(r, dict)],
+        "fallidas": sum(not isinstance(r, dict) for r in resultados),
+    }
+
+def terminar_semana(trabajo):
+    for entrada_reunion, res in trabajo.resultado["correctas"]:
+        guardar_resultado(reuniones.NOMBRE, entrada_reunion, res)
+    # El Excel de la semana puede ser grande: queda en disco si no cabe en la sesión
+    recordar("libro_semana", trabajo.resultado["libro"])
+    st.session_state.fallidas_semana = trabajo.resultado["fallidas"]
+    st.session_state.nombre_semana = trabajo.datos["nombre"]
+
+st.divider()
+st.subheader("📆 Planificar la semana desde tu calendario")
+st.write("Sube el calendario exportado (.ics de Google Calendar u Outlook) y recibe la agenda de cada reunión de la semana en un solo Excel.")
+
+archivo_ics = st.file_uploader("Calendario (.ics):", type=["ics"])
+if archivo_ics:
+    # Se lee aquí mismo: el calendario no sale del servidor salvo tema y descripción de cada reunión
+    # Horas en la zona del navegador (o ZONA_HORARIA, Ej: "America/Santiago"), no la del servidor
+    zona = getattr(st.context, "timezone", None) or leer_config("ZONA_HORARIA")
+    eventos = leer_ics(archivo_ics.getvalue(), zona=zona)
+    if not eventos:
+        st.warning("⚠️ No se encontraron reuniones con hora en el calendario.")
+    else:
+        lunes = st.selectbox("Semana:", semanas(eventos), format_func=lambda d: f"Semana del {d:%d/%m/%Y}")
+        eventos_semana = de_la_semana(eventos, lunes)
+        st.table([{"Cuándo": e.cuando(), "Tema": e.tema, "Minutos": e.duracion} for e in eventos_semana])
+
+        if st.button(f"⚡ Planificar {len(eventos_semana)} reuniones", type="primary", use_container_width=True,
+                     disabled=en_curso("semana")):
+            lanzar("semana", planificar_semana, eventos_semana, mensaje="Creando agendas...",
+                   datos={"nombre": f"Agendas_semana_{lunes:%Y-%m-%d}"})
+
+# La barra de avance sigue aunque se cambie de página o se quite el calendario
+generando_semana = recoger("semana", terminar_semana)
+
+libro_semana = None if generando_semana else recuperar("libro_semana")
+if libro_semana:
+    if st.session_state.fallidas_semana:
+        st.warning(f"⚠️ {st.session_state.fallidas_semana} agendas no se pudieron generar; su hoja indica el error.")
+    st.download_button(
+        label="💾 Descargar agendas de la semana (.xlsx)",
+        data=libro_semana,
+        file_name=f"{st.session_state.nombre_semana}.xlsx",
+        mime=MIMES["xlsx"],
+        use_container_width=True,
+    )
@@ -1,7 +1,14 @@
 import streamlit as st
-import json
-import google.generativeai as genai
-import os
+from nucleo.cache import CacheRespuestas
+from nucleo.ia import leer_config, obtener_cliente
+from nucleo.historial import (
+    aceptar_resultado, dueno_actual, guardar_resultado, mostrar_historial, obtener_historial, pedir_generacion,
+)
+from nucleo.memoria import recordar, recuperar
+from nucleo.preclasificador import Preclasificador, ejemplos_de
+from nucleo.secciones import mostrar_avisos
+from nucleo.trabajos import en_curso, lanzar, recoger
+from herramientas import priorizador
 
 # --- 1. CONFIGURACIÓN DE PÁGINA ---
 #st.set_page_config(page_title="Priorizador Eisenhower", page_icon="🛡️", layout="wide")
@@ -17,16 +24,46 @@ import os
 
 # --- 2. CONEXIÓN SEGURA (CLOUD & LOCAL) ---
 try:
-    # Intenta leer la clave desde los secretos de Streamlit (secrets.toml o Cloud)
-    api_key = st.secrets["GOOGLE_API_KEY"]
-    genai.configure(api_key=api_key)
+    # Cliente compartido: lee la clave (secrets.toml o Cloud) una sola vez por proceso
+    ia = obtener_cliente()
 except Exception:
     st.error("⚠️ Error de Seguridad: No se encontró la API KEY.")
     st.info("Nota: Si estás en local, asegura que exista .streamlit/secrets.toml. Si estás en la nube, configúrala en los 'Secrets' del dashboard.")
     st.stop()
 
+@st.cache_resource(show_spinner=False)
+def obtener_clasificaciones():
+    """Cuadrante de cada tarea ya clasificada (por texto, rol y usuario). Un solo almacén para todo
+    el proceso, pero cada clave lleva el dueño: al volver con la misma lista y unas líneas nuevas,
+    solo esas van a la IA, y nadie recibe lo que clasificó otro."""
+    return CacheRespuestas(
+        max_entradas=int(leer_config("PRIORIZADOR_MAX_TAREAS", 20000)),
+        ttl=float(leer_config("PRIORIZADOR_TTL_SEGUNDOS", 30 * 24 * 3600)),
+        ruta=leer_config("PRIORIZADOR_RUTA"),  # Ej: ".priorizador.sqlite" para sobrevivir a reinicios
+    )
+
+@st.cache_resource(ttl=3600, max_entries=200, show_spinner=False)
+def obtener_preclasificador(dueno):
+    """Reglas locales más un modelo entrenado con las clasificaciones que ese usuario aceptó en el
+    historial (si lo hay), cada tarea una vez; se vuelve a entrenar cada hora para sumar lo aceptado
+    desde entonces."""
+    historial = obtener_historial()
+    resultados = historial.resultados(priorizador.NOMBRE, dueno, limite=2000, aceptados=True) if historial else []
+    return Preclasificador(ejemplos_de(resultados, priorizador.CUADRANTES, clave=priorizador.clave_tarea))
+
+def abrir_prioridades(entrada, res):
+    """Repone una clasificación del historial (sin llamar a la IA); al reabrirla ya quedó aceptada"""
+    st.session_state.pop("_id_prioridades", None)
+    recordar("resultado_prioridades", res)
+
+def aceptar_prioridades():
+    """El usuario da por buena la clasificación: desde ahora entrena al preclasificador"""
+    aceptar_resultado(st.session_state.pop("_id_prioridades", None))
+    st.toast("👍 Gracias: se usará para clasificar tus próximas listas.")
+
 # --- 3. INTERFAZ DE USUARIO ---
 st.header("Priorizador de Tareas")
+mostrar_historial(priorizador.NOMBRE, abrir_prioridades)
 st.write("Clasifica todas tus tareas de acuerdo a la Matriz de Heinsehower.")
 st.divider()
 
@@ -46,76 +83,86 @@ tasks_input = st.text_area(
 )
 
 # --- 4. LÓGICA DE INTELIGENCIA ARTIFICIAL ---
-def analyze_tasks(tasks, role):
-    try:
-        # Usamos un modelo fijo y rápido (Flash) para que el usuario no tenga que elegir
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        
-        prompt = f"""
-        Actúa como un experto en productividad para un "{role}".
-        Clasifica estas tareas en la Matriz de Eisenhower.
-        
-        TAREAS:
-        {tasks}
-        
-        FORMATO JSON REQUERIDO (Estrictamente solo JSON):
-        {{
-            "hacer": ["tarea 1", "tarea 2"],
-            "planificar": ["tarea 3"],
-            "delegar": ["tarea 4"],
-            "eliminar": ["tarea 5"],
-            "recomendacion_top": "Un consejo breve de una frase sobre el foco de hoy"
-        }}
-        """
-        response = model.generate_content(prompt)
-        # Limpieza de la respuesta para asegurar JSON puro
-        clean_text = response.text.replace("```json", "").replace("```", "").strip()
-        return json.loads(clean_text)
-
-    except Exception as e:
-        st.error(f"Error al procesar: {e}")
-        return None
+def analyze_tasks(trabajo, tasks, role, clasificadas, preclasificar, dueno):
+    """En segundo plano: clasifica en local las obvias y por bloques en paralelo las nuevas o editadas
+    (ver herramientas/priorizador.py). Si falla todo, el error queda en el trabajo."""
+    return priorizador.generar(ia, {"tareas": tasks, "rol": role}, clasificadas, preclasificar, dueno)
+
+def terminar_prioridades(trabajo):
+    """Recoge la clasificación hecha en segundo plano"""
+    if trabajo.error:
+        st.error(f"Error al procesar: {trabajo.error}")
+    result = trabajo.resultado
+    recordar("resultado_prioridades", result)
+    st.session_state.pop("_id_prioridades", None)
+    # Un bloque fallido solo deja sin clasificar sus propias tareas
+    if result and result["errores"]:
+        st.error(f"Error al procesar: {result['errores'][0]}")
+        st.warning("⚠️ Estas tareas no se pudieron clasificar, intenta de nuevo:\n\n" + "\n".join(f"• {t}" for t in result["sin_clasificar"]))
+    elif result:
+        st.session_state["_id_prioridades"] = guardar_resultado(priorizador.NOMBRE, trabajo.datos["entrada"], result)
+    if result and result.get("reutilizadas"):
+        st.caption(f"♻️ {result['reutilizadas']} tareas ya estaban clasificadas; solo se analizaron las nuevas o editadas.")
+    if result and result.get("locales"):
+        st.caption(f"⚡ {len(result['locales'])} tareas obvias se resolvieron al instante, sin IA.")
 
 # --- 5. EJECUCIÓN ---
-if st.button("🚀 Priorizar Ahora", type="primary", use_container_width=True):
+# El resultado queda en la sesión (en forma compacta, ver nucleo/memoria.py): así también
+# se puede reabrir uno del historial
+# La misma lista (aunque cambie el orden o alguna palabra) se ofrece antes de volver a clasificar
+entrada = {"tareas": tasks_input, "rol": user_role}
+if pedir_generacion(priorizador.NOMBRE, st.button("🚀 Priorizar Ahora", type="primary", use_container_width=True, disabled=en_curso("prioridades")), entrada, abrir_prioridades):
     if not tasks_input:
         st.warning("⚠️ La lista está vacía. Escribe algo para comenzar.")
     else:
-        with st.spinner("Analizando urgencia e importancia..."):
-            result = analyze_tasks(tasks_input, user_role)
-            
-            if result:
-                st.divider()
-                
-                # Fila superior
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.success("🔥 1. HACER YA (Urgente e Importante)")
-                    for t in result.get("hacer", []): st.write(f"• {t}")
-                    if not result.get("hacer"): st.write("*Nada por aquí*")
-                
-                with col2:
-                    st.info("📅 2. PLANIFICAR (No Urgente pero Importante)")
-                    for t in result.get("planificar", []): st.write(f"• {t}")
-                    if not result.get("planificar"): st.write("*Nada por aquí*")
-
-                st.divider()
-
-                # Fila inferior
-                col3, col4 = st.columns(2)
-                with col3:
-                    st.warning("🤝 3. DELEGAR (Urgente pero No Importante)")
-                    for t in result.get("delegar", []): st.write(f"• {t}")
-                    if not result.get("delegar"): st.write("*Nada por aquí*")
-                
-                with col4:
-                    st.error("🗑️ 4. ELIMINAR (Ni Urgente ni Importante)")
-                    for t in result.get("eliminar", []): st.write(f"• {t}")
-                    if not result.get("eliminar"): st.write("*Nada por aquí*")
-                
-                # Consejo final
-                st.markdown(f"""
-                <div style="background-color:#f0f2f6;padding:15px;border-radius:10px;margin-top:20px;text-align:center;">
-                    <b>💡 Consejo del Coach:</b> {result.get('recomendacion_top', '')}
-                </div>
-                """, unsafe_allow_html=True)
\ No newline at end of file
+        # Las instancias compartidas se piden aquí: el trabajo corre fuera de la sesión
+        lanzar(
+            "prioridades", analyze_tasks, tasks_input, user_role,
+            obtener_clasificaciones(), obtener_preclasificador(dueno_actual()), dueno_actual(),
+            mensaje="Analizando urgencia e importancia...", datos={"entrada": entrada},
+        )
+
+generando = recoger("prioridades", terminar_prioridades)
+
+# --- 6. RESULTADOS ---
+result = None if generando else recuperar("resultado_prioridades")
+if result:
+    mostrar_avisos(result.get("avisos"))
+    st.divider()
+    
+    # Fila superior
+    col1, col2 = st.columns(2)
+    with col1:
+        st.success("🔥 1. HACER YA (Urgente e Importante)")
+        for t in result.get("hacer", []): st.write(f"• {t}")
+        if not result.get("hacer"): st.write("*Nada por aquí*")
+    
+    with col2:
+        st.info("📅 2. PLANIFICAR (No Urgente pero Importante)")
+        for t in result.get("planificar", []): st.write(f"• {t}")
+        if not result.get("planificar"): st.write("*Nada por aquí*")
+
+    st.divider()
+
+    # Fila inferior
+    col3, col4 = st.columns(2)
+    with col3:
+        st.warning("🤝 3. DELEGAR (Urgente pero No Importante)")
+        for t in result.get("delegar", []): st.write(f"• {t}")
+        if not result.get("delegar"): st.write("*Nada por aquí*")
+    
+    with col4:
+        st.error("🗑️ 4. ELIMINAR (Ni Urgente ni Importante)")
+        for t in result.get("eliminar", []): st.write(f"• {t}")
+        if not result.get("eliminar"): st.write("*Nada por aquí*")
+    
+    # Consejo final
+    st.markdown(f"""
+    <div style="background-color:#f0f2f6;padding:15px;border-radius:10px;margin-top:20px;text-align:center;">
+        <b>💡 Consejo del Coach:</b> {result.get('recomendacion_top', '')}
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Solo lo aceptado entrena al preclasificador (ver obtener_preclasificador)
+    if st.session_state.get("_id_prioridades"):
+        st.button("👍 Esta clasificación me sirve", on_click=aceptar_prioridades, use_container_width=True)
\ No newline at end of file
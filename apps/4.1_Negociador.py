@@ -1,7 +1,12 @@
 import streamlit as st
-import google.generativeai as genai
-from docx import Document
-import io
+from nucleo.ia import obtener_cliente
+from nucleo.secciones import mostrar_avisos, pintar_campos_parciales
+from nucleo.descargas import archivo_en_almacen
+from nucleo.exportar import exportar
+from nucleo.historial import guardar_resultado, mostrar_historial, pedir_generacion
+from nucleo.memoria import recordar, recuperar
+from nucleo.trabajos import en_curso, lanzar, recoger
+from herramientas import negociador
 
 # --- 1. CONFIGURACIÓN ---
 # Nota: Si este archivo se ejecuta desde Inicio.py, esta línea podría ser ignorada.
@@ -9,76 +14,42 @@ import io
 
 # --- 2. CONEXIÓN IA ---
 try:
-    api_key = st.secrets["GOOGLE_API_KEY"]
-    genai.configure(api_key=api_key)
+    ia = obtener_cliente()
 except Exception:
     st.error("⚠️ Falta API Key. Asegúrate de tener el archivo .streamlit/secrets.toml configurado.")
     st.stop()
 
 # --- 3. LÓGICA HARVARD ---
-def analizar_negociacion(rol, contraparte, problema, intereses_mios, intereses_ellos, maan):
+SECCIONES_HARVARD = negociador.SECCIONES_HARVARD
+TITULOS = {clave: f"#### {titulo}" for clave, titulo in SECCIONES_HARVARD}
+
+def entrada_negociacion(rol, contraparte, problema, intereses_mios, intereses_ellos, maan):
+    return {"rol": rol, "contraparte": contraparte, "problema": problema,
+            "intereses_mios": intereses_mios, "intereses_ellos": intereses_ellos, "maan": maan}
+
+def analizar_negociacion_stream(trabajo, rol, contraparte, problema, intereses_mios, intereses_ellos, maan):
+    """En segundo plano: deja en el trabajo cada sección de la hoja de ruta en cuanto llegan sus tokens"""
     try:
-        # CORRECCIÓN: Usamos el modelo correcto
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
-        
-        prompt = f"""
-        Actúa como un Experto en Negociación del 'Harvard Negotiation Project' (Fisher & Ury).
-        Tu cliente es un novato que necesita una guía paso a paso.
-        
-        CONTEXTO:
-        - Usuario: {rol}
-        - Contraparte: {contraparte}
-        - Conflicto: {problema}
-        - Intereses del Usuario (Subyacentes): {intereses_mios}
-        - Intereses de la Contraparte (Estimados): {intereses_ellos}
-        - MAAN (Plan B si no hay acuerdo): {maan}
-        
-        TAREA: Genera una hoja de ruta estratégica.
-        
-        FORMATO DE RESPUESTA (Usa Títulos en Negrita):
-        
-        1. DIAGNÓSTICO DE PODER
-        Analiza el MAAN del usuario. ¿Es fuerte o débil? ¿Debe revelarlo o mejorarlo?
-        
-        2. ESTRATEGIA A: CREACIÓN DE VALOR (Ideal)
-        Diseña una propuesta que satisfaga los intereses de ambos (Opciones de Mutuo Beneficio).
-        - Propuesta creativa: [Detalle]
-        - Frase de apertura ("Speech"): [Escribe el guion exacto]
-        
-        3. ESTRATEGIA B: CRITERIOS OBJETIVOS (Defensiva)
-        Si la contraparte se pone dura o regatea por posición.
-        - Qué estándar independiente usar (precios de mercado, leyes, precedentes).
-        - Frase para re-encuadrar: "No hablemos de lo que tú quieres o yo quiero, veamos qué es lo justo basado en..."
-        
-        4. PREGUNTAS PODEROSAS
-        3 preguntas que el usuario debe hacer para descubrir más información en la mesa.
-        """
-        
-        response = model.generate_content(prompt)
-        return response.text
+        entrada = entrada_negociacion(rol, contraparte, problema, intereses_mios, intereses_ellos, maan)
+        return negociador.generar(ia, entrada, escribir=trabajo.agregar)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return {"error": str(e)}
 
-# --- ESTA ES LA FUNCIÓN QUE FALTABA ---
-def crear_docx(texto):
-    doc = Document()
-    doc.add_heading('Plan de Negociación Harvard', 0)
-    
-    # Limpieza básica para el Word
-    lines = texto.split('\n')
-    for line in lines:
-        # Detectamos si es un título para darle formato
-        if "DIAGNÓSTICO" in line or "ESTRATEGIA" in line or "PREGUNTAS" in line:
-            doc.add_heading(line.replace('*', ''), level=1)
-        else:
-            doc.add_paragraph(line.replace('*', ''))
-            
-    bio = io.BytesIO()
-    doc.save(bio)
-    return bio.getvalue()
+# Se muestra en cada rerun: memoizado por contenido en el almacén en disco
+@archivo_en_almacen
+def crear_docx(secciones):
+    return exportar(negociador.documento(secciones, {}), "docx", herramienta="negociador")
+
+def abrir_estrategia(entrada, res):
+    recordar("resultado_negociacion", res)
+
+def terminar_estrategia(trabajo):
+    recordar("resultado_negociacion", trabajo.resultado)
+    guardar_resultado(negociador.NOMBRE, trabajo.datos["entrada"], trabajo.resultado, titulo=trabajo.datos["titulo"])
 
 # --- 4. INTERFAZ ---
 st.header("El Negociador Harvard")
+mostrar_historial(negociador.NOMBRE, abrir_estrategia)
 st.write("Negocia por intereses (Personas) y no por posición (Problema).")
 
 with st.expander("📚 ¿Qué es el Método Harvard? (Leer antes de empezar)"):
@@ -107,32 +78,45 @@ st.header("Tu Poder (MAAN)")
 st.caption("MAAN = Mejor Alternativa al Acuerdo Negociado. Es tu Plan B real.")
 maan = st.text_input("Si NO llegas a un acuerdo, ¿qué harás?", placeholder="Ej: Tengo otra oferta lista de la empresa X / Me quedo sin cliente.")
 
-# Inicializar estado
-if 'resultado_negociacion' not in st.session_state:
-    st.session_state.resultado_negociacion = None
-
-if st.button("🧠 Generar Estrategias", type="primary"):
+# Un caso casi igual ya analizado se ofrece antes de generar
+entrada = entrada_negociacion(rol, contraparte, problema, intereses_mios, intereses_ellos, maan)
+if pedir_generacion(negociador.NOMBRE, st.button("🧠 Generar Estrategias", type="primary", disabled=en_curso("negociacion")), entrada, abrir_estrategia):
     if not intereses_mios or not maan:
         st.warning("⚠️ Para Harvard, es crucial definir tus Intereses y tu MAAN.")
     else:
-        with st.spinner("Analizando intereses y opciones de mutuo beneficio..."):
-            estrategia = analizar_negociacion(rol, contraparte, problema, intereses_mios, intereses_ellos, maan)
-            st.session_state.resultado_negociacion = estrategia
+        lanzar(
+            "negociacion", analizar_negociacion_stream, rol, contraparte, problema, intereses_mios, intereses_ellos, maan,
+            datos={"entrada": entrada, "titulo": problema or intereses_mios},
+        )
+
+def mostrar_secciones(trabajo):
+    st.caption("Analizando intereses y opciones de mutuo beneficio...")
+    pintar_campos_parciales(trabajo.texto(), TITULOS)
+
+generando = recoger("negociacion", terminar_estrategia, mostrar_secciones)
 
 # --- 5. RESULTADOS ---
-if st.session_state.resultado_negociacion:
-    res = st.session_state.resultado_negociacion
+# El resultado vive en la sesión en forma compacta (ver nucleo/memoria.py)
+res = None if generando else recuperar("resultado_negociacion")
+if res:
     
     st.divider()
     st.subheader("📋 Hoja de Ruta")
-    st.markdown(res)
-    
-    # Descarga
-    docx = crear_docx(res)
-    st.download_button(
-        label="📥 Descargar Plan (.docx)",
-        data=docx,
-        file_name="Estrategia_Harvard.docx",
-        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        use_container_width=True
-    )
\ No newline at end of file
+    if "error" in res:
+        st.error(f"Error: {res['error']}")
+    else:
+        mostrar_avisos(res.get("avisos"))
+        for clave, titulo in SECCIONES_HARVARD:
+            with st.container(border=True):
+                st.markdown(f"#### {titulo}")
+                st.markdown(res.get(clave, ""))
+        
+        # Descarga
+        docx = crear_docx(res)[0]
+        st.download_button(
+            label="📥 Descargar Plan (.docx)",
+            data=docx,
+            file_name="Estrategia_Harvard.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            use_container_width=True
+        )
\ No newline at end of file
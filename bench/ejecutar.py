@@ -0,0 +1,197 @@
+"""Micro-benchmarks sin red ni API key de los parsers y exportadores.
+
+Uso (desde la raíz del repo):
+    python -m bench.ejecutar --salida bench_resultado.json
+    python -m bench.ejecutar --comparar bench_anterior.json --umbral 1.25
+    python -m bench.ejecutar --filtro exportar/reuniones
+
+Las respuestas del modelo están grabadas en bench/fixtures/; cada una se mide también
+en una versión "larga" (campos y listas repetidos --factor-largo veces).
+Los PDF usan la TTF Unicode si hay una (ver nucleo/exportar.py, PDF_FUENTE); los casos
+"pdf_fuente_en_frio" vuelven a leer la fuente en cada exportación, como referencia.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from herramientas import HERRAMIENTAS, completar_entrada
+from nucleo.estructurado import campos_fallidos, convertir, leer_json
+from nucleo.exportar import RENDERIZADORES, _fuente_unicode, _subconjunto_ttf, exportar
+from nucleo.preclasificador import por_reglas
+from nucleo.secciones import campos_json_incrementales
+
+FIXTURES = Path(__file__).parent / "fixtures"
+TAMANO_TROZO = 16  # caracteres por "token" al simular el streaming
+
+
+# --- 1. DATOS DE ENTRADA ---
+def cargar_fixtures(factor_largo):
+    casos = []
+    for ruta in sorted(FIXTURES.glob("*.json")):
+        fixture = json.loads(ruta.read_text(encoding="utf-8"))
+        modulo = HERRAMIENTAS[fixture["herramienta"]]
+        entrada = completar_entrada(modulo, fixture["entrada"])
+        casos.append((fixture["herramienta"], modulo, entrada, fixture["respuesta"]))
+        largo = json.dumps(alargar(leer_json(fixture["respuesta"]), factor_largo), ensure_ascii=False)
+        casos.append((f"{fixture['herramienta']}/largo", modulo, entrada, largo))
+    return casos
+
+
+def alargar(valor, factor):
+    if isinstance(valor, dict):
+        return {k: alargar(v, factor) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return valor * factor
+    if isinstance(valor, str):
+        return "\n\n".join([valor] * factor)
+    return valor
+
+
+def parsear(tipo, texto):
+    datos = leer_json(texto)
+    if campos_fallidos(tipo, datos):
+        raise ValueError("fixture inválido")
+    return convertir(tipo, datos)
+
+
+def consumir_stream(texto):
+    trozos = (texto[i:i + TAMANO_TROZO] for i in range(0, len(texto), TAMANO_TROZO))
+    for _ in campos_json_incrementales(trozos):
+        pass
+
+
+def construir_casos(factor_largo):
+    for nombre, modulo, entrada, texto in cargar_fixtures(factor_largo):
+        tamano = len(texto.encode("utf-8"))
+        yield f"parsear/{nombre}", tamano, (lambda t=modulo.ESQUEMA, x=texto: parsear(t, x))
+        yield f"stream/{nombre}", tamano, (lambda x=texto: consumir_stream(x))
+        # El mismo documento que arma la página (o lote.py) para ese resultado
+        documento = modulo.documento(modulo.resultado(parsear(modulo.ESQUEMA, texto)), entrada)
+        for formato in RENDERIZADORES:
+            yield f"exportar/{nombre}/{formato}", tamano, (lambda d=documento, f=formato: exportar(d, f, "bench"))
+        if modulo.NOMBRE == "priorizador":
+            # Las reglas locales sobre las mismas tareas: lo que cuesta evitar la IA en las obvias
+            tareas = [t for c in modulo.CUADRANTES for t in leer_json(texto)[c]]
+            yield f"preclasificar/{nombre}", tamano, (
+                lambda ts=tareas, m=modulo: [por_reglas(m.normalizar_tarea(t)) for t in ts]
+            )
+        if "pdf" in RENDERIZADORES and "/" not in nombre:
+            # Lo que costaría cada PDF si la fuente (métricas, subconjunto, anchos) no se guardara por proceso
+            yield f"exportar/{nombre}/pdf_fuente_en_frio", tamano, (
+                lambda d=documento: (_olvidar_fuente(), exportar(d, "pdf", "bench"))
+            )
+
+
+def _olvidar_fuente():
+    for cache in (_fuente_unicode, _subconjunto_ttf):
+        cache.cache_clear()
+
+
+# --- 2. MEDICIÓN ---
+def percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def medir(funcion, tamano, repeticiones, presupuesto_s):
+    funcion()  # calentamiento: importaciones y cachés de proceso fuera de la medición
+    tiempos = []
+    limite = time.perf_counter() + presupuesto_s
+    while len(tiempos) < repeticiones and (len(tiempos) < 3 or time.perf_counter() < limite):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    # La memoria se mide aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ordenados = sorted(tiempos)
+    total = sum(tiempos)
+    return {
+        "repeticiones": len(tiempos),
+        "bytes_entrada": tamano,
+        "ops_por_s": len(tiempos) / total,
+        "mb_por_s": tamano * len(tiempos) / total / 1e6,
+        "media_ms": statistics.mean(tiempos) * 1000,
+        "p50_ms": percentil(ordenados, 50) * 1000,
+        "p95_ms": percentil(ordenados, 95) * 1000,
+        "p99_ms": percentil(ordenados, 99) * 1000,
+        "max_ms": ordenados[-1] * 1000,
+        "pico_memoria_kb": pico / 1024,
+    }
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+# --- 3. COMPARACIÓN ENTRE VERSIONES ---
+def comparar(actual, anterior, umbral):
+    """Imprime la razón actual/anterior por caso; devuelve los casos cuyo p50 empeoró más que el umbral."""
+    regresiones = []
+    print(f"{'caso':50} {'p50 ant':>10} {'p50 act':>10} {'razón':>7} {'mem':>7}", file=sys.stderr)
+    for nombre, caso in actual["casos"].items():
+        previo = anterior["casos"].get(nombre)
+        if not previo:
+            continue
+        razon = caso["p50_ms"] / previo["p50_ms"] if previo["p50_ms"] else 1.0
+        razon_mem = caso["pico_memoria_kb"] / previo["pico_memoria_kb"] if previo["pico_memoria_kb"] else 1.0
+        marca = " <--" if razon > umbral else ""
+        print(f"{nombre:50} {previo['p50_ms']:10.3f} {caso['p50_ms']:10.3f} {razon:7.2f} {razon_mem:7.2f}{marca}",
+              file=sys.stderr)
+        if razon > umbral:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--salida", help="ruta del reporte JSON (por defecto, a la consola)")
+    parser.add_argument("--comparar", help="reporte JSON de una versión anterior")
+    parser.add_argument("--umbral", type=float, default=1.25, help="razón de p50 a partir de la cual es regresión")
+    parser.add_argument("--filtro", default="", help="solo los casos que contengan este texto")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--presupuesto", type=float, default=2.0, help="segundos máximos por caso")
+    parser.add_argument("--factor-largo", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    reporte = {
+        "version": 1,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_actual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "casos": {},
+    }
+    for nombre, tamano, funcion in construir_casos(args.factor_largo):
+        if args.filtro in nombre:
+            reporte["casos"][nombre] = medir(funcion, tamano, args.repeticiones, args.presupuesto)
+            print(f"{nombre:50} p50={reporte['casos'][nombre]['p50_ms']:9.3f} ms", file=sys.stderr)
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+    else:
+        print(texto)
+
+    if args.comparar:
+        anterior = json.loads(Path(args.comparar).read_text(encoding="utf-8"))
+        if comparar(reporte, anterior, args.umbral):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""Lógica de cada herramienta sin Streamlit: la usan las páginas y la línea de comandos (lote.py).
+
+Cada módulo expone:
+    NOMBRE     clave en HERRAMIENTAS (etiqueta de telemetría y exportaciones)
+    ENTRADAS   {nombre: valor por defecto}; None = obligatorio
+    LIMITES_TOKENS {nombre: máximo de tokens}; generar() recorta lo que se pase y lo avisa en "avisos"
+    AJUSTES    campos de opciones (no texto libre) que deben coincidir para ofrecer un resultado parecido
+    prompt(entrada)               -> str
+    resultado(objeto)             -> dict serializable (a partir del dataclass validado)
+    generar(ia, entrada)          -> dict; lanza excepción si falla
+                                     (delegacion, pedidos y negociador aceptan además escribir(trozo)
+                                     para recibir el JSON mientras se genera; lo usan las páginas)
+    documento(resultado, entrada) -> nucleo.exportar.Documento
+
+Los modelos de cada herramienta (y su respaldo) se configuran en nucleo/modelos.py (RUTAS).
+"""
+from herramientas import correos, delegacion, negociador, pedidos, priorizador, reuniones
+
+HERRAMIENTAS = {
+    "delegacion": delegacion,
+    "correos": correos,
+    "pedidos": pedidos,
+    "reuniones": reuniones,
+    "priorizador": priorizador,
+    "negociador": negociador,
+}
+
+
+def completar_entrada(modulo, entrada):
+    """Aplica los valores por defecto y avisa de los campos obligatorios vacíos."""
+    completa = {nombre: entrada.get(nombre) or defecto for nombre, defecto in modulo.ENTRADAS.items()}
+    faltan = [nombre for nombre, valor in completa.items() if valor in (None, "")]
+    if faltan:
+        raise ValueError(f"Faltan datos obligatorios: {', '.join(faltan)}")
+    return completa
@@ -0,0 +1,52 @@
+from dataclasses import asdict
+
+from nucleo.esquemas import PropuestasCorreo
+from nucleo.estructurado import generar_estructurado
+from nucleo.exportar import Documento, Seccion
+from nucleo.presupuesto import ajustar
+from nucleo.ruteo import ruta_para
+
+NOMBRE = "correos"
+ESQUEMA = PropuestasCorreo
+ENTRADAS = {"texto": None, "destinatario": "Cliente"}
+# Tope de tokens por campo de texto libre (ver nucleo/presupuesto.py)
+LIMITES_TOKENS = {"texto": 1500}
+# Opciones que deben coincidir para reutilizar un resultado parecido (ver nucleo/historial.py)
+AJUSTES = ("destinatario",)
+
+
+def prompt(entrada):
+    # CORRECCIÓN: Ahora incluimos la variable {texto} explícitamente
+    return f"""
+        Actúa como experto en comunicación asertiva.
+        
+        MENSAJE ORIGINAL A REESCRIBIR: "{entrada['texto']}"
+        
+        OBJETIVO: Reescribe el mensaje anterior para un destinatario: "{entrada['destinatario']}".
+        
+        Genera 3 versiones: profesional, directa y coloquial.
+        """
+
+
+def resultado(propuestas):
+    # El esquema reemplaza al separador "|||": cada versión llega en su propio campo
+    return {clave: valor.replace("*", "") for clave, valor in asdict(propuestas).items()}
+
+
+def generar(ia, entrada):
+    entrada, avisos = ajustar(entrada, LIMITES_TOKENS)
+    consulta = prompt(entrada)
+    objeto = generar_estructurado(ia, ruta_para(NOMBRE, consulta), consulta, ESQUEMA, herramienta=NOMBRE)
+    return dict(resultado(objeto), avisos=avisos)
+
+
+def documento(resultados, entrada):
+    return Documento(
+        titulo="Propuestas de Comunicación",
+        secciones=[
+            Seccion("Original", entrada['texto']),
+            Seccion("1. Profesional", resultados.get('profesional', '')),
+            Seccion("2. Directo", resultados.get('directo', '')),
+            Seccion("3. Coloquial", resultados.get('coloquial', '')),
+        ],
+    )
@@ -0,0 +1,55 @@
+from nucleo.esquemas import PlanDelegacion
+from nucleo.estructurado import generar_estructurado
+from nucleo.exportar import Documento, Seccion
+from nucleo.presupuesto import ajustar
+from nucleo.ruteo import ruta_para
+
+NOMBRE = "delegacion"
+ESQUEMA = PlanDelegacion
+ENTRADAS = {
+    "tarea": None,
+    "competencia": "M2 - Aprendiz (Competencia moderada)",
+    "motivacion": "Variable (Motivado pero sin experiencia)",
+    "colaborador": "Colaborador",
+}
+# Tope de tokens por campo de texto libre (ver nucleo/presupuesto.py)
+LIMITES_TOKENS = {"tarea": 600}
+# Opciones que deben coincidir para reutilizar un resultado parecido (ver nucleo/historial.py)
+AJUSTES = ("competencia", "motivacion")
+
+
+def prompt(entrada):
+    return f"""
+        Actúa como Coach experto en Liderazgo Situacional.
+        Tarea: {entrada['tarea']} | Nivel: {entrada['competencia']} | Disposición: {entrada['motivacion']}
+        """
+
+
+def resultado(plan):
+    # El JSON ya viene separado por campos; solo quitamos el markdown que ensucia Word/PDF
+    return {
+        "diagnostico": plan.diagnostico.replace("*", ""),
+        "pasos": plan.pasos.replace("*", ""),
+        "guion": plan.guion.replace("*", "").replace('"', ''),
+    }
+
+
+def generar(ia, entrada, escribir=None):
+    entrada, avisos = ajustar(entrada, LIMITES_TOKENS)
+    consulta = prompt(entrada)
+    objeto = generar_estructurado(
+        ia, ruta_para(NOMBRE, consulta), consulta, ESQUEMA, herramienta=NOMBRE, escribir=escribir
+    )
+    return dict(resultado(objeto), avisos=avisos)
+
+
+def documento(data, entrada):
+    return Documento(
+        titulo="Plan de Delegación Situacional",
+        datos=[("Colaborador", entrada['colaborador']), ("Tarea", entrada['tarea'])],
+        secciones=[
+            Seccion("1. Diagnóstico", data.get('diagnostico', '')),
+            Seccion("2. Pasos Clave", data.get('pasos', '')),
+            Seccion("3. Guion de Conversación", data.get('guion', '')),
+        ],
+    )
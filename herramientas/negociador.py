@@ -0,0 +1,76 @@
+from dataclasses import asdict
+
+from nucleo.esquemas import PlanHarvard
+from nucleo.estructurado import generar_estructurado
+from nucleo.exportar import Documento, Seccion
+from nucleo.presupuesto import ajustar
+from nucleo.ruteo import ruta_para
+
+NOMBRE = "negociador"
+ESQUEMA = PlanHarvard
+ENTRADAS = {
+    "intereses_mios": None,
+    "maan": None,
+    "rol": "-",
+    "contraparte": "-",
+    "problema": "-",
+    "intereses_ellos": "-",
+}
+# Tope de tokens por campo de texto libre (ver nucleo/presupuesto.py)
+LIMITES_TOKENS = {
+    "problema": 800,
+    "intereses_mios": 400,
+    "intereses_ellos": 400,
+    "maan": 200,
+    "rol": 50,
+    "contraparte": 50,
+}
+# Opciones que deben coincidir para reutilizar un resultado parecido (ver nucleo/historial.py)
+AJUSTES = ()
+
+# Cada sección de la hoja de ruta es un campo del JSON, así se puede mostrar mientras se genera
+SECCIONES_HARVARD = [
+    ("poder", "1. Diagnóstico de Poder"),
+    ("valor", "2. Estrategia A: Creación de Valor (Ideal)"),
+    ("criterios", "3. Estrategia B: Criterios Objetivos (Defensiva)"),
+    ("preguntas", "4. Preguntas Poderosas"),
+]
+
+
+def prompt(entrada):
+    return f"""
+        Actúa como un Experto en Negociación del 'Harvard Negotiation Project' (Fisher & Ury).
+        Tu cliente es un novato que necesita una guía paso a paso.
+        
+        CONTEXTO:
+        - Usuario: {entrada['rol']}
+        - Contraparte: {entrada['contraparte']}
+        - Conflicto: {entrada['problema']}
+        - Intereses del Usuario (Subyacentes): {entrada['intereses_mios']}
+        - Intereses de la Contraparte (Estimados): {entrada['intereses_ellos']}
+        - MAAN (Plan B si no hay acuerdo): {entrada['maan']}
+        
+        TAREA: Genera una hoja de ruta estratégica.
+        Para re-encuadrar usa una frase del tipo: "No hablemos de lo que tú quieres o yo quiero, veamos qué es lo justo basado en..."
+        """
+
+
+def resultado(plan):
+    return asdict(plan)
+
+
+def generar(ia, entrada, escribir=None):
+    entrada, avisos = ajustar(entrada, LIMITES_TOKENS)
+    consulta = prompt(entrada)
+    objeto = generar_estructurado(
+        ia, ruta_para(NOMBRE, consulta), consulta, ESQUEMA, herramienta=NOMBRE, escribir=escribir
+    )
+    return dict(resultado(objeto), avisos=avisos)
+
+
+def documento(secciones, entrada):
+    return Documento(
+        titulo="Plan de Negociación Harvard",
+        # Limpieza básica para el Word
+        secciones=[Seccion(titulo, secciones.get(clave, "").replace('*', '')) for clave, titulo in SECCIONES_HARVARD],
+    )
@@ -0,0 +1,47 @@
+from nucleo.esquemas import PedidoImpecable
+from nucleo.estructurado import generar_estructurado
+from nucleo.exportar import Documento, Seccion
+from nucleo.presupuesto import ajustar
+from nucleo.ruteo import ruta_para
+
+NOMBRE = "pedidos"
+ESQUEMA = PedidoImpecable
+ENTRADAS = {"oyente": None, "accion": None, "tiempo": None, "condiciones": "-", "contexto": "-"}
+# Tope de tokens por campo de texto libre (ver nucleo/presupuesto.py)
+LIMITES_TOKENS = {"oyente": 50, "accion": 400, "tiempo": 50, "condiciones": 400, "contexto": 400}
+# Opciones que deben coincidir para reutilizar un resultado parecido (ver nucleo/historial.py)
+AJUSTES = ()
+
+
+def prompt(entrada):
+    return f"""
+        Actúa como un Coach Ontológico experto en Fernando Flores.
+        Redacta un "PEDIDO IMPECABLE" basado en:
+        
+        1. OYENTE: {entrada['oyente']}
+        2. ACCIÓN: {entrada['accion']}
+        3. CONDICIONES DE SATISFACCIÓN: {entrada['condiciones']}
+        4. TIEMPO: {entrada['tiempo']}
+        5. TRASFONDO: {entrada['contexto']}
+        """
+
+
+def resultado(pedido):
+    return {"guion": pedido.guion, "analisis": pedido.analisis}
+
+
+def generar(ia, entrada, escribir=None):
+    """Genera el texto usando Google Gemini"""
+    entrada, avisos = ajustar(entrada, LIMITES_TOKENS)
+    consulta = prompt(entrada)
+    objeto = generar_estructurado(
+        ia, ruta_para(NOMBRE, consulta), consulta, ESQUEMA, herramienta=NOMBRE, escribir=escribir
+    )
+    return dict(resultado(objeto), avisos=avisos)
+
+
+def documento(res, entrada):
+    return Documento(
+        titulo="PEDIDO IMPECABLE",
+        secciones=[Seccion("Guion Sugerido:", res['guion']), Seccion("Análisis Ontológico:", res['analisis'])],
+    )
@@ -0,0 +1,195 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from nucleo.cache import CacheRespuestas
+from nucleo.esquemas import MatrizEisenhower
+from nucleo.estructurado import generar_estructurado
+from nucleo.exportar import Documento, Seccion
+from nucleo.preclasificador import por_reglas
+from nucleo.presupuesto import ajustar
+from nucleo.ruteo import ruta_para
+from nucleo.similitud import jaccard, rasgos
+
+NOMBRE = "priorizador"
+ESQUEMA = MatrizEisenhower
+ENTRADAS = {"tareas": None, "rol": "Profesional ocupado"}
+# Tope de tokens por campo; la lista se recorta por líneas completas (ver nucleo/presupuesto.py)
+LIMITES_TOKENS = {"tareas": 6000, "rol": 50}
+# Opciones que deben coincidir para reutilizar un resultado parecido (ver nucleo/historial.py)
+AJUSTES = ()
+
+# Listas largas se parten en bloques que se clasifican en paralelo:
+# la latencia no crece con la lista y un bloque que falla no arrastra a los demás
+TAREAS_POR_BLOQUE = 30
+MAX_HILOS = 4
+# Una tarea reescrita por el modelo se reconoce si comparte al menos esta parte de sus palabras
+SIMILITUD_TAREA = 0.5
+CONSEJO_GENERICO = "Resuelve primero lo urgente e importante y reserva tiempo en la agenda para lo que toca planificar."
+CUADRANTES = ["hacer", "planificar", "delegar", "eliminar"]
+TITULOS = {
+    "hacer": "1. Hacer ya (Urgente e Importante)",
+    "planificar": "2. Planificar (No Urgente pero Importante)",
+    "delegar": "3. Delegar (Urgente pero No Importante)",
+    "eliminar": "4. Eliminar (Ni Urgente ni Importante)",
+}
+
+
+def prompt(entrada):
+    return f"""
+    Actúa como un experto en productividad para un "{entrada['rol']}".
+    Clasifica estas tareas en la Matriz de Eisenhower.
+    
+    TAREAS:
+    {entrada['tareas']}
+    """
+
+
+def resultado(matriz):
+    res = {c: list(getattr(matriz, c)) for c in CUADRANTES}
+    res.update({"recomendacion_top": matriz.recomendacion_top, "sin_clasificar": [], "errores": []})
+    return res
+
+
+def lineas_de(tareas):
+    return [linea.strip() for linea in tareas.splitlines() if linea.strip()]
+
+
+def normalizar_tarea(tarea):
+    """La misma tarea aunque cambien mayúsculas, espacios o la viñeta del principio."""
+    return " ".join(re.sub(r"^\s*(?:[-*•·]|\d+[.)])\s*", "", tarea).casefold().split())
+
+
+def clave_tarea(tarea, rol, tipo="cuadrante", dueno=None):
+    """Con `dueno` (ver nucleo.historial.dueno_actual) la clave es solo de ese usuario: lo que
+    clasificó uno no se le sirve a otro."""
+    opciones = {"rol": " ".join(rol.casefold().split()), "tipo": tipo}
+    if dueno:
+        opciones["dueno"] = dueno
+    return CacheRespuestas.clave(NOMBRE, normalizar_tarea(tarea), opciones)
+
+
+def clave_consejo(lineas, rol, dueno=None):
+    """El consejo vale para esa lista de tareas (sin importar el orden ni los repetidos), ese rol y ese usuario."""
+    tareas = "\n".join(sorted({normalizar_tarea(linea) for linea in lineas}))
+    return clave_tarea(tareas, rol, tipo="consejo", dueno=dueno)
+
+
+def cuadrantes_del_bloque(bloque, parcial):
+    """{línea: cuadrante} de las líneas del bloque, y las tareas de la respuesta que no se
+    reconocen en ninguna línea (el modelo a veces las reescribe del todo) como [(cuadrante, texto)]."""
+    por_texto = {}
+    for linea in bloque:
+        por_texto.setdefault(normalizar_tarea(linea), []).append(linea)
+    asignadas, sueltas = {}, []
+    for c in CUADRANTES:
+        for tarea in getattr(parcial, c):
+            iguales = por_texto.get(normalizar_tarea(tarea))
+            if not iguales:
+                sueltas.append((c, tarea))
+            for linea in iguales or ():
+                asignadas.setdefault(linea, c)
+    # Las reescritas se emparejan con la línea libre que más palabras comparte
+    pendientes = {linea: rasgos(linea) for linea in bloque if linea not in asignadas}
+    sin_linea = []
+    for c, tarea in sueltas:
+        mejor = max(pendientes, key=lambda linea: jaccard(pendientes[linea], rasgos(tarea)), default=None)
+        if mejor is not None and jaccard(pendientes[mejor], rasgos(tarea)) >= SIMILITUD_TAREA:
+            asignadas[mejor] = c
+            del pendientes[mejor]
+        else:
+            sin_linea.append((c, tarea))
+    return asignadas, sin_linea
+
+
+def clasificar_bloque(ia, bloque, rol):
+    consulta = prompt({"tareas": "\n".join(bloque), "rol": rol})
+    return generar_estructurado(ia, ruta_para(NOMBRE, consulta), consulta, ESQUEMA, herramienta=NOMBRE)
+
+
+def generar(ia, entrada, clasificadas=None, preclasificar=por_reglas, dueno=None):
+    """Clasifica la lista por bloques en un pool acotado y junta los cuadrantes.
+
+    Con `clasificadas` (un CacheRespuestas: tarea normalizada + rol + dueno -> cuadrante) solo
+    se envían las tareas nuevas o editadas; las demás toman el cuadrante que guardó ese mismo
+    usuario. Las obvias
+    las resuelve `preclasificar` en local (ver nucleo/preclasificador.py; None = todas al
+    modelo) y quedan en "locales". Las tareas de bloques fallidos quedan en "sin_clasificar";
+    solo si fallan todos se lanza el error.
+    """
+    entrada, avisos = ajustar(entrada, LIMITES_TOKENS, por_lineas=("tareas",))
+    lineas = lineas_de(entrada['tareas'])
+    rol = entrada['rol']
+    cuadrante = {}
+    if clasificadas:
+        for linea in lineas:
+            guardado = clasificadas.obtener(clave_tarea(linea, rol, dueno=dueno))
+            if guardado in CUADRANTES:
+                cuadrante[linea] = guardado
+    reutilizadas = sum(linea in cuadrante for linea in lineas)
+    locales = []
+    if preclasificar:
+        for linea in dict.fromkeys(linea for linea in lineas if linea not in cuadrante):
+            local = preclasificar(normalizar_tarea(linea), rol)
+            if local:
+                cuadrante[linea] = local
+                locales.append(linea)
+    nuevas = list(dict.fromkeys(linea for linea in lineas if linea not in cuadrante))
+    bloques = [nuevas[i:i + TAREAS_POR_BLOQUE] for i in range(0, len(nuevas), TAREAS_POR_BLOQUE)]
+    result = {c: [] for c in CUADRANTES}
+    result.update({"recomendacion_top": "", "sin_clasificar": [], "errores": [], "avisos": avisos,
+                   "reutilizadas": reutilizadas, "locales": locales})
+
+    futuros = []
+    if bloques:
+        with ThreadPoolExecutor(max_workers=min(MAX_HILOS, len(bloques))) as pool:
+            futuros = [pool.submit(clasificar_bloque, ia, bloque, rol) for bloque in bloques]
+
+    sin_linea = []
+    for bloque, futuro in zip(bloques, futuros):
+        try:
+            parcial = futuro.result()
+        except Exception as e:
+            result["sin_clasificar"].extend(bloque)
+            result["errores"].append(str(e))
+            continue
+        asignadas, sueltas = cuadrantes_del_bloque(bloque, parcial)
+        cuadrante.update(asignadas)
+        sin_linea.extend(sueltas)
+        # Las que el modelo omitió no se guardan: en la próxima pasada se vuelven a enviar
+        result["sin_clasificar"].extend(linea for linea in bloque if linea not in asignadas)
+        if clasificadas:
+            for linea, c in asignadas.items():
+                clasificadas.guardar(clave_tarea(linea, rol, dueno=dueno), c)
+        # El consejo del primer bloque (el que abre lo nuevo) es el del día
+        if not result["recomendacion_top"]:
+            result["recomendacion_top"] = parcial.recomendacion_top
+
+    # Las tareas en el orden de la lista; las que el modelo reescribió irreconocibles, al final
+    for linea in lineas:
+        if linea in cuadrante:
+            result[cuadrante[linea]].append(linea)
+    for c, tarea in sin_linea:
+        result[c].append(tarea)
+
+    if clasificadas:
+        # Sin tareas nuevas no hay consejo nuevo: vale el guardado para esta misma lista, rol y usuario
+        clave = clave_consejo(lineas, rol, dueno)
+        if result["recomendacion_top"]:
+            clasificadas.guardar(clave, result["recomendacion_top"])
+        else:
+            result["recomendacion_top"] = clasificadas.obtener(clave) or ""
+    # Sin consejo del modelo para esta lista: uno que no nombra tareas de otra
+    if not result["recomendacion_top"]:
+        result["recomendacion_top"] = (f"Empieza por «{result['hacer'][0]}»." if result["hacer"] else CONSEJO_GENERICO)
+
+    if result["errores"] and len(result["errores"]) == len(bloques) and not cuadrante:
+        raise RuntimeError(result["errores"][0])
+    return result
+
+
+def documento(res, entrada):
+    secciones = [Seccion(TITULOS[c], "\n".join(f"• {t}" for t in res.get(c, [])) or "Nada por aquí") for c in CUADRANTES]
+    if res.get("sin_clasificar"):
+        secciones.append(Seccion("Sin clasificar", "\n".join(f"• {t}" for t in res["sin_clasificar"])))
+    secciones.append(Seccion("Consejo del Coach", res.get("recomendacion_top", "")))
+    return Documento(titulo="Matriz de Eisenhower", datos=[("Rol", entrada['rol'])], secciones=secciones)
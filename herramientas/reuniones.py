@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+
+from nucleo.esquemas import Agenda
+from nucleo.estructurado import generar_estructurado
+from nucleo.exportar import Documento, Seccion
+from nucleo.presupuesto import ajustar
+from nucleo.ruteo import ruta_para
+
+NOMBRE = "reuniones"
+ESQUEMA = Agenda
+ENTRADAS = {"tema": None, "objetivo": None, "duracion": 30}
+# Tope de tokens por campo de texto libre (ver nucleo/presupuesto.py)
+LIMITES_TOKENS = {"tema": 150, "objetivo": 300}
+# Opciones que deben coincidir para reutilizar un resultado parecido (ver nucleo/historial.py)
+AJUSTES = ("duracion",)
+
+
+def prompt(entrada):
+    return f"""
+        Actúa como un Facilitador Experto. Diseña una agenda para una reunión de {entrada['duracion']} minutos.
+        TEMA: {entrada['tema']} | OBJETIVO: {entrada['objetivo']}
+        """
+
+
+def resultado(plan):
+    return {"agenda": [asdict(item) for item in plan.agenda], "consejos": plan.consejos}
+
+
+def generar(ia, entrada):
+    # El esquema garantiza el JSON: ya no hace falta recortar ``` ni buscar las llaves
+    entrada, avisos = ajustar(entrada, LIMITES_TOKENS)
+    consulta = prompt(entrada)
+    objeto = generar_estructurado(ia, ruta_para(NOMBRE, consulta), consulta, ESQUEMA, herramienta=NOMBRE)
+    return dict(resultado(objeto), avisos=avisos)
+
+
+def generar_varias(ia, entradas, concurrencia=4):
+    """Genera varias agendas a la vez (el cupo por modelo lo regula el cliente).
+
+    Entrega (índice, resultado, error) a medida que terminan; error es None si salió bien.
+    """
+    with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+        futuros = {pool.submit(generar, ia, entrada): i for i, entrada in enumerate(entradas)}
+        for futuro in as_completed(futuros):
+            try:
+                yield futuros[futuro], futuro.result(), None
+            except Exception as e:
+                yield futuros[futuro], None, e
+
+
+def documento(res, entrada):
+    tabla = [["Minutos", "Actividad", "Responsable"]] + [
+        [item.get("minutos", ""), item.get("actividad", ""), item.get("responsable", "")] for item in res['agenda']
+    ]
+    return Documento(
+        titulo=f"Plan de Reunión: {entrada['tema']}",
+        datos=[("Tema", entrada['tema']), ("Objetivo", entrada['objetivo'])],
+        secciones=[
+            Seccion("Agenda", tabla=tabla, anchos=[30, 110, 50], hoja="Agenda"),
+            Seccion("Consejos", res['consejos']),
+        ],
+    )
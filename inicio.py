@@ -1,4 +1,5 @@
 import streamlit as st
+from nucleo.arranque import medir_pagina, mostrar_reporte, reporte_visible
 
 # --- 1. CONFIGURACIÓN INICIAL ---
 st.set_page_config(
@@ -85,4 +86,16 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # --- 6. EJECUTAR ---
-pg.run()
\ No newline at end of file
+# Se mide cada carga de página (y sus importaciones) para detectar regresiones de arranque
+with medir_pagina(pg.title):
+    pg.run()
+
+if reporte_visible():
+    with st.sidebar:
+        mostrar_reporte()
+
+# Panel de administración (telemetría de la IA): se importa solo si se usa
+from nucleo.admin import es_admin, mostrar_panel  # noqa: E402
+if es_admin():
+    with st.sidebar:
+        mostrar_panel()
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""Ejecuta cualquier herramienta en lote, sin Streamlit, sobre un CSV o JSONL de entradas.
+
+Uso (desde la raíz del repo):
+    python lote.py correos borradores.csv --salida correos.jsonl --concurrencia 8
+    python lote.py reuniones trimestre.jsonl --salida agendas.jsonl --exportar xlsx --carpeta agendas/
+
+Las columnas del CSV (o claves del JSONL) son las ENTRADAS de cada herramienta
+(ver herramientas/<herramienta>.py); una columna "id" opcional identifica la fila.
+La salida JSONL es también el checkpoint: al relanzar, las filas ya resueltas se saltan
+y las que dieron error se vuelven a intentar.
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from herramientas import HERRAMIENTAS, completar_entrada
+from nucleo.exportar import RENDERIZADORES, exportar
+from nucleo.ia import crear_cliente
+
+
+# --- 1. ENTRADA Y CHECKPOINT ---
+def leer_filas(ruta):
+    """Entrega (id, fila) de a una, sin cargar el archivo completo en memoria."""
+    with open(ruta, encoding="utf-8", newline="") as f:
+        if ruta.endswith(".jsonl"):
+            for numero, linea in enumerate(f, 1):
+                if linea.strip():
+                    fila = json.loads(linea)
+                    yield str(fila.get("id") or numero), fila
+        else:
+            for numero, fila in enumerate(csv.DictReader(f), 1):
+                yield str(fila.get("id") or numero), fila
+
+
+def ids_resueltos(ruta_salida):
+    resueltos = set()
+    if not Path(ruta_salida).exists():
+        return resueltos
+    with open(ruta_salida, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                continue  # última línea cortada por una caída
+            if "error" in registro:
+                resueltos.discard(registro["id"])
+            else:
+                resueltos.add(registro["id"])
+    return resueltos
+
+
+def abrir_salida(ruta_salida):
+    # Si la ejecución anterior murió a media línea, empezamos en una línea nueva
+    ruta = Path(ruta_salida)
+    cortada = False
+    if ruta.exists() and ruta.stat().st_size:
+        with open(ruta, "rb") as f:
+            f.seek(-1, 2)
+            cortada = f.read(1) != b"\n"
+    salida = open(ruta, "a", encoding="utf-8")
+    if cortada:
+        salida.write("\n")
+    return salida
+
+
+# --- 2. PROCESAMIENTO DE UNA FILA ---
+def procesar_fila(ia, nombre, id_fila, fila, formato, carpeta):
+    modulo = HERRAMIENTAS[nombre]
+    registro = {"id": id_fila}
+    try:
+        entrada = completar_entrada(modulo, fila)
+        registro["entrada"] = entrada
+        registro["resultado"] = modulo.generar(ia, entrada)
+        if formato:
+            data, _, ext = exportar(modulo.documento(registro["resultado"], entrada), formato, herramienta=nombre)
+            seguro = re.sub(r"[^\w.-]", "_", id_fila)
+            archivo = Path(carpeta) / f"{nombre}_{seguro}.{ext}"
+            archivo.write_bytes(data)
+            registro["archivo"] = str(archivo)
+    except Exception as e:
+        registro["error"] = str(e)
+    return registro
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("herramienta", choices=sorted(HERRAMIENTAS))
+    parser.add_argument("entradas", help="archivo .csv o .jsonl")
+    parser.add_argument("--salida", required=True, help="archivo .jsonl de resultados (y checkpoint)")
+    parser.add_argument("--concurrencia", type=int, default=4, help="filas en paralelo")
+    parser.add_argument("--exportar", choices=sorted(RENDERIZADORES), help="además, genera un archivo por fila")
+    parser.add_argument("--carpeta", default="exportes", help="dónde dejar los archivos exportados")
+    args = parser.parse_args(argv)
+
+    if args.exportar:
+        Path(args.carpeta).mkdir(parents=True, exist_ok=True)
+    ia = crear_cliente()
+    resueltos = ids_resueltos(args.salida)
+    totales = {"ok": 0, "error": 0, "saltadas": 0}
+
+    with abrir_salida(args.salida) as salida, ThreadPoolExecutor(max_workers=args.concurrencia) as pool:
+        en_vuelo = set()
+
+        def escribir(terminados):
+            for futuro in terminados:
+                registro = futuro.result()
+                salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                salida.flush()  # cada fila queda en disco: es el checkpoint
+                totales["error" if "error" in registro else "ok"] += 1
+                if "error" in registro:
+                    print(f"[{registro['id']}] {registro['error']}", file=sys.stderr)
+
+        for id_fila, fila in leer_filas(args.entradas):
+            if id_fila in resueltos:
+                totales["saltadas"] += 1
+                continue
+            # Ventana acotada: no se lee más entrada de la que se está procesando
+            if len(en_vuelo) >= args.concurrencia * 2:
+                terminados, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                escribir(terminados)
+            en_vuelo.add(pool.submit(procesar_fila, ia, args.herramienta, id_fila, fila, args.exportar, args.carpeta))
+        escribir(wait(en_vuelo).done)
+
+    print(f"Listo: {totales['ok']} ok, {totales['error']} con error, {totales['saltadas']} ya resueltas.", file=sys.stderr)
+    for modelo, datos in ia.estadisticas_limites().items():
+        print(f"{modelo}: {datos['llamadas']} llamadas, espera media {datos['espera_media_s']:.2f} s "
+              f"(máx. {datos['espera_max_s']:.2f} s), {datos['rechazos_429']} respuestas 429", file=sys.stderr)
+    return 1 if totales["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Núcleo compartido por todas las herramientas de coaching (IA, caché, exportación...)."""
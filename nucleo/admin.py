@@ -0,0 +1,81 @@
+import streamlit as st
+
+from nucleo import telemetria
+from nucleo.exportar import estadisticas_exportacion
+from nucleo.ia import leer_config, obtener_cliente
+from nucleo.memoria import obtener_almacen
+from nucleo.ruteo import estado_modelos
+from nucleo.trabajos import obtener_cola
+
+
+def es_admin():
+    """Panel solo con ?admin=<ADMIN_CLAVE> en la URL; sin ADMIN_CLAVE configurada no se muestra."""
+    clave = leer_config("ADMIN_CLAVE")
+    return bool(clave) and st.query_params.get("admin") == clave
+
+
+def mostrar_panel():
+    with st.expander("📊 Telemetría IA"):
+        filas = telemetria.resumen()
+        if filas:
+            st.dataframe(filas, hide_index=True)
+        else:
+            st.caption("Sin llamadas todavía.")
+
+        st.markdown("**Salud de los modelos** (decide el ruteo)")
+        for modelo, salud in estado_modelos().items():
+            if salud:
+                st.caption(
+                    f"{modelo}: p50 {salud['p50_s']:.1f} s · p95 {salud['p95_s']:.1f} s · "
+                    f"{salud['tasa_error']:.0%} errores en las últimas {salud['muestras']}"
+                )
+            else:
+                st.caption(f"{modelo}: sin llamadas todavía")
+
+        try:
+            ia = obtener_cliente()
+        except Exception:
+            ia = None
+        if ia:
+            st.markdown("**Cupo por modelo**")
+            for modelo, datos in ia.estadisticas_limites().items():
+                st.caption(
+                    f"{modelo}: {datos['en_cola']} en cola · espera media {datos['espera_media_s']:.2f} s · "
+                    f"{datos['rechazos_429']} respuestas 429"
+                )
+            cobertura = ia.cobertura.estadisticas()
+            st.caption(
+                f"Llamadas duplicadas por demora: {cobertura['duplicadas']} de {cobertura['normales']} "
+                f"(máximo {cobertura['fraccion_max']:.0%})"
+            )
+            unidas = ia.en_curso.estadisticas()
+            st.caption(f"Llamadas idénticas unidas: {unidas['unidas']} · en curso: {unidas['en_curso']}")
+            if ia.cache:
+                cache = ia.cache.estadisticas()
+                st.caption(f"Caché: {cache['entradas']} entradas · {cache['tasa_aciertos']:.0%} de aciertos")
+
+        exportaciones = estadisticas_exportacion()
+        if exportaciones:
+            st.markdown("**Exportaciones**")
+            for clave, datos in exportaciones.items():
+                st.caption(f"{clave}: {datos['cantidad']} · promedio {datos['promedio_s'] * 1000:.0f} ms")
+
+        try:
+            almacen = obtener_almacen().estadisticas()
+            st.caption(
+                f"Resultados y archivos en disco: {almacen['bytes'] / 2**20:.1f} MB "
+                f"de {almacen['max_bytes'] / 2**20:.0f} MB"
+            )
+        except OSError:
+            st.caption("Almacén en disco no disponible: lo grande queda en la memoria de cada sesión.")
+
+        trabajos = obtener_cola().estadisticas()
+        st.caption(f"Generaciones en segundo plano: {trabajos['en_curso']} en curso · {trabajos['terminados']} sin recoger")
+
+        st.download_button(
+            "⬇️ Métricas (Prometheus)",
+            data=telemetria.metricas_prometheus(),
+            file_name="metricas_ia.txt",
+            mime="text/plain",
+            use_container_width=True,
+        )
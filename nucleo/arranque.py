@@ -0,0 +1,120 @@
+"""Tiempos de carga de cada página, con el desglose de las importaciones que hizo.
+
+inicio.py envuelve pg.run() con medir_pagina(): la primera visita a una página en el
+proceso paga sus importaciones; las siguientes deberían costar casi nada. Las zonas
+declaradas con fragmento() se miden aparte, porque al tocarlas no se recarga la página.
+"""
+import builtins
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+
+import streamlit as st
+
+_import_original = builtins.__import__
+_local = threading.local()
+_paginas = {}  # página -> {"cargas", "primera_s", "ultima_s", "importaciones": {módulo: s}}
+_lock = threading.Lock()
+
+
+# --- 1. MEDICIÓN ---
+def _importar(nombre, globals=None, locals=None, fromlist=(), level=0):
+    registro = getattr(_local, "registro", None)
+    # Fuera de una página, o dentro de otra importación ya medida: sin costo extra
+    if registro is None or getattr(_local, "dentro", False) or level or nombre in sys.modules:
+        return _import_original(nombre, globals, locals, fromlist, level)
+    _local.dentro = True
+    inicio = time.perf_counter()
+    try:
+        return _import_original(nombre, globals, locals, fromlist, level)
+    finally:
+        _local.dentro = False
+        registro[nombre] = registro.get(nombre, 0.0) + time.perf_counter() - inicio
+
+
+def _instalar():
+    # Un único gancho para todo el proceso; cada hilo (sesión) mide solo lo suyo.
+    # Solo con el reporte activo: si no, cada importación del proceso pagaría el envoltorio
+    if not reporte_visible():
+        if builtins.__import__ is _importar:
+            builtins.__import__ = _import_original
+        return
+    if builtins.__import__ is not _importar:
+        builtins.__import__ = _importar
+
+
+@contextlib.contextmanager
+def medir_pagina(nombre):
+    """Tiempo total de la carga; el desglose por importación solo con el reporte activo."""
+    _instalar()
+    # Un fragmento se mide también dentro de su página: al terminar se vuelve al registro de ella
+    anterior, _local.registro = getattr(_local, "registro", None), {}
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        # st.rerun() y st.stop() salen con excepción: igual se registra la carga
+        segundos = time.perf_counter() - inicio
+        importaciones, _local.registro = _local.registro, anterior
+        with _lock:
+            datos = _paginas.setdefault(nombre, {"cargas": 0, "primera_s": segundos, "importaciones": {}})
+            datos["cargas"] += 1
+            datos["ultima_s"] = segundos
+            for modulo, s in importaciones.items():
+                datos["importaciones"][modulo] = datos["importaciones"].get(modulo, 0.0) + s
+
+
+def fragmento(nombre):
+    """Como @st.fragment, pero registrando cada ejecución bajo `nombre` (Ej: "Correos · descarga").
+
+    Un widget dentro del fragmento vuelve a correr solo la función, no la página ni inicio.py:
+    ese tiempo no pasa por medir_pagina() y sin esto no aparecería en el reporte.
+    """
+    def decorar(funcion):
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            with medir_pagina(nombre):
+                return funcion(*args, **kwargs)
+        return st.fragment(medida)
+    return decorar
+
+
+# --- 2. REPORTE ---
+def reporte_arranque(top=5):
+    """Por página: cargas, primera y última carga, y las importaciones más caras."""
+    with _lock:
+        return {
+            nombre: {
+                "cargas": datos["cargas"],
+                "primera_ms": datos["primera_s"] * 1000,
+                "ultima_ms": datos["ultima_s"] * 1000,
+                "importaciones_ms": {
+                    modulo: s * 1000
+                    for modulo, s in sorted(datos["importaciones"].items(), key=lambda x: -x[1])[:top]
+                },
+            }
+            for nombre, datos in _paginas.items()
+        }
+
+
+def reporte_visible():
+    # secrets.toml o variable de entorno MOSTRAR_TIEMPOS_CARGA=1
+    try:
+        return bool(st.secrets.get("MOSTRAR_TIEMPOS_CARGA"))
+    except Exception:
+        return bool(os.environ.get("MOSTRAR_TIEMPOS_CARGA"))
+
+
+def mostrar_reporte():
+    """Expander con el reporte, para la barra lateral."""
+    with st.expander("⏱️ Tiempos de carga"):
+        for nombre, datos in reporte_arranque().items():
+            st.markdown(
+                f"**{nombre}** · 1ª carga {datos['primera_ms']:.0f} ms · "
+                f"última {datos['ultima_ms']:.0f} ms · {datos['cargas']} cargas"
+            )
+            for modulo, ms in datos["importaciones_ms"].items():
+                st.caption(f"import {modulo}: {ms:.0f} ms")
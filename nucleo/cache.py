@@ -0,0 +1,93 @@
+import hashlib
+import json
+import sqlite3
+import textwrap
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalizar_prompt(prompt):
+    """Ignora la sangría de los f-strings y los espacios al borde de cada línea: mismo contenido,
+    misma clave. Los saltos de línea se conservan: en una lista de tareas separan una de otra."""
+    return "\n".join(linea.strip() for linea in textwrap.dedent(prompt).strip().splitlines())
+
+
+class CacheRespuestas:
+    """Caché LRU con TTL de las respuestas de la IA, con respaldo opcional en SQLite."""
+
+    def __init__(self, max_entradas=256, ttl=3600, ruta=None):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()  # clave -> (expira, texto), la más reciente al final
+        self._lock = threading.Lock()
+        self._db = None
+        if ruta:
+            self._abrir_disco(ruta)
+
+    @staticmethod
+    def clave(modelo, prompt, config=None):
+        base = json.dumps([modelo, normalizar_prompt(prompt), config or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(base.encode("utf-8")).hexdigest()
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada and entrada[0] > time.time():
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            if entrada:
+                self._borrar(clave)
+                if self._db:
+                    self._db.commit()
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, texto):
+        expira = time.time() + self.ttl
+        with self._lock:
+            self._datos[clave] = (expira, texto)
+            self._datos.move_to_end(clave)
+            if self._db:
+                self._db.execute("INSERT OR REPLACE INTO respuestas VALUES (?, ?, ?)", (clave, expira, texto))
+            while len(self._datos) > self.max_entradas:
+                self._borrar(next(iter(self._datos)))
+            if self._db:
+                self._db.commit()
+
+    def estadisticas(self):
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+            }
+
+    # --- Persistencia (solo para no arrancar en frío tras un reinicio) ---
+    def _abrir_disco(self, ruta):
+        self._db = sqlite3.connect(ruta, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS respuestas (clave TEXT PRIMARY KEY, expira REAL, texto TEXT)"
+        )
+        self._db.execute("DELETE FROM respuestas WHERE expira <= ?", (time.time(),))
+        filas = self._db.execute(
+            "SELECT clave, expira, texto FROM respuestas ORDER BY expira DESC LIMIT ?", (self.max_entradas,)
+        ).fetchall()
+        # Las que expiran antes se usaron hace más tiempo: entran primero en el orden LRU
+        for clave, expira, texto in reversed(filas):
+            self._datos[clave] = (expira, texto)
+        self._db.execute(
+            "DELETE FROM respuestas WHERE clave NOT IN "
+            "(SELECT clave FROM respuestas ORDER BY expira DESC LIMIT ?)", (self.max_entradas,)
+        )
+        self._db.commit()
+
+    def _borrar(self, clave):
+        self._datos.pop(clave, None)
+        if self._db:
+            self._db.execute("DELETE FROM respuestas WHERE clave = ?", (clave,))
@@ -0,0 +1,223 @@
+"""Lectura local de calendarios .ics (exportados de Google Calendar, Outlook, etc.).
+
+Solo lo necesario para planificar reuniones: título, descripción, inicio y duración de cada
+VEVENT. Las repeticiones (RRULE) se expanden entre HISTORIA_SEMANAS atrás y HORIZONTE_SEMANAS
+adelante, sin las fechas de EXDATE ni las que un RECURRENCE-ID reemplaza o cancela.
+Las horas se pasan a la zona del usuario (ver leer_ics). Los eventos de día completo y los
+cancelados se omiten.
+"""
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.rrule import rrulestr
+
+DURACION_POR_DEFECTO = 30  # minutos, si el evento no trae fin ni duración
+DIAS = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
+HISTORIA_SEMANAS = 4    # repeticiones pasadas que todavía se ofrecen
+HORIZONTE_SEMANAS = 26  # y futuras (una regla sin UNTIL ni COUNT no termina nunca)
+
+
+@dataclass
+class Evento:
+    tema: str
+    objetivo: str
+    inicio: datetime
+    duracion: int  # minutos
+
+    def entrada(self):
+        """Entrada para herramientas.reuniones (sin descripción, el tema hace de objetivo)."""
+        return {"tema": self.tema, "objetivo": self.objetivo or self.tema, "duracion": self.duracion}
+
+    def cuando(self):
+        """'Lun 15/01 09:00'."""
+        return f"{DIAS[self.inicio.weekday()]} {self.inicio:%d/%m %H:%M}"
+
+
+# --- 1. LÍNEAS Y PROPIEDADES ---
+def _lineas(texto):
+    # Las líneas largas vienen "plegadas": la continuación empieza con un espacio o tab
+    lineas = []
+    for linea in texto.splitlines():
+        if linea[:1] in (" ", "\t") and lineas:
+            lineas[-1] += linea[1:]
+        elif linea:
+            lineas.append(linea)
+    return lineas
+
+
+def _propiedad(linea):
+    """'DTSTART;TZID=Europe/Madrid:20240115T090000' -> ('DTSTART', {'TZID': ...}, '2024...')."""
+    dentro_de_comillas = False
+    for i, c in enumerate(linea):
+        if c == '"':
+            dentro_de_comillas = not dentro_de_comillas
+        elif c == ":" and not dentro_de_comillas:
+            cabecera, valor = linea[:i], linea[i + 1:]
+            break
+    else:
+        return None
+    nombre, *parametros = cabecera.split(";")
+    parametros = dict(p.split("=", 1) for p in parametros if "=" in p)
+    return nombre.upper(), {k.upper(): v.strip('"') for k, v in parametros.items()}, valor
+
+
+def _texto(valor):
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), valor).strip()
+
+
+def _zona(nombre):
+    """ZoneInfo de un nombre IANA; None si falta o no se conoce (Ej: nombres de Windows de Outlook)."""
+    try:
+        return ZoneInfo(nombre.strip()) if nombre else None
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def _fecha(valor, parametros, zona_flotante):
+    """Fecha y hora con zona; None para eventos de día completo.
+
+    Con Z es UTC; con TZID, esa zona; sin ninguna (hora "flotante") o con una TZID
+    desconocida, la del usuario.
+    """
+    if parametros.get("VALUE") == "DATE" or "T" not in valor:
+        return None
+    momento = datetime.strptime(valor[:15], "%Y%m%dT%H%M%S")
+    if valor.endswith("Z"):
+        return momento.replace(tzinfo=timezone.utc)
+    return momento.replace(tzinfo=_zona(parametros.get("TZID")) or zona_flotante)
+
+
+def _duracion(valor):
+    """'PT1H30M' / 'P1DT2H' -> minutos."""
+    partes = re.fullmatch(r"[+]?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?", valor.strip())
+    if not partes:
+        return None
+    semanas, dias, horas, minutos, _ = (int(p or 0) for p in partes.groups())
+    return ((semanas * 7 + dias) * 24 + horas) * 60 + minutos
+
+
+# --- 2. EVENTOS ---
+def _primera(propiedades, nombre, defecto=None):
+    """(parametros, valor) de la primera aparición de la propiedad."""
+    valores = propiedades.get(nombre)
+    return valores[0] if valores else defecto
+
+
+def leer_ics(contenido, zona=None, hoy=None):
+    """Lista de Evento ordenada por inicio, a partir del texto (o bytes) de un .ics.
+
+    zona: nombre IANA de la zona del usuario (Ej: "America/Santiago"). Sin ella se usa la
+    X-WR-TIMEZONE del calendario (Google la incluye) y, si no trae, la del servidor.
+    """
+    if isinstance(contenido, bytes):
+        contenido = contenido.decode("utf-8-sig", errors="replace")
+    vevents, actual, zona_calendario = [], None, None
+    for linea in _lineas(contenido):
+        propiedad = _propiedad(linea)
+        if not propiedad:
+            continue
+        nombre, parametros, valor = propiedad
+        if nombre == "BEGIN" and valor.upper() == "VEVENT":
+            actual = {}
+        elif nombre == "END" and valor.upper() == "VEVENT" and actual is not None:
+            vevents.append(actual)
+            actual = None
+        elif actual is not None:
+            # Varias apariciones valen para EXDATE; del resto se usa la primera
+            actual.setdefault(nombre, []).append((parametros, valor))
+        elif nombre == "X-WR-TIMEZONE":
+            zona_calendario = valor
+
+    destino = _zona(zona) or _zona(zona_calendario)
+    flotante = destino or datetime.now().astimezone().tzinfo
+    lunes = lunes_de(hoy or date.today())
+    desde = datetime.combine(lunes - timedelta(weeks=HISTORIA_SEMANAS), time(), flotante)
+    hasta = datetime.combine(lunes + timedelta(weeks=HORIZONTE_SEMANAS), time(), flotante)
+
+    # Instancias que un VEVENT con RECURRENCE-ID reemplaza (o cancela): no salen de la regla
+    reemplazadas = {}
+    for propiedades in vevents:
+        if "RECURRENCE-ID" in propiedades:
+            parametros, valor = _primera(propiedades, "RECURRENCE-ID")
+            momento = _fecha(valor, parametros, flotante)
+            if momento:
+                reemplazadas.setdefault(_primera(propiedades, "UID", ({}, ""))[1], set()).add(momento)
+
+    eventos = []
+    for propiedades in vevents:
+        eventos.extend(_eventos(propiedades, flotante, destino, reemplazadas, desde, hasta))
+    return sorted(eventos, key=lambda e: e.inicio)
+
+
+def _regla(valor, inicio):
+    """RRULE lista para dateutil: con DTSTART con zona, UNTIL tiene que venir en UTC."""
+    def a_utc(m):
+        fin = m.group(1)
+        limite = datetime.strptime(fin[:15], "%Y%m%dT%H%M%S") if "T" in fin else datetime.strptime(fin[:8], "%Y%m%d") + timedelta(days=1, seconds=-1)
+        return "UNTIL=" + limite.replace(tzinfo=inicio.tzinfo).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return re.sub(r"UNTIL=(\d{8}(?:T\d{6})?)(?![\dTZ])", a_utc, valor.strip())
+
+
+def _ocurrencias(propiedades, inicio, reemplazadas, desde, hasta):
+    """Inicios de cada repetición del evento dentro de [desde, hasta)."""
+    if "RRULE" not in propiedades:
+        return [inicio]
+    excluidas = set(reemplazadas.get(_primera(propiedades, "UID", ({}, ""))[1], ()))
+    for parametros, valor in propiedades.get("EXDATE", []):
+        for fecha in valor.split(","):
+            momento = _fecha(fecha, parametros, inicio.tzinfo)
+            if momento:
+                excluidas.add(momento)
+    try:
+        regla = rrulestr(_regla(_primera(propiedades, "RRULE")[1], inicio), dtstart=inicio)
+        fechas = regla.between(desde, hasta - timedelta(seconds=1), inc=True)
+    except (ValueError, TypeError):
+        return [inicio]  # regla que no se entiende: como antes, solo la primera fecha
+    return [f for f in fechas if f not in excluidas]
+
+
+def _eventos(propiedades, flotante, destino, reemplazadas, desde, hasta):
+    if "DTSTART" not in propiedades or _primera(propiedades, "STATUS", ({}, ""))[1].upper() == "CANCELLED":
+        return []
+    parametros, valor = _primera(propiedades, "DTSTART")
+    inicio = _fecha(valor, parametros, flotante)
+    if inicio is None:
+        return []
+    duracion = None
+    if "DTEND" in propiedades:
+        fin = _fecha(_primera(propiedades, "DTEND")[1], _primera(propiedades, "DTEND")[0], flotante)
+        duracion = int((fin - inicio).total_seconds() // 60) if fin else None
+    elif "DURATION" in propiedades:
+        duracion = _duracion(_primera(propiedades, "DURATION")[1])
+    tema = _texto(_primera(propiedades, "SUMMARY", ({}, "Reunión"))[1]) or "Reunión"
+    objetivo = _texto(_primera(propiedades, "DESCRIPTION", ({}, ""))[1])
+    return [
+        Evento(
+            tema=tema,
+            objetivo=objetivo,
+            # En la zona del usuario (o la del servidor), sin zona: así se muestra y se agrupa por semana
+            inicio=momento.astimezone(destino).replace(tzinfo=None),
+            duracion=duracion if duracion and duracion > 0 else DURACION_POR_DEFECTO,
+        )
+        for momento in _ocurrencias(propiedades, inicio, reemplazadas, desde, hasta)
+    ]
+
+
+# --- 3. SEMANAS ---
+def lunes_de(dia):
+    return dia - timedelta(days=dia.weekday())
+
+
+def de_la_semana(eventos, lunes):
+    """Los eventos entre ese lunes y el domingo siguiente."""
+    if isinstance(lunes, datetime):
+        lunes = lunes.date()
+    return [e for e in eventos if lunes <= e.inicio.date() < lunes + timedelta(days=7)]
+
+
+def semanas(eventos):
+    """Lunes de cada semana que tiene eventos, en orden."""
+    return sorted({lunes_de(e.inicio.date()) for e in eventos})
+
@@ -0,0 +1,103 @@
+import threading
+from concurrent.futures import Future
+
+
+class _Transmision:
+    """Trozos de una respuesta en streaming que varios lectores pueden seguir desde el inicio."""
+
+    def __init__(self):
+        self.trozos = []
+        self.terminada = False
+        self.error = None
+        self._cond = threading.Condition()
+
+    def agregar(self, trozo):
+        with self._cond:
+            self.trozos.append(trozo)
+            self._cond.notify_all()
+
+    def terminar(self, error=None):
+        with self._cond:
+            self.terminada = True
+            self.error = error
+            self._cond.notify_all()
+
+    def seguir(self):
+        leidos = 0
+        while True:
+            with self._cond:
+                while leidos == len(self.trozos) and not self.terminada:
+                    self._cond.wait()
+                nuevos = self.trozos[leidos:]
+                leidos += len(nuevos)
+                terminada, error = self.terminada, self.error
+            yield from nuevos
+            if terminada and leidos == len(self.trozos):
+                if error:
+                    raise error
+                return
+
+
+class LlamadasEnCurso:
+    """Une llamadas idénticas simultáneas: la primera va a la API y las demás reciben su resultado."""
+
+    def __init__(self):
+        self._futuros = {}
+        self._transmisiones = {}
+        self._lock = threading.Lock()
+        self.unidas = 0
+
+    def ejecutar(self, clave, funcion):
+        with self._lock:
+            futuro = self._futuros.get(clave)
+            lider = futuro is None
+            if lider:
+                futuro = self._futuros[clave] = Future()
+            else:
+                self.unidas += 1
+        if not lider:
+            return futuro.result()
+        try:
+            resultado = funcion()
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            with self._lock:
+                del self._futuros[clave]
+
+    def transmitir(self, clave, generador, al_liderar=None):
+        """Como ejecutar(), para streaming: un hilo consume la API y cada lector recibe todos los trozos.
+
+        El hilo no depende de ningún lector: si una sesión se va a mitad (rerun), las demás siguen.
+        al_liderar() se llama antes de volver, solo si esta llamada es la que va a la API.
+        """
+        with self._lock:
+            transmision = self._transmisiones.get(clave)
+            if transmision is None:
+                if al_liderar:
+                    al_liderar()
+                transmision = self._transmisiones[clave] = _Transmision()
+                threading.Thread(target=self._alimentar, args=(clave, transmision, generador), daemon=True).start()
+            else:
+                self.unidas += 1
+        return transmision.seguir()
+
+    def _alimentar(self, clave, transmision, generador):
+        try:
+            for trozo in generador():
+                transmision.agregar(trozo)
+        except Exception as e:
+            transmision.terminar(e)
+        else:
+            transmision.terminar()
+        finally:
+            with self._lock:
+                del self._transmisiones[clave]
+
+    def estadisticas(self):
+        with self._lock:
+            return {"en_curso": len(self._futuros) + len(self._transmisiones), "unidas": self.unidas}
@@ -0,0 +1,100 @@
+"""Peticiones de cobertura ("hedging"): si una llamada tarda más que el p95 habitual de su
+herramienta, se lanza un duplicado y se usa la primera respuesta que llegue.
+
+La otra no se puede cancelar a mitad (la llamada a la API es bloqueante): se ignora.
+Para no duplicar la cuota, los duplicados tienen un presupuesto: como mucho `fraccion`
+de las llamadas normales.
+"""
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from nucleo import telemetria
+
+MIN_MUESTRAS = 10   # sin este historial no se sabe cuál es el p95 y no se cubre
+ESPERA_MINIMA_S = 1.0
+
+# Solo para los duplicados: las llamadas originales no pasan por aquí, así que el pool
+# no limita cuántas hay en curso ni su tiempo en cola cuenta para la espera
+_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="cobertura")
+
+
+class PresupuestoCobertura:
+    def __init__(self, fraccion=0.1):
+        self.fraccion = fraccion
+        self.normales = 0
+        self.extra = 0
+        self._lock = threading.Lock()
+
+    def contar(self):
+        with self._lock:
+            self.normales += 1
+
+    def permitir(self):
+        """¿Queda cupo para un duplicado? (uno de gracia, luego `fraccion` de las normales)."""
+        with self._lock:
+            if self.extra + 1 > self.fraccion * self.normales + 1:
+                return False
+            self.extra += 1
+            return True
+
+    def devolver(self):
+        """El duplicado permitido al final no se lanzó (sin cupo en la cubeta)."""
+        with self._lock:
+            self.extra -= 1
+
+    def estadisticas(self):
+        with self._lock:
+            return {"normales": self.normales, "duplicadas": self.extra, "fraccion_max": self.fraccion}
+
+
+def espera_cobertura(herramienta, modelo):
+    """Segundos tras los que conviene cubrir: el p95 hasta el primer byte de esa herramienta."""
+    datos = telemetria.percentiles(modelo=modelo, herramienta=herramienta, hasta_primer_byte=True)
+    if not datos or datos["muestras"] < MIN_MUESTRAS:
+        return None
+    return max(ESPERA_MINIMA_S, datos["p95_s"])
+
+
+def _en_hilo_propio(funcion):
+    """Corre funcion() en un hilo nuevo (no en el pool) y devuelve su Future."""
+    futuro = Future()
+
+    def correr():
+        futuro.set_running_or_notify_cancel()
+        try:
+            futuro.set_result(funcion())
+        except BaseException as e:
+            futuro.set_exception(e)
+
+    threading.Thread(target=correr, name="cobertura-original", daemon=True).start()
+    return futuro
+
+
+def cubrir(funcion, espera_s, presupuesto, llamada=None, cupo=None):
+    """Ejecuta funcion(); si no terminó en espera_s y hay presupuesto, corre un duplicado.
+
+    funcion debe ser solo la llamada a la API, con el cupo ya tomado: la espera en la cubeta
+    no cuenta para espera_s. cupo() toma sin esperar el token del duplicado; si no hay, no se
+    cubre (sin cuota, el duplicado solo la gastaría). El original corre en un hilo propio que
+    arranca al instante, para poder devolver la respuesta del duplicado si llega antes.
+    """
+    presupuesto.contar()
+    original = _en_hilo_propio(funcion)
+    hechos, _ = wait([original], timeout=espera_s)
+    if hechos or not presupuesto.permitir():
+        return original.result()
+    if cupo and not cupo():
+        presupuesto.devolver()
+        return original.result()
+    if llamada:
+        llamada.coberturas += 1
+    pendientes = {original, _pool.submit(funcion)}
+    while True:
+        hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+        # Gana la primera respuesta buena, aunque las dos terminen en la misma espera;
+        # un error solo se lanza si ya no queda ninguna en curso
+        for futuro in hechos:
+            if futuro.exception() is None:
+                return futuro.result()
+        if not pendientes:
+            return next(iter(hechos)).result()
@@ -0,0 +1,64 @@
+import functools
+
+import streamlit as st
+
+from nucleo.memoria import obtener_almacen
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _en_almacen(nombre, _construir, *args):
+    # `nombre` separa los exportadores en la caché; _construir no entra en la clave
+    data, mime, ext = _construir(*args)
+    try:
+        return obtener_almacen().guardar(data), mime, ext
+    except OSError:
+        return None, mime, ext  # sin disco escribible: se arma cada vez
+
+
+def archivo_en_almacen(exportador):
+    """Memoiza exportador(*args) -> (bytes, mime, extension) por sus argumentos, como
+    st.cache_data, pero en la caché queda solo la clave del archivo en el almacén en disco
+    (ver nucleo/memoria.py): los bytes no se quedan en la memoria del proceso."""
+    nombre = f"{exportador.__code__.co_filename}:{exportador.__qualname__}"
+
+    @functools.wraps(exportador)
+    def envoltorio(*args):
+        clave, mime, ext = _en_almacen(nombre, exportador, *args)
+        data = obtener_almacen().leer(clave) if clave else None
+        if data is None:
+            # La limpieza del almacén lo borró: se arma de nuevo (y vuelve con la misma clave)
+            data, mime, ext = exportador(*args)
+            if clave:
+                try:
+                    obtener_almacen().guardar(data)
+                except OSError:
+                    pass
+        return data, mime, ext
+
+    return envoltorio
+
+
+def descarga_diferida(clave, formato, construir, nombre_archivo, etiqueta):
+    """Construye el archivo solo cuando el usuario lo pide y luego muestra el botón de descarga.
+
+    construir() -> (bytes, mime, extension). Conviene que el exportador esté memoizado con
+    archivo_en_almacen: cambiar de formato y volver, o renombrar el archivo, no lo regenera.
+    """
+    listos = st.session_state.setdefault(f"_descargas_{clave}", set())
+    if formato not in listos:
+        if not st.button(f"📄 Preparar {formato}", key=f"preparar_{clave}", use_container_width=True):
+            return
+        listos.add(formato)
+    data, mime, ext = construir()
+    st.download_button(
+        label=etiqueta,
+        data=data,
+        file_name=f"{nombre_archivo}.{ext}",
+        mime=mime,
+        use_container_width=True
+    )
+
+
+def olvidar_descargas(clave):
+    """Llamar al generar un resultado nuevo: los archivos preparados eran del anterior."""
+    st.session_state.pop(f"_descargas_{clave}", None)
@@ -0,0 +1,60 @@
+from dataclasses import dataclass, field
+
+
+def campo(descripcion):
+    """Campo obligatorio; la descripción viaja al response_schema y a las instrucciones del prompt."""
+    return field(metadata={"descripcion": descripcion})
+
+
+# --- 1. LIDERAZGO ---
+@dataclass
+class PlanDelegacion:
+    diagnostico: str = campo("Identifica si es E1, E2, E3 o E4 y explica por qué")
+    pasos: str = campo("Lista de 3 pasos clave para la reunión, uno por línea")
+    guion: str = campo("El diálogo exacto que dirá el líder en la reunión")
+
+
+# --- 2. COMUNICACIÓN ---
+@dataclass
+class PropuestasCorreo:
+    profesional: str = campo("Versión profesional (formal) del mensaje")
+    directo: str = campo("Versión directa (ejecutiva) del mensaje")
+    coloquial: str = campo("Versión coloquial (cercana) del mensaje")
+
+
+@dataclass
+class PedidoImpecable:
+    guion: str = campo("El guion del pedido, listo para copiar/pegar, tono profesional y asertivo")
+    analisis: str = campo("Explicación breve de por qué este pedido reduce incertidumbre")
+
+
+# --- 3. PRODUCTIVIDAD ---
+@dataclass
+class ItemAgenda:
+    minutos: str = campo("Tramo de tiempo, ej: 00-05")
+    actividad: str = campo("Actividad breve")
+    responsable: str = campo("Rol o nombre del responsable")
+
+
+@dataclass
+class Agenda:
+    agenda: list[ItemAgenda] = campo("Bloques de la reunión en orden")
+    consejos: str = campo("Consejos prácticos para facilitar la reunión")
+
+
+@dataclass
+class MatrizEisenhower:
+    hacer: list[str] = campo("Tareas urgentes e importantes")
+    planificar: list[str] = campo("Tareas importantes pero no urgentes")
+    delegar: list[str] = campo("Tareas urgentes pero no importantes")
+    eliminar: list[str] = campo("Tareas ni urgentes ni importantes")
+    recomendacion_top: str = campo("Un consejo breve de una frase sobre el foco de hoy")
+
+
+# --- 4. NEGOCIACIÓN ---
+@dataclass
+class PlanHarvard:
+    poder: str = campo("Diagnóstico de poder: analiza el MAAN del usuario. ¿Es fuerte o débil? ¿Debe revelarlo o mejorarlo?")
+    valor: str = campo("Estrategia A, creación de valor: propuesta creativa de mutuo beneficio y frase de apertura exacta")
+    criterios: str = campo("Estrategia B, criterios objetivos: estándar independiente a usar y frase para re-encuadrar")
+    preguntas: str = campo("3 preguntas poderosas para descubrir más información en la mesa")
@@ -0,0 +1,167 @@
+import json
+import typing
+from dataclasses import fields, is_dataclass
+
+from nucleo.modelos import MODELO_GEMMA, normalizar_modelo
+from nucleo.ruteo import como_ruta, intentar
+
+# Gemma no acepta response_mime_type/response_schema: el esquema va solo en el prompt
+MODELOS_SIN_MODO_JSON = {MODELO_GEMMA}
+
+TIPOS = {str: "STRING", int: "INTEGER", float: "NUMBER", bool: "BOOLEAN"}
+
+
+class RespuestaIncompleta(ValueError):
+    """La IA no devolvió algunos campos ni siquiera tras pedirlos de nuevo."""
+
+    def __init__(self, campos):
+        super().__init__(f"Faltan campos en la respuesta de la IA: {', '.join(campos)}")
+        self.campos = campos
+
+
+# --- 1. ESQUEMAS A PARTIR DE LOS DATACLASSES ---
+def esquema_de(tipo, campos=None):
+    """response_schema (subconjunto OpenAPI) para un dataclass de nucleo.esquemas."""
+    if is_dataclass(tipo):
+        hints = typing.get_type_hints(tipo)
+        nombres = [f.name for f in fields(tipo) if campos is None or f.name in campos]
+        descripciones = {f.name: f.metadata.get("descripcion", "") for f in fields(tipo)}
+        return {
+            "type": "OBJECT",
+            "properties": {n: dict(esquema_de(hints[n]), description=descripciones[n]) for n in nombres},
+            "required": nombres,
+        }
+    if typing.get_origin(tipo) is list:
+        return {"type": "ARRAY", "items": esquema_de(typing.get_args(tipo)[0])}
+    return {"type": TIPOS[tipo]}
+
+
+def config_json(modelo, tipo, campos=None):
+    if normalizar_modelo(modelo) in MODELOS_SIN_MODO_JSON:
+        return None
+    return {"response_mime_type": "application/json", "response_schema": esquema_de(tipo, campos)}
+
+
+def prompt_json(prompt, tipo, campos=None):
+    """Añade al prompt la descripción de los campos que debe traer el JSON."""
+    lineas = [
+        f'- "{f.name}": {f.metadata.get("descripcion", "")}'
+        for f in fields(tipo) if campos is None or f.name in campos
+    ]
+    return prompt + "\n\nResponde EXCLUSIVAMENTE con un objeto JSON con estos campos:\n" + "\n".join(lineas)
+
+
+# --- 2. LECTURA Y VALIDACIÓN ---
+def leer_json(texto):
+    # Tolerante con ```json y con texto antes o después del objeto
+    texto = texto.replace("```json", "").replace("```", "").strip()
+    inicio, fin = texto.find("{"), texto.rfind("}") + 1
+    try:
+        datos = json.loads(texto[inicio:fin] if inicio != -1 and fin else texto)
+    except ValueError:
+        return {}
+    return datos if isinstance(datos, dict) else {}
+
+
+def convertir(tipo, valor):
+    """Convierte el JSON al tipo declarado; lanza TypeError/ValueError si no encaja."""
+    if is_dataclass(tipo):
+        if not isinstance(valor, dict):
+            raise TypeError(f"se esperaba un objeto para {tipo.__name__}")
+        hints = typing.get_type_hints(tipo)
+        return tipo(**{f.name: convertir(hints[f.name], valor.get(f.name)) for f in fields(tipo)})
+    if typing.get_origin(tipo) is list:
+        if not isinstance(valor, list):
+            raise TypeError("se esperaba una lista")
+        return [convertir(typing.get_args(tipo)[0], v) for v in valor]
+    if tipo is str:
+        if not isinstance(valor, str):
+            raise TypeError("se esperaba texto")
+        return valor.strip()
+    return tipo(valor)
+
+
+def campos_fallidos(tipo, datos):
+    hints = typing.get_type_hints(tipo)
+    fallidos = []
+    for f in fields(tipo):
+        try:
+            valor = convertir(hints[f.name], datos.get(f.name))
+        except (TypeError, ValueError):
+            fallidos.append(f.name)
+            continue
+        if valor == "":
+            fallidos.append(f.name)
+    return fallidos
+
+
+# --- 3. GENERACIÓN ---
+# `ruta` es una nucleo.ruteo.Ruta (modelos en orden de preferencia) o un nombre de modelo suelto
+def estructurar(ia, ruta, prompt, tipo, texto, reintentos=1, herramienta=""):
+    """Valida el texto generado contra el esquema y vuelve a pedir SOLO los campos que fallaron."""
+    datos = leer_json(texto)
+    fallidos = campos_fallidos(tipo, datos)
+    while fallidos and reintentos > 0:
+        completos = {k: v for k, v in datos.items() if k not in fallidos}
+        prompt_parcial = (
+            f"{prompt}\n\nYa tienes esta parte de la respuesta:\n{json.dumps(completos, ensure_ascii=False)}\n"
+            f"Genera SOLO los campos que faltan: {', '.join(fallidos)}."
+        )
+        _, parcial = intentar(ruta, lambda modelo, timeout: ia.generar_texto(
+            modelo, prompt_json(prompt_parcial, tipo, fallidos), config=config_json(modelo, tipo, fallidos),
+            herramienta=herramienta, timeout=timeout,
+        ))
+        datos.update({k: v for k, v in leer_json(parcial).items() if k in fallidos})
+        fallidos = campos_fallidos(tipo, datos)
+        reintentos -= 1
+    if fallidos:
+        raise RespuestaIncompleta(fallidos)
+    return convertir(tipo, datos)
+
+
+def generar_estructurado(ia, ruta, prompt, tipo, reintentos=1, herramienta="", escribir=None):
+    """Pide un JSON contra el esquema de `tipo` y lo devuelve como instancia de ese dataclass.
+
+    Si un modelo falla, se pasa del objetivo o no completa el esquema, se prueba el siguiente.
+    Con escribir(trozo) se pide en streaming y cada trozo del JSON se entrega mientras llega
+    (Ej: trabajo.agregar, para pintar los campos a medida que se escriben).
+    """
+    if escribir:
+        partes = []
+        for trozo in generar_estructurado_stream(ia, ruta, prompt, tipo, herramienta):
+            partes.append(trozo)
+            escribir(trozo)
+        # Al final se valida el JSON completo; solo un campo fallido se vuelve a pedir
+        return estructurar(ia, ruta, prompt, tipo, "".join(partes), reintentos, herramienta)
+
+    def llamar(modelo, timeout):
+        texto = ia.generar_texto(
+            modelo, prompt_json(prompt, tipo), config=config_json(modelo, tipo),
+            validar=lambda t: not campos_fallidos(tipo, leer_json(t)), herramienta=herramienta, timeout=timeout,
+        )
+        return estructurar(ia, modelo, prompt, tipo, texto, reintentos, herramienta)
+
+    return intentar(ruta, llamar)[1]
+
+
+def generar_estructurado_stream(ia, ruta, prompt, tipo, herramienta=""):
+    """Flujo de trozos de texto JSON (para mostrar con campos_json_incrementales y luego estructurar).
+
+    El respaldo solo actúa antes del primer trozo: lo ya mostrado no se cambia de modelo, y el
+    streaming no se corta por tiempo.
+    """
+    modelos = como_ruta(ruta).modelos
+    for i, modelo in enumerate(modelos):
+        flujo = ia.generar_stream(
+            modelo, prompt_json(prompt, tipo), config=config_json(modelo, tipo),
+            validar=lambda t: not campos_fallidos(tipo, leer_json(t)), herramienta=herramienta,
+        )
+        try:
+            primero = next(flujo, "")
+        except Exception:
+            if i == len(modelos) - 1:
+                raise
+            continue
+        yield primero
+        yield from flujo
+        return
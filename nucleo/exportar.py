@@ -0,0 +1,399 @@
+import functools
+import io
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+# python-docx, fpdf y openpyxl se importan en el primer uso de cada formato: las páginas
+# importan este módulo al cargar y no deben pagar esas librerías si nadie exporta.
+
+MIMES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "txt": "text/plain",
+}
+
+# TTF Unicode para el PDF (regular, negrita): la primera que exista. PDF_FUENTE y
+# PDF_FUENTE_NEGRITA permiten indicar otra. En Streamlit Cloud, DejaVu se instala con
+# fonts-dejavu-core en packages.txt. Sin ninguna, el PDF sigue en latin-1.
+FUENTES_UNICODE = [
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+    ("/usr/share/fonts/dejavu/DejaVuSans.ttf", "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf"),
+    ("/usr/share/fonts/TTF/DejaVuSans.ttf", "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf"),
+    ("/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+     "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf"),
+    ("C:/Windows/Fonts/arial.ttf", "C:/Windows/Fonts/arialbd.ttf"),
+]
+
+
+# --- 1. MODELO DEL DOCUMENTO ---
+@dataclass
+class Seccion:
+    titulo: str
+    texto: str = ""
+    tabla: list = None           # filas; la primera son los encabezados
+    anchos: list = None          # anchos de columna en el PDF (mm), opcional
+    hoja: str = None             # nombre de la hoja en Excel para la tabla
+
+
+@dataclass
+class Documento:
+    titulo: str
+    datos: list = field(default_factory=list)      # pares (etiqueta, valor) bajo el título
+    secciones: list = field(default_factory=list)
+
+
+def formato_de(etiqueta):
+    """'Word (.docx)', 'PDF', 'Excel'... -> extensión que entiende exportar()."""
+    etiqueta = etiqueta.lower()
+    for clave, ext in (("word", "docx"), ("pdf", "pdf"), ("excel", "xlsx"), ("tex", "txt")):
+        if clave in etiqueta:
+            return ext
+    raise ValueError(f"Formato no soportado: {etiqueta}")
+
+
+# --- 2. MEDICIÓN DEL COSTO DE EXPORTAR ---
+_hooks = []
+_tiempos = {}  # (herramienta, formato) -> [cantidad, segundos totales, máximo]
+_lock = threading.Lock()
+
+
+def agregar_hook_tiempo(funcion):
+    """funcion(herramienta, formato, segundos, tamano_bytes) se llama tras cada exportación."""
+    _hooks.append(funcion)
+
+
+def estadisticas_exportacion():
+    with _lock:
+        return {
+            f"{herramienta}/{formato}": {"cantidad": n, "promedio_s": total / n, "max_s": maximo}
+            for (herramienta, formato), (n, total, maximo) in _tiempos.items()
+        }
+
+
+def _registrar(herramienta, formato, segundos, tamano):
+    with _lock:
+        n, total, maximo = _tiempos.get((herramienta, formato), (0, 0.0, 0.0))
+        _tiempos[(herramienta, formato)] = (n + 1, total + segundos, max(maximo, segundos))
+    for hook in _hooks:
+        hook(herramienta, formato, segundos, tamano)
+
+
+# --- 3. RECURSOS CARGADOS UNA VEZ POR PROCESO ---
+@functools.lru_cache(maxsize=None)
+def _plantilla_docx():
+    # La plantilla por defecto de python-docx se lee del paquete una sola vez
+    from docx import Document
+    bio = io.BytesIO()
+    Document().save(bio)
+    return bio.getvalue()
+
+
+def L(t):
+    # Las fuentes base del PDF son latin-1: lo que no entra se reemplaza por "?"
+    return str(t).encode('latin-1', 'replace').decode('latin-1') if t else ""
+
+
+def _fuente_configurada(nombre):
+    from nucleo.ia import leer_config
+    ruta = leer_config(nombre)
+    return ruta if ruta and os.path.isfile(ruta) else None
+
+
+def _buscar_ttf():
+    # PDF_FUENTE si apunta a un archivo que existe; si no, la primera fuente del sistema
+    regular = _fuente_configurada("PDF_FUENTE")
+    if regular:
+        return regular, _fuente_configurada("PDF_FUENTE_NEGRITA")
+    for regular, negrita in FUENTES_UNICODE:
+        if os.path.isfile(regular):
+            return regular, negrita if os.path.isfile(negrita) else None
+    return None, None
+
+
+# Caracteres que se incrustan siempre: así casi todos los documentos piden el mismo
+# subconjunto de la fuente y se reutiliza el ya armado (ver _subconjunto_ttf)
+CARACTERES_BASE = list(range(0, 256)) + [ord(c) for c in "“”‘’–—•…€✓"]
+
+class _Subconjunto(list):
+    """Caracteres usados en el documento, sin repetidos. fpdf agrega a la lista cada carácter
+    de cada celda: sin esto crece con el largo del texto y `in` la recorre entera."""
+
+    def __init__(self, codigos):
+        super().__init__()
+        self._vistos = set()
+        for codigo in codigos:
+            self.append(codigo)
+
+    def append(self, codigo):
+        if codigo not in self._vistos:
+            self._vistos.add(codigo)
+            super().append(codigo)
+
+    def __delitem__(self, indice):
+        self._vistos.discard(self[indice])
+        super().__delitem__(indice)
+
+    def __contains__(self, codigo):
+        return codigo in self._vistos
+
+
+def _sin_glifo(anchos):
+    # Caracteres que la fuente no tiene (ancho 0) y todo lo que está fuera del plano básico,
+    # como los emoji: fpdf falla con ellos, así que se quitan del texto
+    rangos, inicio = [], None
+    for codigo in range(len(anchos) + 1):
+        falta = codigo < len(anchos) and not anchos[codigo] and chr(codigo) not in "\t\n\r"
+        if falta and inicio is None:
+            inicio = codigo
+        elif not falta and inicio is not None:
+            rangos.append(f"{re.escape(chr(inicio))}-{re.escape(chr(codigo - 1))}")
+            inicio = None
+    return re.compile(f"[{''.join(rangos)}\\U{len(anchos):08x}-\\U0010ffff]")
+
+
+def _fpdf_conocido():
+    # Los dos cachés de abajo reutilizan lo que arma PyFPDF 1.7 (las entradas de add_font y el
+    # TTFontFile del subconjunto). Con otra versión, o con fpdf2 (que instala el mismo módulo),
+    # cada PDF lee la fuente con add_font(): más lento, pero el PDF sale igual de bien
+    import fpdf
+    return str(getattr(fpdf, "FPDF_VERSION", "")).startswith("1.7")
+
+
+@functools.lru_cache(maxsize=32)
+def _subconjunto_ttf(ruta, codigos):
+    from fpdf.ttfonts import TTFontFile
+    ttf = TTFontFile()
+    flujo = ttf.makeSubset(ruta, list(codigos))
+    return flujo, ttf.maxUni, ttf.codeToGlyph
+
+
+def _instalar_subconjunto_cacheado():
+    # fpdf arma el subconjunto de la TTF (volviendo a leer el archivo) en cada output();
+    # con los mismos caracteres el resultado es el mismo, así que se guarda por proceso
+    import fpdf.fpdf
+    from fpdf.ttfonts import TTFontFile
+
+    class _TTFCacheado(TTFontFile):
+        def makeSubset(self, ruta, subset):
+            flujo, self.maxUni, self.codeToGlyph = _subconjunto_ttf(ruta, tuple(sorted(set(subset))))
+            return flujo
+
+    fpdf.fpdf.TTFontFile = _TTFCacheado
+
+
+@dataclass
+class _FuenteUnicode:
+    regular: str
+    negrita: str
+    fonts: dict = None          # lo que deja add_font() (solo con PyFPDF 1.7, ver _fpdf_conocido)
+    font_files: dict = None
+    sin_glifo: re.Pattern = None
+
+
+@functools.lru_cache(maxsize=None)
+def _fuente_unicode():
+    """Métricas de la TTF (anchos de cada carácter, descriptor) leídas una sola vez por proceso.
+
+    fpdf las recalcula del archivo en cada add_font(): aquí se leen en un PDF descartable
+    y cada PDF nuevo recibe una copia de esas entradas. None si no hay TTF disponible.
+    """
+    regular, negrita = _buscar_ttf()
+    if not regular:
+        return None
+    if not _fpdf_conocido():
+        return _FuenteUnicode(regular, negrita)
+    from fpdf import FPDF, set_global
+    set_global("FPDF_CACHE_MODE", 1)  # sin .pkl junto a la fuente (suele ser una carpeta del sistema)
+    _instalar_subconjunto_cacheado()
+    pdf = FPDF()
+    pdf.add_font("Unicode", "", regular, uni=True)
+    pdf.add_font("Unicode", "B", negrita or regular, uni=True)
+    return _FuenteUnicode(regular, negrita, pdf.fonts, pdf.font_files, _sin_glifo(pdf.fonts["unicode"]["cw"]))
+
+
+@functools.lru_cache(maxsize=None)
+def _clase_pdf():
+    from fpdf import FPDF
+
+    class _PDF(FPDF):
+        titulo = ""
+        sin_glifo = None
+
+        def __init__(self):
+            super().__init__()
+            fuente = _fuente_unicode()
+            self.familia = "Unicode" if fuente else "Arial"
+            if fuente and fuente.fonts:
+                # Lo mismo que deja add_font(), sin volver a leer el TTF; el subconjunto
+                # de caracteres usados es de cada documento
+                self.sin_glifo = fuente.sin_glifo
+                for clave, datos in fuente.fonts.items():
+                    self.fonts[clave] = dict(datos, i=len(self.fonts) + 1, subset=_Subconjunto(datos["subset"] + CARACTERES_BASE))
+                self.font_files.update({clave: dict(datos) for clave, datos in fuente.font_files.items()})
+            elif fuente:
+                self.add_font("Unicode", "", fuente.regular, uni=True)
+                self.add_font("Unicode", "B", fuente.negrita or fuente.regular, uni=True)
+
+        def texto(self, t):
+            if self.familia == "Arial":
+                return L(t)
+            if not t:
+                return ""
+            return self.sin_glifo.sub("", str(t)) if self.sin_glifo else str(t)
+
+        def header(self):
+            self.set_font(self.familia, 'B', 14)
+            self.cell(0, 10, self.texto(self.titulo), 0, 1, 'C')
+            self.ln(5)
+
+    return _PDF
+
+
+# --- 4. RENDERIZADORES ---
+def _docx(doc_modelo):
+    from docx import Document
+    doc = Document(io.BytesIO(_plantilla_docx()))
+    doc.add_heading(doc_modelo.titulo, 0)
+    for etiqueta, valor in doc_modelo.datos:
+        doc.add_paragraph(f"{etiqueta}: {valor}")
+    for sec in doc_modelo.secciones:
+        doc.add_heading(sec.titulo, level=1)
+        if sec.tabla:
+            table = doc.add_table(rows=0, cols=len(sec.tabla[0]))
+            table.style = 'Table Grid'
+            for fila in sec.tabla:
+                celdas = table.add_row().cells
+                for celda, valor in zip(celdas, fila):
+                    celda.text = str(valor)
+        if sec.texto:
+            doc.add_paragraph(sec.texto)
+    bio = io.BytesIO()
+    doc.save(bio)
+    return bio.getvalue()
+
+
+def _pdf(doc_modelo):
+    pdf = _clase_pdf()()
+    pdf.titulo = doc_modelo.titulo
+    pdf.add_page()
+    for etiqueta, valor in doc_modelo.datos:
+        pdf.set_font(pdf.familia, 'B', 11)
+        pdf.cell(pdf.get_string_width(pdf.texto(f"{etiqueta}: ")) + 1, 6, pdf.texto(f"{etiqueta}: "))
+        pdf.set_font(pdf.familia, '', 11)
+        pdf.multi_cell(0, 6, pdf.texto(valor))
+    pdf.ln(5)
+    for sec in doc_modelo.secciones:
+        pdf.set_font(pdf.familia, 'B', 12)
+        pdf.set_text_color(0, 50, 100)
+        pdf.cell(0, 10, pdf.texto(sec.titulo), 0, 1)
+        pdf.set_text_color(0, 0, 0)
+        if sec.tabla:
+            anchos = sec.anchos or [190 / len(sec.tabla[0])] * len(sec.tabla[0])
+            pdf.set_fill_color(240, 240, 240)
+            pdf.set_font(pdf.familia, 'B', 10)
+            for ancho, valor in zip(anchos, sec.tabla[0]):
+                pdf.cell(ancho, 10, pdf.texto(valor), 1, 0, 'C', 1)
+            pdf.ln()
+            pdf.set_font(pdf.familia, '', 10)
+            for fila in sec.tabla[1:]:
+                for ancho, valor in zip(anchos, fila):
+                    pdf.cell(ancho, 10, pdf.texto(valor), 1)
+                pdf.ln()
+            pdf.ln(3)
+        if sec.texto:
+            pdf.set_font(pdf.familia, '', 11)
+            pdf.multi_cell(0, 6, pdf.texto(sec.texto))
+        pdf.ln(5)
+    salida = pdf.output(dest='S')
+    # PyFPDF devuelve str en latin-1; fpdf2, bytearray
+    return salida.encode('latin-1') if isinstance(salida, str) else bytes(salida)
+
+
+def _xlsx(doc_modelo):
+    # Una hoja por tabla y una hoja "Detalles" con los datos y textos
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for sec in doc_modelo.secciones:
+        if sec.tabla:
+            ws = wb.create_sheet((sec.hoja or sec.titulo)[:31])
+            for fila in sec.tabla:
+                ws.append([str(v) for v in fila])
+    detalles = wb.create_sheet("Detalles")
+    detalles.append(["Dato", "Valor"])
+    detalles.append(["Título", doc_modelo.titulo])
+    for etiqueta, valor in doc_modelo.datos:
+        detalles.append([etiqueta, str(valor)])
+    for sec in doc_modelo.secciones:
+        if sec.texto:
+            detalles.append([sec.titulo, sec.texto])
+    bio = io.BytesIO()
+    wb.save(bio)
+    return bio.getvalue()
+
+
+def _nombre_hoja(nombre, usados):
+    # Excel: máximo 31 caracteres, sin []:*?/\ y sin repetir (sin distinguir mayúsculas)
+    base = re.sub(r"[\[\]:*?/\\]", "-", " ".join(str(nombre).split()))[:31].strip() or "Hoja"
+    nombre, n = base, 2
+    while nombre.lower() in usados:
+        sufijo = f" ({n})"
+        nombre, n = base[:31 - len(sufijo)] + sufijo, n + 1
+    usados.add(nombre.lower())
+    return nombre
+
+
+def _libro(hojas):
+    # write_only: cada fila se vuelca a disco al agregarla, la memoria no crece con las hojas
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    usados = set()
+    for nombre, doc_modelo in hojas:
+        ws = wb.create_sheet(_nombre_hoja(nombre, usados))
+        ws.append([doc_modelo.titulo])
+        for etiqueta, valor in doc_modelo.datos:
+            ws.append([etiqueta, str(valor)])
+        for sec in doc_modelo.secciones:
+            ws.append([])
+            ws.append([sec.titulo])
+            for fila in sec.tabla or []:
+                ws.append([str(v) for v in fila])
+            if sec.texto:
+                ws.append([sec.texto])
+    bio = io.BytesIO()
+    wb.save(bio)
+    return bio.getvalue()
+
+
+def _txt(doc_modelo):
+    lineas = [doc_modelo.titulo.upper(), "=" * len(doc_modelo.titulo), ""]
+    lineas += [f"{etiqueta}: {valor}" for etiqueta, valor in doc_modelo.datos]
+    for sec in doc_modelo.secciones:
+        lineas += ["", sec.titulo, "-" * len(sec.titulo)]
+        if sec.tabla:
+            lineas += [" | ".join(str(v) for v in fila) for fila in sec.tabla]
+        if sec.texto:
+            lineas.append(sec.texto)
+    return "\n".join(lineas).encode("utf-8")
+
+
+RENDERIZADORES = {"docx": _docx, "pdf": _pdf, "xlsx": _xlsx, "txt": _txt}
+
+
+def exportar(documento, formato, herramienta=""):
+    """Genera el archivo en el formato pedido. Devuelve (bytes, mime, extension)."""
+    inicio = time.perf_counter()
+    data = RENDERIZADORES[formato](documento)
+    _registrar(herramienta, formato, time.perf_counter() - inicio, len(data))
+    return data, MIMES[formato], formato
+
+
+def exportar_libro(hojas, herramienta=""):
+    """Un solo Excel con una hoja por documento. hojas: pares (nombre de la hoja, Documento)."""
+    inicio = time.perf_counter()
+    data = _libro(hojas)
+    _registrar(herramienta, "xlsx_libro", time.perf_counter() - inicio, len(data))
+    return data, MIMES["xlsx"], "xlsx"
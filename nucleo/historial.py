@@ -0,0 +1,364 @@
+"""Historial persistente de lo generado por cada herramienta: SQLite en modo WAL con un
+índice FTS5 sobre entradas y resultados, para buscar y reabrir sin volver a llamar a la IA.
+Si se pide algo casi igual a lo ya guardado (ver nucleo/similitud.py), se ofrece lo guardado.
+
+Se activa con HISTORIAL_RUTA (Ej: "historial.sqlite"); sin ella no se guarda nada. Cada
+artefacto tiene dueño (ver dueno_actual) y solo su dueño lo ve, lo busca o se le ofrece como
+parecido: la misma instancia la usan muchas personas a la vez. Un artefacto queda "aceptado"
+cuando su dueño lo reabre o lo marca como bueno; solo esos sirven para entrenar (ver
+nucleo/preclasificador.py).
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import streamlit as st
+
+from herramientas import HERRAMIENTAS
+from nucleo import similitud
+from nucleo.ia import leer_config
+
+SIMILITUD_MINIMA = 0.8  # Jaccard del campo menos parecido; 1 = solo las mismas palabras
+MAX_CANDIDATOS = 50
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS artefactos (
+    id INTEGER PRIMARY KEY,
+    herramienta TEXT NOT NULL,
+    dueno TEXT NOT NULL DEFAULT '',
+    aceptado INTEGER NOT NULL DEFAULT 0,
+    fecha REAL NOT NULL,
+    titulo TEXT NOT NULL,
+    entrada TEXT NOT NULL,
+    resultado TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bandas (
+    valor INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    PRIMARY KEY (valor, id)
+) WITHOUT ROWID;
+"""
+# Sin tildes en el índice: "reunion" encuentra "reunión". El dueño va como una sola palabra
+# (ver _marca_dueno) para filtrar dentro del MATCH y no después, fila por fila
+ESQUEMA_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS busqueda USING fts5("
+    "dueno, herramienta, texto, tokenize = 'unicode61 remove_diacritics 2')"
+)
+INDICE_DUENO = "CREATE INDEX IF NOT EXISTS artefactos_dueno ON artefactos (dueno, herramienta, id)"
+# PRAGMA user_version; 1 = el dueño está en el índice FTS y en las bandas
+VERSION_ESQUEMA = 1
+
+
+# --- 1. ALMACÉN ---
+def _textos(valor):
+    # Todos los textos de un dict/lista anidados, para indexarlos
+    if isinstance(valor, dict):
+        return [t for v in valor.values() for t in _textos(v)]
+    if isinstance(valor, (list, tuple)):
+        return [t for v in valor for t in _textos(v)]
+    return [str(valor)] if isinstance(valor, (str, int, float)) and valor != "" else []
+
+
+def titulo_de(*textos, largo=80):
+    """El primero de los textos que no esté vacío (la tarea, el tema, el borrador...)."""
+    texto = next((v for v in textos if isinstance(v, str) and v.strip()), "Sin título")
+    texto = " ".join(texto.split())
+    return texto if len(texto) <= largo else texto[:largo - 1] + "…"
+
+
+def _marca_dueno(dueno):
+    # Una palabra que el tokenizador no parte (un correo sí: "correo", "ana", "gmail"...)
+    return "d" + hashlib.sha1(dueno.encode("utf-8")).hexdigest()[:20]
+
+
+def _texto_indexado(entrada, resultado):
+    return "\n".join(_textos(entrada) + _textos({k: v for k, v in resultado.items() if k != "avisos"}))
+
+
+def _huella(herramienta, entrada, dueno):
+    """(rasgos por campo de texto, bandas MinHash) de la entrada según los campos de la herramienta.
+    Las bandas llevan el dueño: las de otros usuarios no coinciden nunca."""
+    modulo = HERRAMIENTAS.get(herramienta)
+    if modulo:
+        campos, ajustes = list(modulo.LIMITES_TOKENS), modulo.AJUSTES
+    else:
+        campos, ajustes = [k for k, v in entrada.items() if isinstance(v, str)], ()
+    rasgos = similitud.rasgos_por_campo(entrada, campos)
+    opciones = {k: " ".join(str(entrada.get(k, "")).lower().split()) for k in ajustes}
+    clave = json.dumps([herramienta, opciones, dueno], sort_keys=True, ensure_ascii=False)
+    return rasgos, similitud.bandas(rasgos, clave)
+
+
+class Historial:
+    def __init__(self, ruta, similitud_minima=SIMILITUD_MINIMA):
+        self.similitud_minima = similitud_minima
+        self._db = sqlite3.connect(ruta, check_same_thread=False)
+        self._lock = threading.Lock()
+        # WAL: las lecturas (búsquedas de otras sesiones) no esperan a las escrituras
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(ESQUEMA_SQL)
+        columnas = {fila[1] for fila in self._db.execute("PRAGMA table_info(artefactos)")}
+        if "dueno" not in columnas:
+            # Historial de antes de los dueños: sus filas quedan sin dueño y no las ve nadie
+            self._db.execute("ALTER TABLE artefactos ADD COLUMN dueno TEXT NOT NULL DEFAULT ''")
+        if "aceptado" not in columnas:
+            self._db.execute("ALTER TABLE artefactos ADD COLUMN aceptado INTEGER NOT NULL DEFAULT 0")
+        self._db.execute("DROP INDEX IF EXISTS artefactos_herramienta")
+        self._db.execute(INDICE_DUENO)
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        try:
+            if version < VERSION_ESQUEMA:
+                self._db.execute("DROP TABLE IF EXISTS busqueda")
+            self._db.execute(ESQUEMA_FTS)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False  # SQLite compilado sin FTS5: se busca con LIKE, más lento
+        if version < VERSION_ESQUEMA:
+            self._reindexar()
+            self._db.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+        self._db.commit()
+
+    def _reindexar(self, lote=500):
+        """Rehace el índice FTS y las bandas de un historial de una versión anterior (una sola vez)."""
+        self._db.execute("DELETE FROM bandas")
+        ultimo = 0
+        while True:
+            filas = self._db.execute(
+                "SELECT id, herramienta, dueno, entrada, resultado FROM artefactos WHERE id > ? ORDER BY id LIMIT ?",
+                (ultimo, lote),
+            ).fetchall()
+            if not filas:
+                return
+            for id_artefacto, herramienta, dueno, entrada, resultado in filas:
+                entrada, resultado = json.loads(entrada), json.loads(resultado)
+                if self.fts:
+                    self._db.execute(
+                        "INSERT INTO busqueda (rowid, dueno, herramienta, texto) VALUES (?, ?, ?, ?)",
+                        (id_artefacto, _marca_dueno(dueno), herramienta, _texto_indexado(entrada, resultado)),
+                    )
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO bandas (valor, id) VALUES (?, ?)",
+                    [(b, id_artefacto) for b in _huella(herramienta, entrada, dueno)[1]],
+                )
+            ultimo = filas[-1][0]
+
+    def guardar(self, herramienta, entrada, resultado, dueno, titulo=None):
+        fila = (herramienta, dueno, time.time(), titulo_de(titulo, *entrada.values()),
+                json.dumps(entrada, ensure_ascii=False), json.dumps(resultado, ensure_ascii=False))
+        _, bandas = _huella(herramienta, entrada, dueno)
+        texto = _texto_indexado(entrada, resultado)
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO artefactos (herramienta, dueno, fecha, titulo, entrada, resultado) VALUES (?, ?, ?, ?, ?, ?)", fila
+            )
+            if self.fts:
+                self._db.execute(
+                    "INSERT INTO busqueda (rowid, dueno, herramienta, texto) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid, _marca_dueno(dueno), herramienta, texto),
+                )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO bandas (valor, id) VALUES (?, ?)", [(b, cursor.lastrowid) for b in bandas]
+            )
+        return cursor.lastrowid
+
+    def parecido(self, herramienta, entrada, dueno):
+        """El resultado guardado más parecido de ese dueño (misma herramienta y opciones,
+        similitud >= similitud_minima), como dict con id, fecha, titulo y similitud; o None."""
+        rasgos, bandas = _huella(herramienta, entrada, dueno)
+        if not bandas:
+            return None
+        marcas = ", ".join("?" * len(bandas))
+        with self._lock:
+            # Las bandas ya son del dueño: el índice no devuelve filas de otros. Solo los
+            # MAX_CANDIDATOS más recientes se leen y se comparan en detalle
+            filas = self._db.execute(
+                f"SELECT id, fecha, titulo, entrada FROM artefactos WHERE id IN "
+                f"(SELECT DISTINCT id FROM bandas WHERE valor IN ({marcas}) ORDER BY id DESC LIMIT ?) AND dueno = ?",
+                bandas + [MAX_CANDIDATOS, dueno],
+            ).fetchall()
+        mejor = None
+        for id_artefacto, fecha, titulo, guardada in filas:
+            valor = similitud.similitud(rasgos, similitud.rasgos_por_campo(json.loads(guardada), rasgos))
+            if valor >= self.similitud_minima and (mejor is None or valor > mejor["similitud"]):
+                mejor = {"id": id_artefacto, "fecha": fecha, "titulo": titulo, "similitud": valor}
+        return mejor
+
+    def buscar(self, dueno, consulta="", herramienta=None, limite=20):
+        """Los más recientes del dueño que contienen todas las palabras (como prefijo; sin consulta,
+        los últimos). Devuelve dicts con id, herramienta, fecha, titulo y fragmento.
+
+        Se ordena por id y no por relevancia: así FTS5 recorre el índice de atrás hacia
+        adelante y corta en `limite`, aunque la palabra aparezca en cientos de miles de filas.
+        El dueño va dentro del MATCH: las filas de otros usuarios no se llegan a leer.
+        """
+        palabras = re.findall(r"\w+", consulta)
+        filtro, parametros = ("AND a.herramienta = ?", [herramienta]) if herramienta else ("", [])
+        filtro, parametros = "AND a.dueno = ? " + filtro, [dueno] + parametros
+        if not palabras:
+            sql = (f"SELECT a.id, a.herramienta, a.fecha, a.titulo, '' FROM artefactos a "
+                   f"WHERE 1 {filtro} ORDER BY a.id DESC LIMIT ?")
+        elif self.fts:
+            expresion = f'dueno : "{_marca_dueno(dueno)}" AND texto : (' + " ".join(f'"{p}"*' for p in palabras) + ")"
+            if herramienta:
+                expresion = f'herramienta : "{herramienta}" AND {expresion}'
+            parametros = [expresion, dueno]
+            sql = ("SELECT a.id, a.herramienta, a.fecha, a.titulo, snippet(busqueda, 2, '**', '**', '…', 10) "
+                   "FROM busqueda JOIN artefactos a ON a.id = busqueda.rowid "
+                   "WHERE busqueda MATCH ? AND a.dueno = ? ORDER BY busqueda.rowid DESC LIMIT ?")
+        else:
+            condiciones = " AND ".join("(a.entrada || a.resultado) LIKE ?" for _ in palabras)
+            parametros = [f"%{p}%" for p in palabras] + parametros
+            sql = (f"SELECT a.id, a.herramienta, a.fecha, a.titulo, '' FROM artefactos a "
+                   f"WHERE {condiciones} {filtro} ORDER BY a.id DESC LIMIT ?")
+        with self._lock:
+            filas = self._db.execute(sql, parametros + [limite]).fetchall()
+        return [
+            {"id": i, "herramienta": h, "fecha": f, "titulo": t, "fragmento": " ".join(s.split())}
+            for i, h, f, t, s in filas
+        ]
+
+    def resultados(self, herramienta, dueno, limite=1000, aceptados=False):
+        """(entrada, resultado) de los últimos guardados de una herramienta por ese dueño,
+        del más reciente al más antiguo; con aceptados=True, solo los que aceptó."""
+        filtro = " AND aceptado = 1" if aceptados else ""
+        with self._lock:
+            filas = self._db.execute(
+                f"SELECT entrada, resultado FROM artefactos WHERE dueno = ? AND herramienta = ?{filtro} "
+                f"ORDER BY id DESC LIMIT ?",
+                (dueno, herramienta, limite),
+            ).fetchall()
+        return [(json.loads(entrada), json.loads(resultado)) for entrada, resultado in filas]
+
+    def aceptar(self, id_artefacto, dueno):
+        with self._lock, self._db:
+            self._db.execute("UPDATE artefactos SET aceptado = 1 WHERE id = ? AND dueno = ?", (id_artefacto, dueno))
+
+    def abrir(self, id_artefacto, dueno):
+        with self._lock:
+            fila = self._db.execute(
+                "SELECT herramienta, fecha, titulo, entrada, resultado FROM artefactos WHERE id = ? AND dueno = ?",
+                (id_artefacto, dueno),
+            ).fetchone()
+        if fila is None:
+            return None
+        herramienta, fecha, titulo, entrada, resultado = fila
+        return {"id": id_artefacto, "herramienta": herramienta, "fecha": fecha, "titulo": titulo,
+                "entrada": json.loads(entrada), "resultado": json.loads(resultado)}
+
+
+# --- 2. INSTANCIA COMPARTIDA ---
+@st.cache_resource(show_spinner=False)
+def obtener_historial():
+    """El historial del proceso, o None si no está configurado HISTORIAL_RUTA."""
+    ruta = leer_config("HISTORIAL_RUTA")
+    if not ruta:
+        return None
+    return Historial(ruta, float(leer_config("SIMILITUD_MINIMA", SIMILITUD_MINIMA)))
+
+
+def dueno_actual():
+    """Quién usa la sesión: el correo de st.user si la app tiene inicio de sesión; si no, un id al
+    azar de la sesión (su historial se ve mientras dure la pestaña y no lo ve nadie más)."""
+    try:
+        if st.user.is_logged_in and st.user.email:
+            return f"correo:{st.user.email.lower()}"
+    except (AttributeError, KeyError):
+        pass  # Streamlit sin st.user, o sin inicio de sesión configurado
+    return st.session_state.setdefault("_dueno_historial", f"sesion:{uuid.uuid4().hex}")
+
+
+def guardar_resultado(herramienta, entrada, resultado, titulo=None):
+    """Guarda un resultado correcto y devuelve su id; si el historial falla, None y la página
+    sigue como si nada. Sin titulo, se usa el primer campo de texto de la entrada."""
+    historial = obtener_historial()
+    if historial is None or not resultado or "error" in resultado:
+        return None
+    try:
+        return historial.guardar(herramienta, entrada, resultado, dueno_actual(), titulo)
+    except sqlite3.Error:
+        return None
+
+
+def aceptar_resultado(id_artefacto):
+    """El usuario da por bueno un resultado guardado (ver Historial.resultados)."""
+    historial = obtener_historial()
+    if historial is None or id_artefacto is None:
+        return
+    try:
+        historial.aceptar(id_artefacto, dueno_actual())
+    except sqlite3.Error:
+        pass
+
+
+# --- 3. INTERFAZ ---
+def _abrir(id_artefacto, al_abrir, oferta=None):
+    if oferta:
+        st.session_state.pop(oferta, None)
+    artefacto = obtener_historial().abrir(id_artefacto, dueno_actual())
+    if artefacto:
+        # Volver a usar un resultado es darlo por bueno
+        aceptar_resultado(id_artefacto)
+        al_abrir(artefacto["entrada"], artefacto["resultado"])
+
+
+def pedir_generacion(herramienta, pulsado, entrada, al_abrir):
+    """Reemplaza al `if st.button(...)` de la página: True cuando hay que llamar a la IA.
+
+    Si ya hay guardado un resultado casi igual, en vez de generar lo ofrece: "Usar ese
+    resultado" lo repone con al_abrir(entrada, resultado) y "Regenerar de todos modos"
+    devuelve True. Si el usuario cambia la entrada, la oferta desaparece.
+    """
+    clave = f"_parecido_{herramienta}"
+    oferta = st.session_state.get(clave)
+    if oferta and oferta["entrada"] != entrada:
+        st.session_state.pop(clave)
+        oferta = None
+    if pulsado:
+        historial = obtener_historial()
+        parecido = historial.parecido(herramienta, entrada, dueno_actual()) if historial else None
+        if not parecido:
+            st.session_state.pop(clave, None)
+            return True
+        oferta = st.session_state[clave] = dict(parecido, entrada=entrada)
+    if not oferta:
+        return False
+    with st.container(border=True):
+        st.info(
+            f"♻️ Ya generaste algo casi igual ({oferta['similitud']:.0%} parecido) el "
+            f"{datetime.fromtimestamp(oferta['fecha']):%d/%m %H:%M}: «{oferta['titulo']}»."
+        )
+        c_usar, c_regenerar = st.columns(2)
+        c_usar.button(
+            "📂 Usar ese resultado", key=f"usar_{herramienta}", on_click=_abrir,
+            args=(oferta["id"], al_abrir, clave), type="primary", use_container_width=True,
+        )
+        if c_regenerar.button("🔄 Regenerar de todos modos", key=f"regenerar_{herramienta}", use_container_width=True):
+            st.session_state.pop(clave, None)
+            return True
+    return False
+
+
+def mostrar_historial(herramienta, al_abrir):
+    """Buscador en la barra lateral. al_abrir(entrada, resultado) repone el resultado en la página."""
+    historial = obtener_historial()
+    if historial is None:
+        return
+    with st.sidebar, st.expander("🕘 Historial"):
+        consulta = st.text_input("Buscar:", key=f"historial_{herramienta}", placeholder="Palabras de la entrada o del resultado")
+        filas = historial.buscar(dueno_actual(), consulta, herramienta, limite=10)
+        if not filas:
+            st.caption("Nada guardado todavía." if not consulta else "Sin coincidencias.")
+        for fila in filas:
+            st.button(
+                f"{datetime.fromtimestamp(fila['fecha']):%d/%m %H:%M} · {fila['titulo']}",
+                key=f"abrir_{fila['id']}", on_click=_abrir, args=(fila["id"], al_abrir),
+                use_container_width=True,
+            )
+            if fila["fragmento"]:
+                st.caption(fila["fragmento"])
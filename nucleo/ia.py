@@ -0,0 +1,273 @@
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+import google.generativeai as genai
+from google.ai import generativelanguage as glm
+from dotenv import load_dotenv
+
+from nucleo.cache import CacheRespuestas
+from nucleo.coalescencia import LlamadasEnCurso
+from nucleo.cobertura import PresupuestoCobertura, cubrir, espera_cobertura
+from nucleo.telemetria import Llamada, activar_log, iniciar_servidor, registrar
+from nucleo.limites import CODIGOS_REINTENTABLES, CubetaTokens, PoolClaves, codigo_http, espera_backoff
+from nucleo.modelos import LIMITE_POR_DEFECTO, LIMITES_POR_MINUTO, RUTAS, normalizar_modelo
+
+
+# --- CLIENTE COMPARTIDO ---
+class ClienteIA:
+    """Configura la API una sola vez y reutiliza un GenerativeModel por modelo y API key.
+
+    Todas las llamadas pasan por una cubeta de tokens por modelo (cupo por minuto de cada
+    key multiplicado por la cantidad de keys) y se reparten en round-robin entre las keys.
+    Un 429/503 se reintenta con backoff exponencial con jitter, rotando de key.
+    Llamadas idénticas simultáneas (mismo modelo, prompt normalizado y config) comparten
+    una sola petición a la API.
+    En las herramientas con "cobertura" en RUTAS, una llamada más lenta que su p95 habitual
+    se duplica (hasta `cobertura` de las llamadas, Ej: 0.1 = 10 %) y gana la primera respuesta.
+    """
+
+    def __init__(self, api_keys, cache=None, limites=None, reintentos=4, cobertura=0.1):
+        if isinstance(api_keys, str):
+            api_keys = [api_keys]
+        genai.configure(api_key=api_keys[0])
+        self.cache = cache
+        self.claves = PoolClaves(api_keys)
+        self.limites = dict(LIMITES_POR_MINUTO, **(limites or {}))
+        self.reintentos = reintentos
+        self.en_curso = LlamadasEnCurso()
+        self.cobertura = PresupuestoCobertura(cobertura)
+        self._modelos = {}
+        self._cubetas = {}
+        self._servicios = {}
+        self._lock = threading.Lock()
+
+    def modelo(self, nombre, indice_clave=0):
+        nombre = normalizar_modelo(nombre)
+        with self._lock:
+            if (nombre, indice_clave) not in self._modelos:
+                modelo = genai.GenerativeModel(nombre)
+                if indice_clave:
+                    # genai.configure es global (primera key); las demás usan su propio cliente
+                    if indice_clave not in self._servicios:
+                        self._servicios[indice_clave] = glm.GenerativeServiceClient(
+                            client_options={"api_key": self.claves.claves[indice_clave]}
+                        )
+                    modelo._client = self._servicios[indice_clave]
+                self._modelos[(nombre, indice_clave)] = modelo
+            return self._modelos[(nombre, indice_clave)]
+
+    def cubeta(self, nombre):
+        nombre = normalizar_modelo(nombre)
+        with self._lock:
+            if nombre not in self._cubetas:
+                por_minuto = self.limites.get(nombre, LIMITE_POR_DEFECTO) * len(self.claves)
+                self._cubetas[nombre] = CubetaTokens(por_minuto)
+            return self._cubetas[nombre]
+
+    def generar(self, modelo, prompt, llamada=None, **opciones):
+        """Una llamada a la API con cupo y reintentos; si se pasa `llamada`, anota los reintentos."""
+        espera = None
+        if llamada and RUTAS.get(llamada.herramienta, {}).get("cobertura"):
+            espera = espera_cobertura(llamada.herramienta, normalizar_modelo(modelo))
+        return self._generar(modelo, prompt, llamada, espera, **opciones)
+
+    def _generar(self, modelo, prompt, llamada=None, espera=None, **opciones):
+        cubeta = self.cubeta(modelo)
+        intento = 0
+
+        def llamar():
+            return self.modelo(modelo, self.claves.tomar()).generate_content(prompt, **opciones)
+
+        while True:
+            cubeta.tomar()
+            try:
+                # Con stream=True el error de cuota llega aquí, antes del primer trozo.
+                # Se cubre solo la llamada: el reloj de la cobertura arranca con el cupo ya tomado
+                if espera is None:
+                    return llamar()
+                return cubrir(llamar, espera, self.cobertura, llamada, cupo=cubeta.intentar_tomar)
+            except Exception as e:
+                if codigo_http(e) not in CODIGOS_REINTENTABLES or intento >= self.reintentos:
+                    raise
+                if codigo_http(e) == 429:
+                    cubeta.penalizar()
+                time.sleep(espera_backoff(intento))
+                intento += 1
+                if llamada:
+                    llamada.reintentos = intento
+
+    def estadisticas_limites(self):
+        """Por modelo: llamadas en cola, espera media y máxima por cupo, y 429 recibidos."""
+        with self._lock:
+            cubetas = dict(self._cubetas)
+        return {nombre: cubeta.estadisticas() for nombre, cubeta in cubetas.items()}
+
+    def generar_texto(self, modelo, prompt, config=None, validar=None, herramienta="", timeout=None):
+        """Como generar(), pero devuelve el texto y reutiliza respuestas idénticas desde la caché.
+
+        Si se pasa validar(texto) y devuelve False, la respuesta no se guarda: así un
+        JSON roto no se sirve de nuevo cuando el usuario vuelve a pulsar el botón.
+        Con timeout (segundos) la llamada se corta con DeadlineExceeded (ver nucleo.ruteo).
+        """
+        modelo = normalizar_modelo(modelo)
+        llamada = Llamada(herramienta, modelo, bytes_prompt=len(prompt.encode("utf-8")))
+        clave = CacheRespuestas.clave(modelo, prompt, config)
+        if self.cache:
+            texto = self.cache.obtener(clave)
+            if texto is not None:
+                llamada.resultado = "cache"
+                registrar(llamada)
+                return texto
+
+        def llamar():
+            try:
+                opciones = {"request_options": {"timeout": timeout}} if timeout else {}
+                respuesta = self.generar(modelo, prompt, llamada, generation_config=config, **opciones)
+                texto = respuesta.text
+            except Exception as e:
+                llamada.resultado = type(e).__name__
+                registrar(llamada)
+                raise
+            llamada.resultado = "ok"
+            llamada.uso(respuesta)
+            llamada.bytes_respuesta = len(texto.encode("utf-8"))
+            registrar(llamada)
+            if self.cache and (validar is None or validar(texto)):
+                self.cache.guardar(clave, texto)
+            return texto
+
+        # Si otra sesión ya pidió lo mismo, llamar() no corre y esta llamada queda como "unida";
+        # si aquella falla, esta cuenta como ese error (si no, los errores quedarían cortos)
+        llamada.resultado = "unida"
+        try:
+            texto = self.en_curso.ejecutar(clave, llamar)
+        except Exception as e:
+            if llamada.resultado == "unida":
+                llamada.resultado = type(e).__name__
+                registrar(llamada)
+            raise
+        if llamada.resultado == "unida":
+            registrar(llamada)
+        return texto
+
+    def generar_stream(self, modelo, prompt, config=None, validar=None, herramienta=""):
+        """Entrega el texto por trozos según lo genera el modelo (para st.write_stream).
+
+        Una respuesta en caché se entrega de una vez; una nueva se guarda al terminar.
+        """
+        modelo = normalizar_modelo(modelo)
+        llamada = Llamada(herramienta, modelo, bytes_prompt=len(prompt.encode("utf-8")))
+        clave = CacheRespuestas.clave(modelo, prompt, config)
+        if self.cache:
+            texto = self.cache.obtener(clave)
+            if texto is not None:
+                llamada.resultado = "cache"
+                registrar(llamada)
+                yield texto
+                return
+
+        def transmitir():
+            partes = []
+            try:
+                respuesta = self.generar(modelo, prompt, llamada, generation_config=config, stream=True)
+                for chunk in respuesta:
+                    try:
+                        trozo = chunk.text
+                    except ValueError:
+                        # El último chunk puede traer solo finish_reason, sin texto
+                        continue
+                    llamada.primer_byte()
+                    partes.append(trozo)
+                    yield trozo
+                llamada.uso(respuesta)
+            except Exception as e:
+                llamada.resultado = type(e).__name__
+                registrar(llamada)
+                raise
+            texto = "".join(partes)
+            llamada.bytes_respuesta = len(texto.encode("utf-8"))
+            registrar(llamada)
+            if self.cache and (validar is None or validar(texto)):
+                self.cache.guardar(clave, texto)
+
+        def liderar():
+            llamada.resultado = "ok"
+
+        llamada.resultado = "unida"
+        lector = self.en_curso.transmitir(clave, transmitir, al_liderar=liderar)
+        if llamada.resultado != "unida":
+            # La que va a la API: transmitir() la registra aunque este lector se vaya a mitad
+            yield from lector
+            return
+        # Unida a otra: se registra siempre, también si deja de leer antes (GeneratorExit)
+        # o con el error de aquella si falla
+        try:
+            yield from lector
+        except Exception as e:
+            llamada.resultado = type(e).__name__
+            raise
+        finally:
+            registrar(llamada)
+
+
+def leer_config(nombre, defecto=None):
+    # Primero secrets.toml (local o Streamlit Cloud); si no, variables de entorno / .env
+    try:
+        return st.secrets[nombre]
+    except Exception:
+        load_dotenv()
+        return os.environ.get(nombre, defecto)
+
+
+def leer_api_key():
+    return leer_config("GOOGLE_API_KEY")
+
+
+def leer_api_keys():
+    """GOOGLE_API_KEYS (lista en secrets.toml o separada por comas en el entorno) o, si no, GOOGLE_API_KEY."""
+    claves = leer_config("GOOGLE_API_KEYS")
+    if isinstance(claves, str):
+        claves = claves.split(",")
+    claves = [c.strip() for c in (claves or []) if c.strip()]
+    if not claves and leer_api_key():
+        claves = [leer_api_key()]
+    return claves
+
+
+def crear_cliente():
+    """Cliente nuevo con la configuración de secrets/entorno (la línea de comandos lo usa directo)."""
+    api_keys = leer_api_keys()
+    if not api_keys:
+        raise RuntimeError("No se encontró GOOGLE_API_KEY")
+    cache = CacheRespuestas(
+        max_entradas=int(leer_config("IA_CACHE_MAX_ENTRADAS", 256)),
+        ttl=float(leer_config("IA_CACHE_TTL_SEGUNDOS", 3600)),
+        ruta=leer_config("IA_CACHE_RUTA"),  # Ej: ".cache_ia.sqlite" para sobrevivir a reinicios
+    )
+    # Ej. en secrets.toml: [IA_LIMITES] "models/gemini-2.5-flash" = 60
+    limites = leer_config("IA_LIMITES") or {}
+    if isinstance(limites, str):  # en el entorno: IA_LIMITES='{"gemini-2.5-flash": 60}'
+        limites = json.loads(limites)
+    limites = {normalizar_modelo(k): int(v) for k, v in dict(limites).items()}
+    if leer_config("IA_LOG_LLAMADAS"):
+        activar_log(leer_config("IA_LOG_LLAMADAS"))  # Ej: "llamadas_ia.jsonl", una línea por llamada
+    # Fracción máxima de llamadas duplicadas por demora (0 = sin cobertura)
+    cobertura = float(leer_config("IA_COBERTURA_MAX", 0.1))
+    return ClienteIA(api_keys, cache, limites, cobertura=cobertura)
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_cliente():
+    """Un único cliente por proceso, compartido entre sesiones y reruns."""
+    cliente = crear_cliente()
+    if leer_config("IA_METRICAS_PUERTO"):
+        # Métricas en formato Prometheus en otro puerto (Ej: 9100), fuera de Streamlit. Solo en
+        # la máquina local salvo IA_METRICAS_HOST (Ej: "0.0.0.0" detrás de un proxy con acceso)
+        try:
+            iniciar_servidor(leer_config("IA_METRICAS_PUERTO"), leer_config("IA_METRICAS_HOST", "127.0.0.1"))
+        except OSError:
+            pass  # sin métricas, pero las páginas siguen funcionando
+    return cliente
@@ -0,0 +1,113 @@
+import random
+import threading
+import time
+
+# Códigos HTTP que indican "vuelve a intentarlo más tarde"
+CODIGOS_REINTENTABLES = {429, 503}
+
+
+# --- 1. CUBETA DE TOKENS POR MODELO ---
+class CubetaTokens:
+    """Limita las llamadas por minuto a un modelo, compartida por todas las sesiones del proceso."""
+
+    def __init__(self, por_minuto):
+        self.tasa = por_minuto / 60.0
+        self.capacidad = max(1.0, float(por_minuto) / 6)  # ráfaga de hasta ~10 s de cuota
+        self._tokens = self.capacidad
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+        self.en_cola = 0
+        self.esperas = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self.rechazos = 0
+
+    def _recargar(self, ahora):
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def tomar(self):
+        """Bloquea hasta que haya cupo; devuelve los segundos esperados."""
+        inicio = time.monotonic()
+        with self._lock:
+            self.en_cola += 1
+        try:
+            while True:
+                with self._lock:
+                    ahora = time.monotonic()
+                    self._recargar(ahora)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        espera = ahora - inicio
+                        self.esperas += 1
+                        self.espera_total += espera
+                        self.espera_max = max(self.espera_max, espera)
+                        return espera
+                    falta = (1 - self._tokens) / self.tasa
+                time.sleep(falta)
+        finally:
+            with self._lock:
+                self.en_cola -= 1
+
+    def intentar_tomar(self):
+        """Toma un token solo si hay uno ya disponible (sin esperar); True si lo tomó."""
+        with self._lock:
+            self._recargar(time.monotonic())
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.esperas += 1
+            return True
+
+    def penalizar(self):
+        """La API respondió 429: vaciamos la cubeta para que el resto de los hilos también frene."""
+        with self._lock:
+            self._recargar(time.monotonic())
+            self._tokens = min(self._tokens, 0.0)
+            self.rechazos += 1
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "en_cola": self.en_cola,
+                "llamadas": self.esperas,
+                "espera_media_s": self.espera_total / self.esperas if self.esperas else 0.0,
+                "espera_max_s": self.espera_max,
+                "rechazos_429": self.rechazos,
+            }
+
+
+# --- 2. REINTENTOS CON BACKOFF ---
+def codigo_http(error):
+    # google.api_core expone el código HTTP en .code (ResourceExhausted -> 429, ServiceUnavailable -> 503)
+    try:
+        return int(getattr(error, "code", None))
+    except (TypeError, ValueError):
+        return None
+
+
+def espera_backoff(intento, base=1.0, maximo=30.0):
+    """Backoff exponencial con jitter completo: evita que todos los hilos reintenten a la vez."""
+    return random.uniform(0, min(maximo, base * 2 ** intento))
+
+
+# --- 3. POOL DE API KEYS ---
+class PoolClaves:
+    """Reparte las llamadas entre varias API keys en round-robin."""
+
+    def __init__(self, claves):
+        if not claves:
+            raise ValueError("Se necesita al menos una API key")
+        self.claves = list(claves)
+        self._siguiente = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.claves)
+
+    def tomar(self):
+        """Índice de la próxima clave a usar."""
+        with self._lock:
+            indice = self._siguiente
+            self._siguiente = (self._siguiente + 1) % len(self.claves)
+            return indice
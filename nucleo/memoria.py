@@ -0,0 +1,195 @@
+"""Memoria acotada por sesión: lo grande de st.session_state (resultados, archivos) pasa a disco.
+
+Cada sesión abierta guarda sus resultados en st.session_state mientras dure, y con cientos de
+sesiones eso crece sin límite. Lo que se guarda con recordar() ocupa poco:
+    - resultados chicos: tal cual (leerlos no cuesta nada)
+    - resultados medianos: JSON comprimido con zlib
+    - los archivos (bytes), lo que pasa de DISCO_DESDE, o lo más grande cuando la sesión pasa de
+      su presupuesto (SESION_MAX_MB): a un almacén en disco con nombre por contenido (SHA-256),
+      con limpieza de lo menos usado al pasar de BLOBS_MAX_MB. Ruta en BLOBS_RUTA (por defecto,
+      una carpeta privada en /tmp).
+recuperar() devuelve el valor original; si la limpieza ya lo borró del disco, el de defecto.
+"""
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import streamlit as st
+
+from nucleo.ia import leer_config
+
+COMPACTAR_DESDE = 16 * 1024   # JSON más chico que esto queda como objeto
+DISCO_DESDE = 256 * 1024      # lo que ocupe más que esto (ya comprimido) va siempre a disco
+PRESUPUESTO_SESION_MB = 2
+BLOBS_MAX_MB = 512
+
+
+# --- 1. ALMACÉN EN DISCO ---
+class AlmacenBlobs:
+    """Carpeta de archivos nombrados por su SHA-256. La fecha de modificación hace de último uso:
+    al pasar de max_bytes se borran los más antiguos hasta bajar al 80 %."""
+
+    def __init__(self, carpeta, max_bytes):
+        self.carpeta = Path(carpeta)
+        # Solo el usuario del proceso: ahí quedan los resultados y archivos de todas las sesiones
+        self.carpeta.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = sum(tamano for _, tamano, _ in self._archivos())
+
+    def _ruta(self, clave):
+        return self.carpeta / f"{clave}.blob"
+
+    def _archivos(self):
+        for ruta in self.carpeta.glob("*.blob"):
+            try:
+                datos = ruta.stat()
+            except FileNotFoundError:
+                continue  # otra sesión (u otro proceso) lo acaba de borrar
+            yield datos.st_mtime, datos.st_size, ruta
+
+    def guardar(self, datos):
+        clave = hashlib.sha256(datos).hexdigest()
+        ruta = self._ruta(clave)
+        with self._lock:
+            if ruta.exists():
+                os.utime(ruta)
+                return clave
+            # Se escribe aparte y se renombra: quien lee nunca ve un archivo a medias
+            temporal = ruta.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            temporal.write_bytes(datos)
+            os.replace(temporal, ruta)
+            self._total += len(datos)
+            if self._total > self.max_bytes:
+                self._limpiar()
+        return clave
+
+    def leer(self, clave):
+        ruta = self._ruta(clave)
+        try:
+            datos = ruta.read_bytes()
+            os.utime(ruta)
+        except FileNotFoundError:
+            return None
+        return datos
+
+    def _limpiar(self):
+        archivos = sorted(self._archivos())
+        self._total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, ruta in archivos:
+            if self._total <= self.max_bytes * 0.8:
+                break
+            ruta.unlink(missing_ok=True)
+            self._total -= tamano
+
+    def estadisticas(self):
+        with self._lock:
+            return {"bytes": self._total, "max_bytes": self.max_bytes}
+
+
+def _carpeta_por_defecto():
+    # /tmp es de todos: la carpeta de siempre solo si es nuestra y nadie más puede entrar;
+    # si otro la creó antes (o es un enlace), una nueva con nombre al azar
+    carpeta = os.path.join(tempfile.gettempdir(), "herramientas_blobs")
+    try:
+        os.mkdir(carpeta, 0o700)
+    except FileExistsError:
+        datos = os.lstat(carpeta)
+        if hasattr(os, "getuid") and (
+            not stat.S_ISDIR(datos.st_mode) or datos.st_uid != os.getuid() or datos.st_mode & 0o077
+        ):
+            return tempfile.mkdtemp(prefix="herramientas_blobs_")
+    return carpeta
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_almacen():
+    carpeta = leer_config("BLOBS_RUTA") or _carpeta_por_defecto()
+    return AlmacenBlobs(carpeta, int(float(leer_config("BLOBS_MAX_MB", BLOBS_MAX_MB)) * 1024 * 1024))
+
+
+# --- 2. MEMORIA DE LA SESIÓN ---
+@dataclass(frozen=True)
+class _Compacto:
+    datos: bytes  # JSON comprimido con zlib
+
+
+@dataclass(frozen=True)
+class _EnDisco:
+    clave: str
+    tipo: str     # "bytes" (archivo) o "json" (JSON comprimido)
+
+
+def _presupuesto():
+    return float(leer_config("SESION_MAX_MB", PRESUPUESTO_SESION_MB)) * 1024 * 1024
+
+
+def _empacar(valor):
+    """(lo que queda en la sesión, bytes que ocupa)."""
+    if isinstance(valor, (bytes, bytearray)):
+        return bytes(valor), len(valor)
+    texto = json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(texto) < COMPACTAR_DESDE:
+        return valor, len(texto)
+    comprimido = zlib.compress(texto)
+    return _Compacto(comprimido), len(comprimido)
+
+
+def _a_disco(guardado):
+    if isinstance(guardado, _EnDisco):
+        return guardado
+    if isinstance(guardado, bytes):
+        datos, tipo = guardado, "bytes"
+    elif isinstance(guardado, _Compacto):
+        datos, tipo = guardado.datos, "json"
+    else:
+        datos, tipo = zlib.compress(json.dumps(guardado, ensure_ascii=False).encode("utf-8")), "json"
+    try:
+        return _EnDisco(obtener_almacen().guardar(datos), tipo)
+    except OSError:
+        return guardado  # sin disco escribible, se queda en memoria
+
+
+def recordar(nombre, valor):
+    """st.session_state[nombre] = valor, pero ocupando poco (ver arriba). valor: JSON o bytes."""
+    tamanos = st.session_state.setdefault("_memoria_sesion", {})
+    if valor is None:
+        st.session_state[nombre] = None
+        tamanos.pop(nombre, None)
+        return
+    guardado, tamano = _empacar(valor)
+    # Un archivo solo se lee para bajarlo: no tiene por qué ocupar memoria mientras tanto
+    if isinstance(guardado, bytes) or tamano >= DISCO_DESDE:
+        guardado = _a_disco(guardado)
+    st.session_state[nombre] = guardado
+    tamanos[nombre] = 0 if isinstance(guardado, _EnDisco) else tamano
+    # Sobre el presupuesto, lo más grande que siga en memoria pasa a disco
+    while sum(tamanos.values()) > _presupuesto():
+        mayor = max(tamanos, key=tamanos.get)
+        st.session_state[mayor] = _a_disco(st.session_state.get(mayor))
+        if not isinstance(st.session_state[mayor], _EnDisco):
+            break
+        tamanos[mayor] = 0
+
+
+def recuperar(nombre, defecto=None):
+    guardado = st.session_state.get(nombre)
+    if isinstance(guardado, _EnDisco):
+        datos = obtener_almacen().leer(guardado.clave)
+        if datos is None:
+            return defecto
+        return datos if guardado.tipo == "bytes" else json.loads(zlib.decompress(datos))
+    if isinstance(guardado, _Compacto):
+        return json.loads(zlib.decompress(guardado.datos))
+    return defecto if guardado is None else guardado
+
+
+def olvidar(nombre):
+    st.session_state.pop(nombre, None)
+    st.session_state.get("_memoria_sesion", {}).pop(nombre, None)
@@ -0,0 +1,35 @@
+# --- MODELOS DISPONIBLES ---
+# Sin dependencias: lo importan también los benchmarks y la línea de comandos
+MODELO_GEMMA = "models/gemma-3-27b-it"
+MODELO_FLASH = "models/gemini-2.5-flash"
+
+
+def normalizar_modelo(nombre):
+    """'gemini-2.5-flash' y 'models/gemini-2.5-flash' son el mismo modelo."""
+    return nombre if nombre.startswith("models/") else f"models/{nombre}"
+
+# Llamadas por minuto que admite CADA API key (nivel gratuito); se pueden ajustar con IA_LIMITES
+LIMITES_POR_MINUTO = {
+    MODELO_GEMMA: 30,
+    MODELO_FLASH: 10,
+}
+LIMITE_POR_DEFECTO = 10
+
+# --- RUTEO POR HERRAMIENTA (único lugar donde se eligen los modelos) ---
+# modelos: orden de preferencia; si uno falla (o se pasa del objetivo) se usa el siguiente.
+# slo_s:   objetivo de latencia. Un modelo cuyo p95 en vivo lo supera pasa al final de la fila,
+#          y mientras quede otro detrás, la llamada se corta a ese tiempo para probar el siguiente.
+# cobertura: si una llamada tarda más que el p95 de la herramienta, se lanza un duplicado
+#          y se usa la primera respuesta (con un tope de llamadas extra, ver nucleo/cobertura.py).
+RUTAS = {
+    "delegacion": {"modelos": [MODELO_GEMMA, MODELO_FLASH], "slo_s": 25},
+    "correos": {"modelos": [MODELO_FLASH, MODELO_GEMMA], "slo_s": 20},
+    "pedidos": {"modelos": [MODELO_FLASH, MODELO_GEMMA], "slo_s": 20},
+    "reuniones": {"modelos": [MODELO_FLASH, MODELO_GEMMA], "slo_s": 20, "cobertura": True},
+    "priorizador": {"modelos": [MODELO_FLASH, MODELO_GEMMA], "slo_s": 30},
+    "negociador": {"modelos": [MODELO_FLASH, MODELO_GEMMA], "slo_s": 30, "cobertura": True},
+}
+RUTA_POR_DEFECTO = {"modelos": [MODELO_FLASH, MODELO_GEMMA], "slo_s": 30}
+
+# Prompts más largos que esto (tokens estimados) no se mandan a ese modelo: Gemma se vuelve lento
+MAX_TOKENS_ENTRADA = {MODELO_GEMMA: 3000}
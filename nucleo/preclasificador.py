@@ -0,0 +1,194 @@
+"""Clasificación local de las tareas obvias del Priorizador, sin llamar a la IA.
+
+Dos fuentes, de más a menos segura:
+    reglas   palabras de plazo ("hoy", "mañana", "15/01", "próxima semana") y de tipo de tarea
+             (trámites con plazo, distracciones, clientes y contratos); el rol puede vetar una regla
+    Bayes    ingenuo, entrenado con las clasificaciones aceptadas del historial (si lo hay)
+Solo se decide cuando la evidencia es clara; el resto sigue yendo al modelo.
+"""
+import calendar
+import math
+import re
+from collections import Counter
+from datetime import date
+
+from nucleo.similitud import rasgos, sin_tildes
+
+# --- 1. REGLAS ---
+# Se aplican sobre el texto en minúsculas y sin tildes
+URGENTE = re.compile(
+    r"\b(hoy|ahora|urgente|urge|asap|cuanto antes|esta (manana|tarde|noche)|(?<!pasado )manana"
+    r"|antes de (las?|mediodia) ?\d*|vence hoy|atrasad[oa])\b"
+)
+LEJANO = re.compile(
+    r"\b(proxima semana|semana que viene|proximo mes|mes que viene|este (mes|trimestre|semestre|ano)"
+    r"|proximo (trimestre|semestre|ano)|largo plazo|a futuro)\b"
+)
+ALGUN_DIA = re.compile(r"\b(algun dia|cuando (pueda|haya tiempo|tenga tiempo)|si (queda|hay) tiempo|quizas|tal vez)\b")
+IMPORTANTE = re.compile(
+    r"\b(clientes?|contratos?|jefe|jefa|gerente|gerencia|directorio|informes?|propuestas?|presupuestos?|impuestos?"
+    r"|declaracion|auditoria|licitacion|entrega|plazo|vence|vencimiento|medico|salud|examen|sueldos?"
+    r"|remuneraciones|facturas?|ventas?|inversion(istas)?|abogad[oa]|demanda)\b"
+)
+# Recados que casi cualquiera puede hacer por uno; "comprar" solo de cosas menores
+TRAMITE = re.compile(
+    r"^(recoger|retirar|imprimir|fotocopiar|escanear|renovar|pedir hora|sacar hora|cotizar"
+    r"|comprar (la |el |los |las |una? )?(cartulina|utiles|materiales? de oficina|toner|papel|insumos|pan|leche)"
+    r"|llamar (al|a la|a) (contador|tecnico|gasfiter|plomero|electricista|mecanico|banco|seguro|taller)"
+    r"|pagar (la |el )?(cuenta|luz|agua|gas|internet|telefono|estacionamiento))\b"
+)
+# Ocio evidente: "revisar las redes" puede ser trabajo, "mirar tiktok" no
+DISTRACCION = re.compile(
+    r"\b(ver|mirar|scrollear|navegar( por)?) (las |el |en )?(redes sociales|instagram|tiktok|facebook"
+    r"|twitter|youtube|netflix|series|videos|memes)\b"
+)
+# Roles para los que una regla no vale: lo que para otros es ocio o un recado es su trabajo
+ROLES_SIN_DISTRACCION = re.compile(
+    r"\b(community|redes sociales|social media|marketing|contenidos?|comunicaciones|periodista|influencer"
+    r"|creador[a]?|youtuber|streamer|publicista|critic[oa])\b"
+)
+ROLES_SIN_DELEGAR = re.compile(
+    r"\b(duen[oa] de casa|ama de casa|amo de casa|asistente|secretari[oa]|administrativ[oa]|recepcionista"
+    r"|junior|estudiante|compras|abastecimiento|mensajer[oa]|chofer|conserje)\b"
+)
+# dd/mm[/aa]; con guion solo si lleva año o va tras una palabra de plazo: "capítulos 3-4" no es fecha
+FECHA = re.compile(r"\b(\d{1,2})([/-])(\d{1,2})(?:\2(\d{2,4}))?\b")
+ANTES_DE_FECHA = re.compile(r"\b(el|para|hasta|antes del?|desde|al|del|vence|vencimiento|entrega|plazo)\s*$")
+DIAS_URGENTE = 1  # hasta mañana (o ya vencida)
+DIAS_LEJANO = 7
+
+
+def _fecha(texto):
+    """(día, mes, año o None) de la primera fecha del texto, o None."""
+    for m in FECHA.finditer(texto):
+        dia, separador, mes, anio = m.groups()
+        if separador == "/" or anio or ANTES_DE_FECHA.search(texto[:m.start()]):
+            return int(dia), int(mes), anio and int(anio) + (2000 if len(anio) == 2 else 0)
+    return None
+
+
+def _dia(anio, mes, dia):
+    # Un día que el mes no tiene (el 29/02 en un año no bisiesto) pasa al último del mes
+    return date(anio, mes, min(dia, calendar.monthrange(anio, mes)[1]))
+
+
+def _plazo(texto, hoy):
+    """(urgente, lejano) según las palabras o la primera fecha dd/mm del texto."""
+    if URGENTE.search(texto):
+        return True, False
+    if LEJANO.search(texto):
+        return False, True
+    fecha = _fecha(texto)
+    if not fecha:
+        return False, False
+    dia, mes, anio = fecha
+    if not 1 <= mes <= 12 or not 1 <= dia <= 31:
+        return False, False
+    cuando = _dia(anio or hoy.year, mes, dia)
+    if not anio and (hoy - cuando).days > 180:
+        cuando = _dia(hoy.year + 1, mes, dia)  # "15/01" escrito en diciembre
+    dias = (cuando - hoy).days
+    return dias <= DIAS_URGENTE, dias >= DIAS_LEJANO
+
+
+def por_reglas(tarea, rol=None, hoy=None):
+    """Cuadrante de una tarea obvia, o None si las reglas no alcanzan para decidir (o si el rol
+    hace dudar de la regla: ahí decide el modelo, que sí lo tiene en cuenta)."""
+    texto = sin_tildes(tarea)
+    urgente, lejano = _plazo(texto, hoy or date.today())
+    if IMPORTANTE.search(texto):
+        # Importante sin plazo claro: hacer o planificar depende del contexto, lo decide el modelo
+        if urgente:
+            return "hacer"
+        return "planificar" if lejano else None
+    rol = sin_tildes(rol or "")
+    if ALGUN_DIA.search(texto):
+        return "eliminar"
+    if DISTRACCION.search(texto) and not ROLES_SIN_DISTRACCION.search(rol):
+        return "eliminar"
+    # Delegar es lo urgente pero no importante: un recado sin plazo, o de alguien cuyo trabajo
+    # son justamente esos recados, lo decide el modelo
+    if TRAMITE.search(texto) and urgente and not ROLES_SIN_DELEGAR.search(rol):
+        return "delegar"
+    return None
+
+
+# --- 2. MODELO ENTRENADO CON EL HISTORIAL ---
+MIN_EJEMPLOS = 200          # con menos, el modelo no opina
+PROBABILIDAD_MINIMA = 0.95
+
+
+def _rasgos_tarea(tarea, rol):
+    return rasgos(tarea) | {"rol:" + " ".join(sin_tildes(rol or "").split())}
+
+
+class Bayes:
+    """Bayes ingenuo multinomial sobre palabras y pares de palabras de la tarea, más el rol."""
+
+    def __init__(self, ejemplos):
+        self.conteos = {}   # cuadrante -> Counter de rasgos
+        self.ejemplos = Counter()
+        for tarea, rol, cuadrante in ejemplos:
+            self.conteos.setdefault(cuadrante, Counter()).update(_rasgos_tarea(tarea, rol))
+            self.ejemplos[cuadrante] += 1
+        self.totales = {c: sum(conteo.values()) for c, conteo in self.conteos.items()}
+        self.vocabulario = set().union(*self.conteos.values()) if self.conteos else set()
+
+    def __len__(self):
+        return sum(self.ejemplos.values())
+
+    def probabilidades(self, tarea, rol=None):
+        """{cuadrante: probabilidad} con los rasgos conocidos; vacío si la tarea es casi toda nueva."""
+        todos = rasgos(tarea)
+        conocidos = [r for r in todos if r in self.vocabulario]
+        if len(conocidos) < 2 or len(conocidos) < len(todos) / 2:
+            return {}
+        conocidos += [r for r in _rasgos_tarea("", rol) if r in self.vocabulario]
+        total, tamano = len(self), len(self.vocabulario)
+        log = {
+            c: math.log(self.ejemplos[c] / total)
+            + sum(math.log((conteo[r] + 1) / (self.totales[c] + tamano)) for r in conocidos)
+            for c, conteo in self.conteos.items()
+        }
+        maximo = max(log.values())
+        norma = sum(math.exp(v - maximo) for v in log.values())
+        return {c: math.exp(v - maximo) / norma for c, v in log.items()}
+
+    def predecir(self, tarea, rol=None):
+        probabilidades = self.probabilidades(tarea, rol)
+        if not probabilidades:
+            return None
+        cuadrante = max(probabilidades, key=probabilidades.get)
+        return cuadrante if probabilidades[cuadrante] >= PROBABILIDAD_MINIMA else None
+
+
+def ejemplos_de(resultados, cuadrantes, clave=None):
+    """(tarea, rol, cuadrante) de pares (entrada, resultado) del Priorizador, del más reciente al
+    más antiguo. Las tareas que ya se habían resuelto en local no cuentan: el modelo aprendería de
+    sí mismo. Con clave(tarea, rol), una tarea que se repite en varias listas cuenta una sola vez
+    (la más reciente): si no, las que se vuelven a clasificar cada semana pesarían más."""
+    vistas = set()
+    for entrada, resultado in resultados:
+        locales = set(resultado.get("locales") or ())
+        for cuadrante in cuadrantes:
+            for tarea in resultado.get(cuadrante) or ():
+                if tarea in locales:
+                    continue
+                if clave:
+                    repetida = clave(tarea, entrada.get("rol") or "")
+                    if repetida in vistas:
+                        continue
+                    vistas.add(repetida)
+                yield tarea, entrada.get("rol"), cuadrante
+
+
+# --- 3. LAS DOS JUNTAS ---
+class Preclasificador:
+    """Reglas y, si hay bastantes ejemplos, el modelo del historial: (tarea, rol) -> cuadrante o None."""
+
+    def __init__(self, ejemplos=()):
+        bayes = Bayes(ejemplos)
+        self.bayes = bayes if len(bayes) >= MIN_EJEMPLOS else None
+
+    def __call__(self, tarea, rol=None):
+        return por_reglas(tarea, rol) or (self.bayes.predecir(tarea, rol) if self.bayes else None)
@@ -0,0 +1,66 @@
+"""Presupuesto de tokens de entrada: recorta los campos de texto libre antes de armar el prompt.
+
+Se estima localmente (sin llamar a count_tokens, que sería otro viaje a la API): para texto en
+español los modelos Gemini rondan los 4 caracteres por token. El límite es holgado a propósito.
+"""
+CARACTERES_POR_TOKEN = 4
+MARCA_RECORTE = "\n[…texto recortado…]\n"
+
+
+def estimar_tokens(texto):
+    return (len(texto) + CARACTERES_POR_TOKEN - 1) // CARACTERES_POR_TOKEN
+
+
+def _cortar_en_espacio(texto, limite, desde_el_final=False):
+    # Corta en el último (o primer) salto de línea o espacio cercano, no a mitad de palabra
+    if desde_el_final:
+        trozo = texto[-limite:]
+        corte = min((i for i in (trozo.find("\n"), trozo.find(" ")) if i >= 0), default=-1)
+        return trozo[corte + 1:] if 0 <= corte < limite // 5 else trozo
+    trozo = texto[:limite]
+    corte = max(trozo.rfind("\n"), trozo.rfind(" "))
+    return trozo[:corte] if corte > limite * 4 // 5 else trozo
+
+
+def recortar(texto, max_tokens):
+    """Deja el comienzo (3/4) y el final (1/4) del texto: en un hilo de correos el mensaje
+    nuevo suele estar arriba y la firma o el pedido original, abajo."""
+    max_caracteres = max_tokens * CARACTERES_POR_TOKEN - len(MARCA_RECORTE)
+    inicio = _cortar_en_espacio(texto, max_caracteres * 3 // 4)
+    final = _cortar_en_espacio(texto, max_caracteres // 4, desde_el_final=True)
+    return inicio.rstrip() + MARCA_RECORTE + final.lstrip()
+
+
+def recortar_lineas(texto, max_tokens):
+    """Para listas (una tarea por línea): se quedan las primeras líneas completas que caben."""
+    lineas, usados = [], 0
+    for linea in texto.splitlines():
+        costo = estimar_tokens(linea) + 1
+        if usados + costo > max_tokens:
+            break
+        lineas.append(linea)
+        usados += costo
+    return "\n".join(lineas)
+
+
+def ajustar(entrada, limites, por_lineas=()):
+    """Aplica {campo: max_tokens} a la entrada. Devuelve (entrada, avisos para el usuario)."""
+    entrada = dict(entrada)
+    avisos = []
+    for campo, max_tokens in limites.items():
+        texto = entrada.get(campo)
+        if not isinstance(texto, str) or estimar_tokens(texto) <= max_tokens:
+            continue
+        nombre = campo.replace("_", " ")
+        if campo in por_lineas:
+            entrada[campo] = recortar_lineas(texto, max_tokens)
+            total = len([l for l in texto.splitlines() if l.strip()])
+            usadas = len([l for l in entrada[campo].splitlines() if l.strip()])
+            avisos.append(f"La lista de {nombre} era muy larga: se usaron las primeras {usadas} de {total} líneas.")
+        else:
+            entrada[campo] = recortar(texto, max_tokens)
+            avisos.append(
+                f"El campo «{nombre}» era muy largo (~{estimar_tokens(texto)} tokens): "
+                f"se envió recortado a ~{max_tokens} tokens (comienzo y final)."
+            )
+    return entrada, avisos
@@ -0,0 +1,60 @@
+"""Elige en qué orden probar los modelos para cada llamada, según nucleo.modelos.RUTAS,
+el tamaño del prompt y la salud en vivo de cada modelo (latencia p95 y errores recientes)."""
+from dataclasses import dataclass
+
+from nucleo import telemetria
+from nucleo.modelos import MAX_TOKENS_ENTRADA, RUTA_POR_DEFECTO, RUTAS, normalizar_modelo
+from nucleo.presupuesto import estimar_tokens
+
+MIN_MUESTRAS = 5         # antes de esto no se juzga a un modelo
+MAX_TASA_ERROR = 0.5     # sobre las últimas llamadas de ese modelo
+
+
+@dataclass
+class Ruta:
+    modelos: list
+    slo_s: float = None
+
+
+def como_ruta(modelo):
+    """Acepta un nombre de modelo suelto (sin respaldo ni objetivo) o una Ruta."""
+    return modelo if isinstance(modelo, Ruta) else Ruta([normalizar_modelo(modelo)])
+
+
+def fuera_de_objetivo(modelo, slo_s):
+    salud = telemetria.salud(modelo)
+    if not salud or salud["muestras"] < MIN_MUESTRAS:
+        return False
+    return salud["tasa_error"] >= MAX_TASA_ERROR or (slo_s is not None and salud["p95_s"] > slo_s)
+
+
+def ruta_para(herramienta, prompt):
+    ruta = RUTAS.get(herramienta, RUTA_POR_DEFECTO)
+    tokens = estimar_tokens(prompt)
+    modelos = [m for m in ruta["modelos"] if tokens <= MAX_TOKENS_ENTRADA.get(m, tokens)]
+    modelos = modelos or ruta["modelos"][-1:]
+    # Orden estable: los modelos sanos adelante, en el orden configurado
+    modelos = sorted(modelos, key=lambda m: fuera_de_objetivo(m, ruta["slo_s"]))
+    return Ruta(modelos, ruta["slo_s"])
+
+
+def intentar(ruta, llamar):
+    """llamar(modelo, timeout) con cada modelo de la ruta hasta que uno responda.
+
+    Todos menos el último se cortan al objetivo de latencia; el último no, para que siempre
+    haya respuesta. Devuelve (modelo que respondió, resultado).
+    """
+    ruta = como_ruta(ruta)
+    for i, modelo in enumerate(ruta.modelos):
+        ultimo = i == len(ruta.modelos) - 1
+        try:
+            return modelo, llamar(modelo, None if ultimo else ruta.slo_s)
+        except Exception:
+            if ultimo:
+                raise
+
+
+def estado_modelos():
+    """Salud en vivo de cada modelo configurado (para el panel de administración)."""
+    modelos = {m for ruta in list(RUTAS.values()) + [RUTA_POR_DEFECTO] for m in ruta["modelos"]}
+    return {m: telemetria.salud(m) for m in sorted(modelos)}
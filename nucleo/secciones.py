@@ -0,0 +1,112 @@
+import streamlit as st
+
+ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def campos_json_incrementales(fragmentos):
+    """Extrae los campos de texto de un objeto JSON plano a medida que llegan los tokens.
+
+    Devuelve pares (campo, trozo) en orden, uno por fragmento y campo, para que cada
+    sección se pueda ir pintando antes de que el JSON esté completo.
+    Los valores que no son texto (números, listas) se saltan.
+    """
+    estado = "fuera"  # fuera | clave | tras_clave | valor | otro | otro_texto
+    clave = ""
+    escape = None     # None, "" (tras la barra) o los dígitos de un \uXXXX
+    surrogado = None
+    profundidad = 0
+
+    for fragmento in fragmentos:
+        salida = []
+        for c in fragmento:
+            if estado == "valor":
+                if escape is not None:
+                    if escape == "" and c != "u":
+                        salida.append(ESCAPES.get(c, c))
+                        escape = None
+                    elif escape == "":
+                        escape = "u"
+                    else:
+                        escape += c
+                        if len(escape) == 5:
+                            codigo = int(escape[1:], 16)
+                            escape = None
+                            if 0xD800 <= codigo < 0xDC00:
+                                surrogado = codigo
+                                continue
+                            if surrogado is not None:
+                                codigo = 0x10000 + ((surrogado - 0xD800) << 10) + (codigo - 0xDC00)
+                                surrogado = None
+                            salida.append(chr(codigo))
+                elif c == "\\":
+                    escape = ""
+                elif c == '"':
+                    if salida:
+                        yield clave, "".join(salida)
+                        salida = []
+                    estado = "fuera"
+                else:
+                    salida.append(c)
+            elif estado == "fuera":
+                if c == '"':
+                    estado, clave = "clave", ""
+            elif estado == "clave":
+                if c == '"':
+                    estado = "tras_clave"
+                else:
+                    clave += c
+            elif estado == "tras_clave":
+                if c == '"':
+                    estado = "valor"
+                elif c in "[{":
+                    estado, profundidad = "otro", 1
+                elif c not in ": \n\r\t":
+                    estado, profundidad = "otro", 0
+            elif estado == "otro_texto":
+                # Texto dentro de una lista/objeto que se salta: sus comas no cuentan
+                if escape is not None:
+                    escape = None
+                elif c == "\\":
+                    escape = ""
+                elif c == '"':
+                    estado = "otro"
+            elif estado == "otro":
+                # Valor que no es texto: se salta hasta la coma del nivel superior
+                if c == '"':
+                    estado = "otro_texto"
+                elif c in "[{":
+                    profundidad += 1
+                elif c in "]}":
+                    profundidad -= 1
+                if profundidad <= 0 and c in ",}":
+                    estado = "fuera"
+        if estado == "valor" and salida:
+            yield clave, "".join(salida)
+
+
+def campos_parciales(texto):
+    """{campo: texto recibido hasta ahora} de un JSON que todavía puede estar a medias."""
+    campos = {}
+    for clave, trozo in campos_json_incrementales([texto]):
+        campos[clave] = campos.get(clave, "") + trozo
+    return campos
+
+
+def pintar_campos_parciales(texto, titulos):
+    """Pinta cada campo del JSON (a medias) en su propia caja, en el orden de titulos.
+
+    titulos: dict {campo: titulo en markdown}; los campos que no aparecen no se muestran.
+    Se llama en cada sondeo de un trabajo en segundo plano (ver nucleo/trabajos.py).
+    """
+    campos = campos_parciales(texto)
+    for clave, titulo in titulos.items():
+        if campos.get(clave):
+            with st.container(border=True):
+                st.markdown(titulo)
+                st.markdown(campos[clave])
+
+
+def mostrar_avisos(avisos):
+    """Muestra qué entradas se recortaron para no pasarse del presupuesto de tokens."""
+    for aviso in avisos or []:
+        st.info(aviso, icon="✂️")
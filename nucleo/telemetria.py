@@ -0,0 +1,232 @@
+"""Registro de cada llamada a la IA: latencia, tokens, tamaños, reintentos y resultado.
+
+Se agrega por (herramienta, modelo) en histogramas y se expone como texto Prometheus
+(metricas_prometheus, o un endpoint HTTP con iniciar_servidor) o como log JSON por línea.
+"""
+import bisect
+import errno
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LIMITES_SEGUNDOS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+LIMITES_TOKENS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+VENTANA_PERCENTILES = 200  # últimas latencias por herramienta/modelo para p50/p95
+VENTANA_ERRORES = 20       # últimos resultados por modelo para la tasa de error
+VENTANA_SALUD_S = 300      # la salud de un modelo solo mira los últimos 5 minutos: así se recupera
+
+
+# --- 1. UNA LLAMADA ---
+@dataclass
+class Llamada:
+    herramienta: str
+    modelo: str
+    inicio: float = field(default_factory=time.perf_counter)
+    ttfb_s: float = None          # hasta el primer trozo (o la respuesta completa sin streaming)
+    latencia_s: float = None
+    tokens_prompt: int = 0
+    tokens_salida: int = 0
+    bytes_prompt: int = 0
+    bytes_respuesta: int = 0
+    reintentos: int = 0
+    coberturas: int = 0           # peticiones duplicadas lanzadas por demora (ver nucleo/cobertura.py)
+    resultado: str = "ok"         # "ok", "cache", "unida" (a otra idéntica en curso) o la excepción
+
+    def primer_byte(self):
+        if self.ttfb_s is None:
+            self.ttfb_s = time.perf_counter() - self.inicio
+
+    def uso(self, respuesta):
+        # usage_metadata viene en la respuesta (en streaming, en el último trozo)
+        uso = getattr(respuesta, "usage_metadata", None)
+        if uso:
+            self.tokens_prompt = getattr(uso, "prompt_token_count", 0) or 0
+            self.tokens_salida = getattr(uso, "candidates_token_count", 0) or 0
+
+
+# --- 2. AGREGACIÓN ---
+class _Histograma:
+    def __init__(self, limites):
+        self.limites = limites
+        self.cubetas = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.cantidad = 0
+
+    def observar(self, valor):
+        self.cubetas[bisect.bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.cantidad += 1
+
+
+_lock = threading.Lock()
+_resultados = {}    # (herramienta, modelo, resultado) -> cantidad
+_contadores = {}    # (herramienta, modelo, nombre) -> total (tokens, bytes, reintentos)
+_histogramas = {}   # (nombre, herramienta, modelo) -> _Histograma
+_recientes = {}     # (herramienta, modelo) -> deque de (momento, latencia, ttfb)
+_ultimos = {}       # modelo -> deque de (momento, la llamada salió bien)
+_log = None
+
+
+def _histograma(nombre, herramienta, modelo, limites):
+    clave = (nombre, herramienta, modelo)
+    if clave not in _histogramas:
+        _histogramas[clave] = _Histograma(limites)
+    return _histogramas[clave]
+
+
+def registrar(llamada):
+    if llamada.latencia_s is None:
+        llamada.latencia_s = time.perf_counter() - llamada.inicio
+    if llamada.ttfb_s is None:
+        llamada.ttfb_s = llamada.latencia_s
+    h, m = llamada.herramienta, llamada.modelo
+    with _lock:
+        _resultados[(h, m, llamada.resultado)] = _resultados.get((h, m, llamada.resultado), 0) + 1
+        if _log:
+            _log.write(json.dumps(dict(asdict(llamada), fecha=time.time()), ensure_ascii=False) + "\n")
+            _log.flush()
+        if llamada.resultado in ("cache", "unida"):
+            return  # no llegaron a la API: solo cuentan como llamadas
+        for nombre in ("tokens_prompt", "tokens_salida", "bytes_prompt", "bytes_respuesta", "reintentos", "coberturas"):
+            _contadores[(h, m, nombre)] = _contadores.get((h, m, nombre), 0) + getattr(llamada, nombre)
+        _histograma("latencia_segundos", h, m, LIMITES_SEGUNDOS).observar(llamada.latencia_s)
+        _histograma("ttfb_segundos", h, m, LIMITES_SEGUNDOS).observar(llamada.ttfb_s)
+        _histograma("tokens_salida", h, m, LIMITES_TOKENS).observar(llamada.tokens_salida)
+        ahora = time.time()
+        if llamada.resultado == "ok":
+            _recientes.setdefault((h, m), deque(maxlen=VENTANA_PERCENTILES)).append(
+                (ahora, llamada.latencia_s, llamada.ttfb_s)
+            )
+        _ultimos.setdefault(m, deque(maxlen=VENTANA_ERRORES)).append((ahora, llamada.resultado == "ok"))
+
+
+def activar_log(ruta):
+    """Además de agregar, escribe cada llamada como una línea JSON en `ruta`."""
+    global _log
+    with _lock:
+        if _log is None:
+            _log = open(ruta, "a", encoding="utf-8")
+
+
+# --- 3. CONSULTA ---
+def percentiles(modelo=None, herramienta=None, ventana_s=None, hasta_primer_byte=False):
+    """p50/p95 de las últimas latencias exitosas (o del primer byte), por modelo y/o herramienta."""
+    desde = time.time() - ventana_s if ventana_s else 0
+    with _lock:
+        valores = sorted(
+            ttfb if hasta_primer_byte else latencia
+            for (h, m), cola in _recientes.items()
+            if (modelo is None or m == modelo) and (herramienta is None or h == herramienta)
+            for t, latencia, ttfb in cola if t >= desde
+        )
+    if not valores:
+        return None
+
+    def p(q):
+        return valores[min(len(valores) - 1, int(q * len(valores)))]
+
+    return {"p50_s": p(0.50), "p95_s": p(0.95), "muestras": len(valores)}
+
+
+def salud(modelo):
+    """p50/p95 del modelo (todas las herramientas) y su tasa de error, en los últimos minutos."""
+    desde = time.time() - VENTANA_SALUD_S
+    with _lock:
+        ultimos = [ok for t, ok in _ultimos.get(modelo, ()) if t >= desde]
+    if not ultimos:
+        return None
+    datos = percentiles(modelo=modelo, ventana_s=VENTANA_SALUD_S) or {"p50_s": 0.0, "p95_s": 0.0}
+    datos.update(muestras=len(ultimos), tasa_error=ultimos.count(False) / len(ultimos))
+    return datos
+
+
+def resumen():
+    """Por herramienta/modelo: llamadas por resultado, latencias y tokens (para el panel)."""
+    with _lock:
+        filas = {}
+        for (h, m, resultado), n in _resultados.items():
+            fila = filas.setdefault((h, m), {"herramienta": h, "modelo": m, "llamadas": 0, "reutilizadas": 0, "errores": 0})
+            fila["llamadas"] += n
+            if resultado in ("cache", "unida"):
+                fila["reutilizadas"] += n
+            elif resultado != "ok":
+                fila["errores"] += n
+        for (h, m), fila in filas.items():
+            lat = _histogramas.get(("latencia_segundos", h, m))
+            fila["latencia_media_s"] = lat.suma / lat.cantidad if lat and lat.cantidad else 0.0
+            fila["tokens_prompt"] = _contadores.get((h, m, "tokens_prompt"), 0)
+            fila["tokens_salida"] = _contadores.get((h, m, "tokens_salida"), 0)
+            fila["reintentos"] = _contadores.get((h, m, "reintentos"), 0)
+            fila["coberturas"] = _contadores.get((h, m, "coberturas"), 0)
+    for fila in filas.values():
+        fila.update(percentiles(fila["modelo"], fila["herramienta"]) or {})
+    return list(filas.values())
+
+
+def metricas_prometheus():
+    """Formato de exposición de texto de Prometheus."""
+    def etiquetas(**kv):
+        return "{" + ",".join(f'{k}="{v}"' for k, v in kv.items()) + "}"
+
+    lineas = ["# TYPE ia_llamadas_total counter"]
+    with _lock:
+        for (h, m, resultado), n in sorted(_resultados.items()):
+            lineas.append(f"ia_llamadas_total{etiquetas(herramienta=h, modelo=m, resultado=resultado)} {n}")
+        for nombre in ("tokens_prompt", "tokens_salida", "bytes_prompt", "bytes_respuesta", "reintentos", "coberturas"):
+            lineas.append(f"# TYPE ia_{nombre}_total counter")
+            for (h, m, n), total in sorted(_contadores.items()):
+                if n == nombre:
+                    lineas.append(f"ia_{nombre}_total{etiquetas(herramienta=h, modelo=m)} {total}")
+        for nombre in ("latencia_segundos", "ttfb_segundos", "tokens_salida"):
+            lineas.append(f"# TYPE ia_{nombre} histogram")
+            for (n, h, m), hist in sorted(_histogramas.items()):
+                if n != nombre:
+                    continue
+                acumulado = 0
+                for limite, cantidad in zip(list(hist.limites) + ["+Inf"], hist.cubetas):
+                    acumulado += cantidad
+                    lineas.append(f"ia_{nombre}_bucket{etiquetas(herramienta=h, modelo=m, le=limite)} {acumulado}")
+                lineas.append(f"ia_{nombre}_sum{etiquetas(herramienta=h, modelo=m)} {hist.suma}")
+                lineas.append(f"ia_{nombre}_count{etiquetas(herramienta=h, modelo=m)} {hist.cantidad}")
+    return "\n".join(lineas) + "\n"
+
+
+# --- 4. ENDPOINT HTTP ---
+class _Metricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        cuerpo = metricas_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+_servidor = None
+_lock_servidor = threading.Lock()
+
+
+def iniciar_servidor(puerto, host="127.0.0.1"):
+    """Sirve /metrics (cualquier ruta) en un hilo aparte; Streamlit no permite rutas propias.
+
+    Una sola vez por proceso: volver a llamarla (Ej: tras limpiar la caché de Streamlit) devuelve
+    el mismo servidor. Sin autenticación, así que por defecto solo escucha en la máquina local.
+    Si el puerto ya está tomado (otro proceso de la app), no sirve nada y devuelve None.
+    """
+    global _servidor
+    with _lock_servidor:
+        if _servidor is None:
+            try:
+                _servidor = ThreadingHTTPServer((host, int(puerto)), _Metricas)
+            except OSError as e:
+                if e.errno != errno.EADDRINUSE:
+                    raise
+                return None
+            threading.Thread(target=_servidor.serve_forever, daemon=True).start()
+        return _servidor
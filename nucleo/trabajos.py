@@ -0,0 +1,161 @@
+"""Generaciones en segundo plano que sobreviven a los reruns de Streamlit.
+
+Al pulsar el botón, la página envía el trabajo a un pool compartido por el proceso y guarda
+en la sesión solo su id. Cada rerun consulta el estado y, mientras no termina, un fragmento
+vuelve a mirar cada medio segundo: si el usuario toca otro widget o cambia de página, el
+trabajo sigue y su resultado se recoge al volver. El hilo del script no espera a la red.
+
+La función del trabajo recibe el Trabajo como primer argumento para informar su avance
+(informar) o el texto que va llegando (agregar). No debe llamar a st.*: corre fuera de la sesión.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import streamlit as st
+
+from nucleo.ia import leer_config
+
+HILOS = 16
+RETENCION_S = 3600   # un trabajo terminado que nadie recoge se olvida pasada una hora
+SONDEO_S = 0.5
+
+
+# --- 1. TRABAJOS ---
+@dataclass
+class Trabajo:
+    id: str
+    mensaje: str = ""
+    datos: dict = field(default_factory=dict)   # lo que la página necesite al recogerlo
+    estado: str = "en_curso"                    # en_curso | listo | error
+    resultado: object = None
+    error: str = ""
+    avance: float = None                        # 0..1 si el trabajo lo informa
+    inicio: float = field(default_factory=time.time)
+    fin: float = None
+    _trozos: list = field(default_factory=list, repr=False)
+
+    @property
+    def terminado(self):
+        return self.estado != "en_curso"
+
+    def informar(self, avance=None, mensaje=None):
+        if avance is not None:
+            self.avance = avance
+        if mensaje is not None:
+            self.mensaje = mensaje
+
+    def agregar(self, trozo):
+        self._trozos.append(trozo)
+
+    def texto(self):
+        """Lo recibido hasta ahora (list.append y join son seguros entre hilos)."""
+        return "".join(self._trozos)
+
+
+class ColaTrabajos:
+    def __init__(self, hilos=HILOS):
+        self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="trabajo")
+        self._trabajos = {}
+        self._lock = threading.Lock()
+
+    def enviar(self, funcion, *args, mensaje="", datos=None):
+        trabajo = Trabajo(uuid.uuid4().hex, mensaje=mensaje, datos=datos or {})
+        with self._lock:
+            self._limpiar()
+            self._trabajos[trabajo.id] = trabajo
+        self._pool.submit(self._correr, trabajo, funcion, args)
+        return trabajo
+
+    @staticmethod
+    def _correr(trabajo, funcion, args):
+        try:
+            trabajo.resultado = funcion(trabajo, *args)
+            trabajo.estado = "listo"
+        except Exception as e:
+            trabajo.error = str(e)
+            trabajo.estado = "error"
+        finally:
+            trabajo.fin = time.time()
+
+    def obtener(self, id_trabajo):
+        with self._lock:
+            return self._trabajos.get(id_trabajo)
+
+    def olvidar(self, id_trabajo):
+        with self._lock:
+            self._trabajos.pop(id_trabajo, None)
+
+    def _limpiar(self):
+        limite = time.time() - RETENCION_S
+        for id_trabajo in [i for i, t in self._trabajos.items() if t.fin and t.fin < limite]:
+            del self._trabajos[id_trabajo]
+
+    def estadisticas(self):
+        with self._lock:
+            en_curso = sum(not t.terminado for t in self._trabajos.values())
+            return {"en_curso": en_curso, "terminados": len(self._trabajos) - en_curso}
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_cola():
+    """Una cola por proceso, compartida por todas las sesiones."""
+    return ColaTrabajos(int(leer_config("TRABAJOS_HILOS", HILOS)))
+
+
+# --- 2. EN LA PÁGINA ---
+def _clave(nombre):
+    return f"_trabajo_{nombre}"
+
+
+def lanzar(nombre, funcion, *args, mensaje="Generando...", datos=None):
+    """Envía funcion(trabajo, *args) y deja su id en la sesión bajo `nombre`.
+    Si ya hay uno en curso bajo ese nombre (doble clic), no lanza otro."""
+    if en_curso(nombre):
+        return
+    st.session_state[_clave(nombre)] = obtener_cola().enviar(funcion, *args, mensaje=mensaje, datos=datos).id
+
+
+def en_curso(nombre):
+    """Si la sesión tiene un trabajo sin terminar bajo `nombre` (para desactivar el botón)."""
+    trabajo = obtener_cola().obtener(st.session_state.get(_clave(nombre)))
+    return bool(trabajo) and not trabajo.terminado
+
+
+def _avance_por_defecto(trabajo):
+    if trabajo.avance is not None:
+        st.progress(trabajo.avance, text=trabajo.mensaje)
+    else:
+        st.info(f"⏳ {trabajo.mensaje}")
+
+
+def recoger(nombre, al_terminar, mostrar_avance=_avance_por_defecto):
+    """Si la sesión tiene un trabajo bajo `nombre`: terminado, llama al_terminar(trabajo) una sola
+    vez (en el hilo del script: puede guardar en la sesión y mostrar errores); en curso, muestra
+    mostrar_avance(trabajo) y vuelve a mirar cada SONDEO_S segundos sin rehacer la página.
+    Devuelve True mientras siga en curso, para no mostrar debajo el resultado anterior."""
+    id_trabajo = st.session_state.get(_clave(nombre))
+    if not id_trabajo:
+        return False
+    cola = obtener_cola()
+    trabajo = cola.obtener(id_trabajo)
+    if trabajo is None:
+        st.session_state.pop(_clave(nombre), None)
+        st.warning("⚠️ El trabajo en curso se perdió (el servidor se reinició). Vuelve a generarlo.")
+        return False
+    if trabajo.terminado:
+        st.session_state.pop(_clave(nombre), None)
+        cola.olvidar(id_trabajo)
+        al_terminar(trabajo)
+        return False
+
+    @st.fragment(run_every=SONDEO_S)
+    def sondear():
+        if trabajo.terminado:
+            st.rerun()  # la página entera: al_terminar corre en el siguiente paso
+        mostrar_avance(trabajo)
+
+    sondear()
+    return True
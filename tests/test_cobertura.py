@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ALL_COMPLETED
+
+import pytest
+
+from nucleo import cobertura
+from nucleo.cobertura import PresupuestoCobertura, cubrir
+
+
+def _original_y_duplicado(original, duplicado):
+    """funcion() que la primera vez se comporta como `original` y la segunda como `duplicado`.
+    El original no termina hasta que arrancó el duplicado: así siempre se cubre."""
+    arranco_duplicado = threading.Event()
+    llamadas = []
+    lock = threading.Lock()
+
+    def funcion():
+        with lock:
+            llamadas.append(None)
+            numero = len(llamadas)
+        if numero == 1:
+            arranco_duplicado.wait(5)
+            return original()
+        arranco_duplicado.set()
+        return duplicado()
+
+    return funcion
+
+
+def _falla():
+    raise RuntimeError("original failed")
+
+
+@pytest.fixture
+def simultaneas(monkeypatch):
+    # La espera de la primera que termine espera a las dos: ambas llegan juntas en `hechos`
+    wait_original = cobertura.wait
+
+    def wait(futuros, timeout=None, return_when=ALL_COMPLETED):
+        if timeout is not None:
+            return wait_original(futuros, timeout=timeout)
+        return wait_original(futuros, return_when=ALL_COMPLETED)
+
+    monkeypatch.setattr(cobertura, "wait", wait)
+
+
+def test_sin_demora_no_cubre():
+    presupuesto = PresupuestoCobertura()
+    assert cubrir(lambda: "ok", 1.0, presupuesto) == "ok"
+    assert presupuesto.estadisticas()["duplicadas"] == 0
+
+
+@pytest.mark.parametrize("repeticion", range(20))
+def test_gana_la_buena_si_terminan_juntas(simultaneas, repeticion):
+    funcion = _original_y_duplicado(_falla, lambda: "dup ok")
+    assert cubrir(funcion, 0.01, PresupuestoCobertura()) == "dup ok"
+
+
+@pytest.mark.parametrize("repeticion", range(20))
+def test_gana_el_original_si_falla_el_duplicado(simultaneas, repeticion):
+    def duplicado():
+        raise RuntimeError("dup failed")
+
+    funcion = _original_y_duplicado(lambda: "original ok", duplicado)
+    assert cubrir(funcion, 0.01, PresupuestoCobertura()) == "original ok"
+
+
+def test_si_fallan_las_dos_se_lanza_el_error(simultaneas):
+    funcion = _original_y_duplicado(_falla, _falla)
+    with pytest.raises(RuntimeError, match="original failed"):
+        cubrir(funcion, 0.01, PresupuestoCobertura())
+
+
+def test_sin_cupo_en_la_cubeta_no_cubre_y_devuelve_el_presupuesto():
+    presupuesto = PresupuestoCobertura()
+    hecho = threading.Event()
+
+    def lenta():
+        hecho.wait(0.05)
+        return "ok"
+
+    assert cubrir(lenta, 0.01, presupuesto, cupo=lambda: False) == "ok"
+    assert presupuesto.estadisticas()["duplicadas"] == 0
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pytest
+
+from nucleo.preclasificador import _plazo, por_reglas
+
+HOY = date(2025, 3, 12)  # miércoles, año no bisiesto
+
+
+@pytest.mark.parametrize("tarea, rol, cuadrante", [
+    ("Enviar la propuesta al cliente hoy", None, "hacer"),
+    ("Preparar el informe para la próxima semana", None, "planificar"),
+    ("Preparar el informe de ventas", None, None),
+    ("Mirar Netflix", None, "eliminar"),
+    ("Aprender a tocar guitarra algún día", None, "eliminar"),
+    ("Retirar el paquete del correo mañana", None, "delegar"),
+    ("Pagar la cuenta de luz hoy", None, "delegar"),
+    # Un recado sin plazo no basta para delegar
+    ("Pagar la cuenta de luz", None, None),
+    ("Ordenar el escritorio", None, None),
+    ("Comprar pasajes para el viaje de negocios con el gerente", None, None),
+    ("Comprar un auto nuevo", None, None),
+    # Revisar las redes puede ser trabajo
+    ("Revisar las redes sociales", None, None),
+    # El rol veta la regla
+    ("Mirar Instagram", "Community manager", None),
+    ("Mirar Instagram", "Contador", "eliminar"),
+    ("Pagar la cuenta de luz hoy", "Dueña de casa", None),
+    ("Retirar el paquete del correo mañana", "Asistente de gerencia", None),
+])
+def test_reglas(tarea, rol, cuadrante):
+    assert por_reglas(tarea, rol, hoy=HOY) == cuadrante
+
+
+@pytest.mark.parametrize("texto, hoy, plazo", [
+    ("entregar el 13/03", HOY, (True, False)),
+    ("entregar el 20/03", HOY, (False, True)),
+    ("entregar el 16/03", HOY, (False, False)),
+    # "15/01" escrito en diciembre es de enero del año siguiente
+    ("pagar el 15/01", date(2025, 12, 20), (False, True)),
+    ("pagar el 01/01", date(2025, 12, 31), (True, False)),
+    # Con año explícito no se corre de año: ya vencida
+    ("pagar el 15/01/2025", date(2025, 12, 20), (True, False)),
+    # Un día que el mes no tiene pasa al último del mes
+    ("cerrar el 29/02", date(2025, 2, 20), (False, True)),
+    ("cerrar el 29/02", date(2025, 2, 28), (True, False)),
+    ("cerrar el 31/02", date(2024, 2, 28), (True, False)),
+    # Con guion solo es fecha tras una palabra de plazo
+    ("leer capitulos 3-4", date(2025, 4, 2), (False, False)),
+    ("leer para el 3-4", date(2025, 4, 2), (True, False)),
+    ("revisar el 45/13", HOY, (False, False)),
+])
+def test_plazo(texto, hoy, plazo):
+    assert _plazo(texto, hoy) == plazo